@@ -0,0 +1,42 @@
+"""data_versions: per-entity change counters behind ETag / Last-Modified
+
+Revision ID: 20261018_data_versions
+Revises: 20261018_org_hierarchy
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_data_versions"
+down_revision = "20261018_org_hierarchy"
+branch_labels = None
+depends_on = None
+
+ENTITIES = ("scores", "org", "plans", "rbac")
+
+
+def _has_table(bind, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in insp.get_table_names()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _has_table(bind, "data_versions"):
+        table = op.create_table(
+            "data_versions",
+            sa.Column("entity", sa.String(50), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.bulk_insert(table, [{"entity": e, "version": 1} for e in ENTITIES])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if _has_table(bind, "data_versions"):
+        op.drop_table("data_versions")
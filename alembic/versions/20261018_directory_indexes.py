@@ -0,0 +1,65 @@
+"""employee directory: keyset indexes on (name, id) (safe for SQLite)
+
+Revision ID: 20261018_directory_indexes
+Revises: 20261018_hot_indexes
+Create Date: 2026-10-18
+
+Also adds employees.level and employees.is_active where an older schema
+lacks them; the directory filters on both.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_directory_indexes"
+down_revision = "20261018_hot_indexes"
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, columns)
+INDEXES = {
+    "ix_employees_name": ("employees", ["full_name", "id"]),
+    "ix_employees_department_name": ("employees", ["department_id", "full_name", "id"]),
+    "ix_employees_position_name": ("employees", ["position_id", "full_name", "id"]),
+}
+
+
+def _has_table(bind, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in insp.get_table_names()
+
+
+def _has_column(bind, table: str, col: str) -> bool:
+    insp = sa.inspect(bind)
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def _has_index(bind, table: str, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _has_table(bind, "employees"):
+        return
+
+    if not _has_column(bind, "employees", "level"):
+        op.add_column("employees", sa.Column("level", sa.Integer(), nullable=True))
+    if not _has_column(bind, "employees", "is_active"):
+        op.add_column("employees", sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.text("1")))
+
+    for name, (table, columns) in INDEXES.items():
+        if not _has_index(bind, table, name):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name, (table, _) in INDEXES.items():
+        if _has_table(bind, table) and _has_index(bind, table, name):
+            op.drop_index(name, table_name=table)
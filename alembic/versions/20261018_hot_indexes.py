@@ -0,0 +1,69 @@
+"""composite indexes for hot lookups (safe for SQLite)
+
+Revision ID: 20261018_hot_indexes
+Revises: 20261018_score_rollups
+Create Date: 2026-10-18
+
+Also adds employees.user_id (the model has it, older schemas do not).
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_hot_indexes"
+down_revision = "20261018_score_rollups"
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, columns); plain strings are column names, sa.text() keeps a sort order
+INDEXES = {
+    "ix_scores_employee_task": ("scores", ["employee_id", "task_id", "normalized"]),
+    "ix_scores_employee_criterion": ("scores", ["employee_id", "criterion_id", "normalized"]),
+    "ix_task_criteria_criterion": ("task_criteria", ["criterion_id", "task_id", "weight"]),
+    "ix_plan_items_plan_id": ("plan_items", ["plan_id"]),
+    "ix_plans_employee_recent": ("plans", ["employee_id", sa.text("id DESC")]),
+    "ix_notifications_user_created": ("notifications", ["user_id", "created_at"]),
+    "ix_employees_user_id": ("employees", ["user_id"]),
+}
+
+
+def _has_table(bind, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in insp.get_table_names()
+
+
+def _has_column(bind, table: str, col: str) -> bool:
+    insp = sa.inspect(bind)
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def _has_index(bind, table: str, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if _has_table(bind, "employees") and not _has_column(bind, "employees", "user_id"):
+        # SQLite cannot add a constraint in place; the column stays a plain integer there
+        fk = [] if bind.dialect.name == "sqlite" else [sa.ForeignKey("users.id")]
+        op.add_column("employees", sa.Column("user_id", sa.Integer(), *fk, nullable=True))
+
+    for name, (table, columns) in INDEXES.items():
+        if not _has_table(bind, table) or _has_index(bind, table, name):
+            continue
+        if all(_has_column(bind, table, c) for c in columns if isinstance(c, str)):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name, (table, _) in INDEXES.items():
+        # ix_plan_items_plan_id predates this revision
+        if name != "ix_plan_items_plan_id" and _has_table(bind, table) and _has_index(bind, table, name):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,67 @@
+"""nested departments and department managers (safe for SQLite)
+
+Revision ID: 20261018_org_hierarchy
+Revises: 20261018_directory_indexes
+Create Date: 2026-10-18
+
+departments.parent_id makes departments a tree (read with a recursive CTE);
+departments.manager_user_id names the user who manages the subtree.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_org_hierarchy"
+down_revision = "20261018_directory_indexes"
+branch_labels = None
+depends_on = None
+
+
+# column -> (referenced table, index name)
+COLUMNS = {
+    "parent_id": ("departments", "ix_departments_parent_id"),
+    "manager_user_id": ("users", "ix_departments_manager_user_id"),
+}
+
+
+def _has_table(bind, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in insp.get_table_names()
+
+
+def _has_column(bind, table: str, col: str) -> bool:
+    insp = sa.inspect(bind)
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def _has_index(bind, table: str, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _has_table(bind, "departments"):
+        return
+    for col, (ref, index) in COLUMNS.items():
+        if not _has_column(bind, "departments", col):
+            # SQLite cannot add a constraint in place; the column stays a plain integer there
+            fk = [] if bind.dialect.name == "sqlite" else [sa.ForeignKey(f"{ref}.id", ondelete="SET NULL")]
+            op.add_column("departments", sa.Column(col, sa.Integer(), *fk, nullable=True))
+        if not _has_index(bind, "departments", index):
+            op.create_index(index, "departments", [col])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not _has_table(bind, "departments"):
+        return
+    for col, (_, index) in COLUMNS.items():
+        if _has_index(bind, "departments", index):
+            op.drop_index(index, table_name="departments")
+        if _has_column(bind, "departments", col):
+            with op.batch_alter_table("departments") as batch:
+                batch.drop_column(col)
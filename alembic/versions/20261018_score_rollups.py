@@ -0,0 +1,75 @@
+"""score rollup tables (safe for SQLite)
+
+Revision ID: 20261018_score_rollups
+Revises: 20251006_fix_users_created_at_sqlite
+Create Date: 2026-10-18
+
+The tables are filled from the existing scores here, so reads that go
+through them (matrix, /me, profiles) are right straight after the upgrade.
+`python -m scripts.rollup_scores` rebuilds them again at any time.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_score_rollups"
+down_revision = "20251006_fix_users_created_at_sqlite"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(bind, name: str) -> bool:
+    insp = sa.inspect(bind)
+    return name in insp.get_table_names()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if not _has_table(bind, "score_task_rollups"):
+        op.create_table(
+            "score_task_rollups",
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("total", sa.Float(), nullable=True),
+            sa.Column("n", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("avg", sa.Float(), nullable=True),
+        )
+
+    if not _has_table(bind, "score_criterion_rollups"):
+        op.create_table(
+            "score_criterion_rollups",
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("criterion_id", sa.Integer(), sa.ForeignKey("criteria.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("score", sa.Float(), nullable=False, server_default="0"),
+        )
+
+    if not _has_table(bind, "score_competency_rollups"):
+        op.create_table(
+            "score_competency_rollups",
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("competency_id", sa.Integer(), sa.ForeignKey("competencies.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("score", sa.Float(), nullable=False, server_default="0"),
+        )
+
+    if not _has_table(bind, "score_total_rollups"):
+        op.create_table(
+            "score_total_rollups",
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("total", sa.Float(), nullable=False, server_default="0"),
+        )
+
+    # the same statements the app uses for a full rebuild; they read only
+    # columns that exist at this revision
+    from app.services.score_rollup import _refresh
+    _refresh(bind, full=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name in ("score_total_rollups", "score_competency_rollups", "score_criterion_rollups", "score_task_rollups"):
+        if _has_table(bind, name):
+            op.drop_table(name)
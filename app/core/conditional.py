@@ -0,0 +1,129 @@
+"""
+Conditional GET driven by data versions.
+
+    @router.get("/page")
+    def page(request: Request, cond: Conditional = Depends(conditional("scores", "org"))):
+        if cond.fresh:
+            return cond.not_modified()      # before any of the expensive work
+        ...
+        return cond.apply(response)
+
+The validator is a weak ETag over the listed entities' versions (rbac is
+always included: menus and access follow permissions), the signed-in user,
+the path and query string and the template build, plus a Last-Modified from
+the newest of those entities. Responses are `private, no-cache`: browsers
+keep them but revalidate every time, which then costs one cached version
+lookup instead of the handler.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.versions import Version, data_versions
+
+_build: Optional[str] = None
+
+
+def build_id() -> str:
+    """Changes with any template or static build, so a deploy never answers
+    304 with old markup (or markup linking assets that are gone)."""
+    global _build
+    if _build is None:
+        from app.core.static_assets import manifest
+        from app.templates_utils import templates
+        newest = 0.0
+        for root in getattr(templates.env.loader, "searchpath", ()):
+            for dirpath, _, files in os.walk(root):
+                for name in files:
+                    newest = max(newest, os.stat(os.path.join(dirpath, name)).st_mtime)
+        assets = hashlib.blake2b(json.dumps(manifest(), sort_keys=True).encode(), digest_size=6).hexdigest()
+        _build = f"{newest:.0f}-{assets}"
+    return _build
+
+
+def _user_id(request: Request) -> Optional[int]:
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user.id
+    try:
+        return request.session.get("user_id")
+    except AssertionError:  # no SessionMiddleware
+        return None
+
+
+def make_etag(request: Request, versions: Dict[str, Version]) -> str:
+    parts = [build_id(), request.url.path, str(sorted(request.query_params.multi_items())),
+             str(_user_id(request))]
+    parts += [f"{entity}={version[0]}" for entity, version in sorted(versions.items())]
+    return 'W/"' + hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def _matches(header: str, etag: str) -> bool:
+    # weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+@dataclass
+class Conditional:
+    etag: Optional[str]
+    last_modified: Optional[datetime]
+    fresh: bool
+
+    def headers(self) -> Dict[str, str]:
+        if self.etag is None:
+            return {}
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        if response.status_code == 200:
+            response.headers.update(self.headers())
+        return response
+
+
+def evaluate(request: Request, versions: Dict[str, Version]) -> Conditional:
+    etag = make_etag(request, versions)
+    stamps = [v[1] for v in versions.values() if v[1] is not None]
+    last_modified = max(stamps).replace(microsecond=0) if stamps else None
+    fresh = False
+    if request.method in ("GET", "HEAD"):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = _matches(if_none_match, etag)
+        elif last_modified is not None and "if-modified-since" in request.headers:
+            try:
+                fresh = last_modified <= parsedate_to_datetime(request.headers["if-modified-since"])
+            except (TypeError, ValueError):
+                fresh = False
+    return Conditional(etag, last_modified, fresh)
+
+
+def conditional(*entities: str) -> Callable[[Request], Conditional]:
+    """Dependency: validators for a page built from these entities."""
+    names = tuple(dict.fromkeys(entities + ("rbac",)))
+
+    def _dep(request: Request) -> Conditional:
+        try:
+            versions = data_versions.get(names)
+        except SQLAlchemyError:
+            # no data_versions table yet: serve everything in full
+            return Conditional(None, None, False)
+        return evaluate(request, versions)
+    return _dep
@@ -41,9 +41,81 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: Optional[str] = None
     MYSQL_DB: Optional[str] = None
 
+    # create_all при старте (lifespan); схемой по умолчанию управляет Alembic
+    DB_BOOTSTRAP: bool = False
+
+    # production-профиль SQLite: WAL + PRAGMA на каждом соединении,
+    # один writer-движок и пул read-only соединений для GET-запросов
+    SQLITE_TUNED: bool = False
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024      # байт
+    SQLITE_CACHE_SIZE: int = -64 * 1024            # <0 — в KiB (64 MiB на соединение)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_READ_POOL_SIZE: int = 8
+
+    # асинхронный стек (AsyncSession) для горячих read-эндпоинтов
+    DB_ASYNC: bool = False
+    # сколько ThreadedSession держат соединения одновременно (DB_ASYNC=false);
+    # по умолчанию — размер пула читателя, 0 — без ограничения
+    DB_READ_SESSION_SLOTS: Optional[int] = None
+    # явный async URL; по умолчанию выводится из sqlalchemy_database_uri
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # метрики запросов (латентность, размер ответа, SQL) и эндпоинт /metrics;
+    # в DEBUG ответы получают заголовок Server-Timing
+    METRICS_ENABLED: bool = True
+
+    # журнал медленных SQL (0 — выкл.) и детектор N+1: одна и та же форма
+    # запроса больше N раз за запрос/единицу работы (0 — выкл.)
+    SQL_SLOW_QUERY_MS: float = 500.0
+    SQL_NPLUSONE_THRESHOLD: int = 20
+
+    # уведомления: буфер записи (пачка / интервал сброса, сек), размер страницы,
+    # срок хранения прочитанных (дней)
+    NOTIFY_BATCH_SIZE: int = 500
+    NOTIFY_FLUSH_INTERVAL: float = 1.0
+    # предел буфера, пока БД недоступна: сверх него отбрасываются самые старые
+    NOTIFY_MAX_PENDING: int = 100_000
+    NOTIFICATIONS_PAGE_SIZE: int = 50
+    NOTIFICATIONS_RETENTION_DAYS: int = 90
+    # SSE-поток уведомлений: heartbeat (сек), очередь на соединение (событий),
+    # размер пачки при догоне из БД (Last-Event-ID)
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_QUEUE_SIZE: int = 100
+    SSE_BATCH: int = 100
+
+    # справочник сотрудников (/company/employees): строк на странице и максимум для ?limit= в JSON
+    DIRECTORY_PAGE_SIZE: int = 50
+    DIRECTORY_MAX_PAGE_SIZE: int = 500
+
+    # версии данных для ETag/Last-Modified: сколько секунд воркер доверяет
+    # прочитанным из data_versions счётчикам (свои записи видны сразу)
+    DATA_VERSION_TTL: float = 1.0
+
     # директории фронта
     TEMPLATES_DIR: str = str(ROOT_DIR / "templates")
     STATIC_DIR: str = str(ROOT_DIR / "static")
+    # результат scripts.build_static (хэшированные имена, .gz/.br, manifest.json);
+    # если сборки нет, /static отдаётся прямо из STATIC_DIR
+    STATIC_BUILD_DIR: str = str(ROOT_DIR / "static_dist")
+
+    # шаблоны: кэш байткода Jinja (пусто — выкл.), компиляция всех шаблонов при старте,
+    # кэш фрагментов {% cache %} (записей / символов всего)
+    TEMPLATE_BYTECODE_DIR: str = str(ROOT_DIR / "data" / "jinja_cache")
+    TEMPLATE_WARMUP: bool = True
+    TEMPLATE_FRAGMENT_CACHE_ENTRIES: int = 20000
+    TEMPLATE_FRAGMENT_CACHE_CHARS: int = 64 * 1024 * 1024
+    # большие страницы (матрица, дерево компании) отдаются по мере рендеринга
+    # (Jinja generate()), кусками примерно по TEMPLATE_STREAM_CHUNK символов
+    TEMPLATE_STREAMING: bool = True
+    TEMPLATE_STREAM_CHUNK: int = 16 * 1024
+
+    # gzip ответов от GZIP_MIN_SIZE байт; SSE и уже сжатое (.gz/.br статика) не трогаются
+    GZIP_ENABLED: bool = True
+    GZIP_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+
+    # процессы для пакетной генерации PDF (0 — по числу CPU)
+    REPORT_WORKERS: int = 0
 
     @property
     def sqlalchemy_database_uri(self) -> str:
@@ -74,5 +146,20 @@ class Settings(BaseSettings):
         # дефолт
         return "sqlite:///data/app.db"
 
+    @property
+    def async_database_uri(self) -> str:
+        """
+        URL для create_async_engine: sqlite -> aiosqlite, mysql/pymysql -> aiomysql.
+        """
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        url = self.sqlalchemy_database_uri
+        for prefix, driver in (("sqlite:", "sqlite+aiosqlite:"),
+                               ("mysql+pymysql:", "mysql+aiomysql:"),
+                               ("mysql:", "mysql+aiomysql:")):
+            if url.startswith(prefix):
+                return driver + url[len(prefix):]
+        return url
+
 
 settings = Settings()
@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import os
+from typing import Tuple
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import settings
@@ -21,13 +24,54 @@ if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     os.makedirs("data", exist_ok=True)
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-    echo=settings.DEBUG,
-    connect_args=connect_args,
-)
+
+def _sqlite_pragmas(readonly: bool):
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if not readonly:
+            cur.execute("PRAGMA journal_mode = WAL")
+        cur.execute("PRAGMA synchronous = NORMAL")
+        cur.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cur.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cur.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            cur.execute("PRAGMA query_only = 1")
+        cur.close()
+    return _on_connect
+
+
+def make_engines(url: str, tuned: bool = False, echo: bool = False) -> Tuple[Engine, Engine]:
+    """(writer, reader) engines for `url`.
+
+    Untuned, or for anything but a SQLite file, both are the same engine.
+    Tuned SQLite gets WAL and the PRAGMAs from Settings on every connection,
+    a writer pool of one connection (writes queue in the pool instead of
+    failing on the database lock) and a pool of read-only connections.
+    """
+    sqlite_file = url.startswith("sqlite") and (make_url(url).database or ":memory:") != ":memory:"
+    args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    if not (tuned and sqlite_file):
+        engine = create_engine(url, pool_pre_ping=True, future=True, echo=echo, connect_args=args)
+        return engine, engine
+
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    writer = create_engine(url, future=True, echo=echo, pool_size=1, max_overflow=0,
+                           connect_args=dict(args, timeout=timeout))
+    event.listen(writer, "connect", _sqlite_pragmas(readonly=False))
+    # switch the file to WAL before any read-only connection opens it
+    with writer.connect():
+        pass
+
+    ro = make_url(url)
+    ro = ro.set(database=f"file:{ro.database}", query=dict(ro.query, mode="ro", uri="true"))
+    reader = create_engine(ro, future=True, echo=echo, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0,
+                           connect_args=dict(args, timeout=timeout))
+    event.listen(reader, "connect", _sqlite_pragmas(readonly=True))
+    return writer, reader
+
+
+engine, read_engine = make_engines(SQLALCHEMY_DATABASE_URL, tuned=settings.SQLITE_TUNED, echo=settings.DEBUG)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -36,12 +80,23 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+# Read-only sessions (the writer when the SQLite profile is off)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    autocommit=False,
+    future=True,
+)
+
 Base = declarative_base()
 
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 
-# FastAPI dependency
-def get_db():
-    db = SessionLocal()
+# FastAPI dependency: GET/HEAD handlers get a reader session, everything else the writer
+def get_db(request: Request = None):
+    factory = ReadSessionLocal if request is not None and request.method in READ_METHODS else SessionLocal
+    db = factory()
     try:
         yield db
     finally:
@@ -0,0 +1,108 @@
+# app/core/db_async.py
+"""
+Async database access for the hot read endpoints.
+
+get_async_db yields an AsyncSession (aiosqlite / aiomysql) when
+settings.DB_ASYNC is on. Otherwise it yields a ThreadedSession: a sync
+reader Session (ReadSessionLocal) run on the threadpool behind the same
+awaitable methods, so handlers are written once for both modes. Sync-only helpers are called
+through `await db.run_sync(fn, *args)` in either mode.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import nullcontext
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import ReadSessionLocal, read_engine
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _async_engine = create_async_engine(settings.async_database_uri, pool_pre_ping=True, echo=settings.DEBUG)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_sessionmaker = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker()
+
+
+class ThreadedSession:
+    """Awaitable facade over a sync Session; every call runs on the threadpool."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def execute(self, statement, params: Optional[dict] = None):
+        # buffered like AsyncSession.execute, so iterating does no I/O on the event loop
+        frozen = await run_in_threadpool(lambda: self.sync_session.execute(statement, params).freeze())
+        return frozen()
+
+    async def scalar(self, statement, params: Optional[dict] = None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+def read_session_slots() -> Optional[asyncio.Semaphore]:
+    """One slot per pooled reader connection. A ThreadedSession keeps its
+    connection between awaits, so without this, threads blocked on pool
+    checkout can starve the requests holding connections of the threads they
+    need. The limit is settings.DB_READ_SESSION_SLOTS, else the pool's size
+    (overflow connections stay free for sync handlers); pools without a size
+    (NullPool, StaticPool) never block on checkout and get no limit.
+    Created once per app in the lifespan, kept on app.state.read_slots."""
+    limit = settings.DB_READ_SESSION_SLOTS
+    if limit is None:
+        size = getattr(read_engine.pool, "size", None)
+        limit = size() if callable(size) else 0
+    return asyncio.Semaphore(limit) if limit > 0 else None
+
+
+def _slots(request: Request) -> Optional[asyncio.Semaphore]:
+    state = request.app.state
+    if not hasattr(state, "read_slots"):  # app served without its lifespan
+        state.read_slots = read_session_slots()
+    return state.read_slots
+
+
+# FastAPI dependency
+async def get_async_db(request: Request) -> AsyncGenerator:
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        slots = _slots(request)
+        async with slots if slots is not None else nullcontext():
+            db = ThreadedSession(ReadSessionLocal())
+            try:
+                yield db
+            finally:
+                await db.close()
@@ -0,0 +1,96 @@
+"""
+Template fragment cache.
+
+    {% cache "dept", d.id, org_version %} ...expensive markup... {% endcache %}
+
+The arguments before the last make the key, the last is the data version the
+fragment was rendered from (`{% cache key %}` alone never expires). Entries are
+keyed on (template name, key) and hold the version they were rendered at, so
+a new version replaces the old fragment in place instead of piling up beside
+it. The store is an LRU bounded both by entry count and by total characters.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from app.core.config import settings
+
+
+class FragmentCache:
+    def __init__(self, max_entries: Optional[int] = None, max_chars: Optional[int] = None):
+        self.max_entries = settings.TEMPLATE_FRAGMENT_CACHE_ENTRIES if max_entries is None else max_entries
+        self.max_chars = settings.TEMPLATE_FRAGMENT_CACHE_CHARS if max_chars is None else max_chars
+        self.hits = 0
+        self.misses = 0
+        self.chars = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, Tuple[Any, str]]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Any) -> Optional[str]:
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None and hit[0] == version:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return hit[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: Any, html: str) -> None:
+        if len(html) > self.max_chars // 4:
+            return  # one fragment must not flush a quarter of the cache
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.chars -= len(old[1])
+            self._items[key] = (version, html)
+            self.chars += len(html)
+            while self._items and (len(self._items) > self.max_entries or self.chars > self.max_chars):
+                _, (_, dropped) = self._items.popitem(last=False)
+                self.chars -= len(dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.chars = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items), "chars": self.chars}
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """`{% cache key[, key...], version %}`; uses environment.fragment_cache."""
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=fragment_cache)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        version = args.pop() if len(args) > 1 else nodes.Const(None)
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.Const(parser.name), nodes.Tuple(args, "load"), version])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, template: Optional[str], key: tuple, version: Any, caller) -> Markup:
+        cache: FragmentCache = self.environment.fragment_cache
+        full_key = (template, key)
+        html = cache.get(full_key, version)
+        if html is None:
+            html = str(caller())
+            cache.put(full_key, version, html)
+        return Markup(html)
@@ -0,0 +1,144 @@
+"""
+Request-scoped user loading.
+
+UserLoaderMiddleware resolves the session user once per request and stores it
+on request.state.user (None for anonymous requests). Loaded users are kept in
+a small TTL cache as detached User instances, so repeated page loads do not
+query the users table; only column attributes are available on them.
+ORM writes to a user evict it (mapper events below; again after the commit,
+since a reload between flush and commit still sees the old row); a change to
+is_active or is_superuser also bumps the RBAC version, so a deactivated user
+loses access at once in this worker and within the TTLs in the others.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.models import User
+
+CACHE_TTL = 10.0
+CACHE_SIZE = 4096
+
+
+class IdentityCache:
+    """LRU of detached User rows by id with a short TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[int, Tuple[float, User]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            hit = self._items.get(user_id)
+            if hit is not None and time.monotonic() - hit[0] < self.ttl:
+                self._items.move_to_end(user_id)
+                self.hits += 1
+                return hit[1]
+            if hit is not None:
+                del self._items[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, user: User) -> None:
+        with self._lock:
+            self._items[user.id] = (time.monotonic(), user)
+            self._items.move_to_end(user.id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(user_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items)}
+
+
+identity_cache = IdentityCache()
+
+
+def load_user(session_factory: Callable, user_id: int) -> Optional[User]:
+    with session_factory() as db:
+        user = db.get(User, user_id)
+        if user is not None:
+            db.expunge(user)
+        return user
+
+
+class UserLoaderMiddleware:
+    """Must sit inside SessionMiddleware (add it to the app before it)."""
+
+    def __init__(self, app: ASGIApp, cache: Optional[IdentityCache] = None,
+                 session_factory: Optional[Callable] = None, skip_prefixes: Tuple[str, ...] = ("/static",)):
+        self.app = app
+        self.cache = cache or identity_cache
+        self.session_factory = session_factory
+        self.skip_prefixes = skip_prefixes
+
+    async def resolve(self, user_id: int) -> Optional[User]:
+        user = self.cache.get(user_id)
+        if user is None:
+            factory = self.session_factory
+            if factory is None:
+                from app.core.db import ReadSessionLocal as factory
+            user = await run_in_threadpool(load_user, factory, user_id)
+            if user is not None:
+                self.cache.put(user)
+        return user
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(self.skip_prefixes):
+            state = scope.setdefault("state", {})
+            if "user" not in state:
+                user_id = (scope.get("session") or {}).get("user_id")
+                state["user"] = await self.resolve(user_id) if user_id else None
+        await self.app(scope, receive, send)
+
+
+def _evict(target, access_changed: bool) -> None:
+    identity_cache.invalidate(target.id)
+    if access_changed:
+        from app.core.rbac import bump_rbac_version
+        bump_rbac_version()
+    session = object_session(target)
+    if session is not None:
+        changed = session.info.setdefault("users_changed", {})
+        changed[target.id] = changed.get(target.id, False) or access_changed
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target) -> None:
+    state = inspect(target)
+    _evict(target, any(state.attrs[name].history.has_changes() for name in ("is_active", "is_superuser")))
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target) -> None:
+    _evict(target, True)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _users_settled(session) -> None:
+    changed = session.info.pop("users_changed", None)
+    if changed:
+        for user_id in changed:
+            identity_cache.invalidate(user_id)
+        if any(changed.values()):
+            from app.core.rbac import bump_rbac_version
+            bump_rbac_version()
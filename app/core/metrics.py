@@ -0,0 +1,208 @@
+"""
+Request instrumentation.
+
+MetricsMiddleware times every HTTP request and records, per route template,
+latency, response size and the number and total time of SQL statements run
+on its behalf. Statements are counted by Engine-wide cursor events into a
+per-request context variable, so threadpool work and every engine count.
+`render()` returns the Prometheus text exposition format for /metrics.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+LabelValues = Tuple[str, ...]
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("webhr_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("webhr_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        starts = conn.info.get("webhr_query_start")
+        if starts:
+            stats.sql_time += time.perf_counter() - starts.pop()
+        stats.queries += 1
+
+
+_instrumented = False
+
+
+def instrument_engines() -> None:
+    """Count statements of every Engine (sync and the sync side of async ones)."""
+    global _instrumented
+    if not _instrumented:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _instrumented = True
+
+
+# --- metric types ----------------------------------------------------------------
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    def esc(v: str) -> str:
+        return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    parts = [f'{n}="{esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, values: LabelValues, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0.0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labels, k)} {_num(v)}" for k, v in items]
+        return "\n".join(lines)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: [counts per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: LabelValues, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(values)
+            if entry is None:
+                entry = self._values[values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return "\n".join(lines)
+
+
+class Metrics:
+    def __init__(self):
+        route = ("method", "route")
+        self.requests = Counter("webhr_http_requests_total", "HTTP requests.", route + ("status",))
+        self.latency = Histogram("webhr_http_request_duration_seconds", "Request latency.", route, LATENCY_BUCKETS)
+        self.size = Histogram("webhr_http_response_size_bytes", "Response body size.", route, SIZE_BUCKETS)
+        self.queries = Histogram("webhr_db_queries_per_request", "SQL statements per request.", route, QUERY_BUCKETS)
+        self.sql_time = Histogram("webhr_db_seconds_per_request", "Time in SQL statements per request.", route,
+                                  LATENCY_BUCKETS)
+
+    def observe(self, method: str, route: str, status: int, duration: float, size: int, stats: RequestStats) -> None:
+        key = (method, route)
+        self.requests.inc(key + (str(status),))
+        self.latency.observe(key, duration)
+        self.size.observe(key, size)
+        self.queries.observe(key, stats.queries)
+        self.sql_time.observe(key, stats.sql_time)
+
+    def render(self) -> str:
+        parts = (self.requests, self.latency, self.size, self.queries, self.sql_time)
+        return "\n".join(p.render() for p in parts) + "\n"
+
+
+metrics = Metrics()
+
+
+def route_label(scope: Scope) -> str:
+    # the route template, not the raw path, keeps label cardinality bounded
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    return "/static" if scope["path"].startswith("/static/") else "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Outermost middleware; with server_timing the response gets a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp, registry: Optional[Metrics] = None, server_timing: bool = False,
+                 skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.registry = registry or metrics
+        self.server_timing = server_timing
+        self.skip_paths = skip_paths
+        instrument_engines()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        t0 = time.perf_counter()
+        status, size = 500, 0
+
+        async def _send(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - t0) * 1000
+                    value = (f'app;dur={app_ms:.1f}, '
+                             f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.queries} queries"')
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _current.reset(token)
+            self.registry.observe(scope["method"], route_label(scope), status,
+                                  time.perf_counter() - t0, size, stats)
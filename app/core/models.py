@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Date, DateTime, ForeignKey, Table, Index, func, text
 from sqlalchemy.orm import relationship
 from app.core.db import Base
 
@@ -12,11 +12,52 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
     created_at = Column(DateTime, server_default=func.now())
+    roles = relationship("Role", secondary="user_roles", back_populates="users")
+
+user_roles = Table(
+    "user_roles", Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("role_id", Integer, ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+)
+
+role_permissions = Table(
+    "role_permissions", Base.metadata,
+    Column("role_id", Integer, ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+    Column("permission_id", Integer, ForeignKey("permissions.id", ondelete="CASCADE"), primary_key=True),
+)
+
+class Role(Base):
+    __tablename__ = "roles"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    description = Column(Text, nullable=True)
+    is_system = Column(Boolean, nullable=False, default=False)
+    users = relationship("User", secondary=user_roles, back_populates="roles")
+    permissions = relationship("Permission", secondary=role_permissions)
+
+class Permission(Base):
+    __tablename__ = "permissions"
+    id = Column(Integer, primary_key=True)
+    code = Column(String(100), unique=True, nullable=False)
+    name = Column(String(200), nullable=False)
+
+class Notification(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (Index("ix_notifications_user_created", "user_id", "created_at"),)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    message = Column(String(500), nullable=False)
+    is_read = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
 
 class Department(Base):
     __tablename__ = "departments"
     id = Column(Integer, primary_key=True)
     name = Column(String(255), unique=True, nullable=False)
+    code = Column(String(50), unique=True, nullable=True)
+    is_active = Column(Boolean, default=True)
+    parent_id = Column(Integer, ForeignKey("departments.id", ondelete="SET NULL"), nullable=True, index=True)
+    manager_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
 class Position(Base):
     __tablename__ = "positions"
@@ -26,8 +67,152 @@ class Position(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_name", "full_name", "id"),
+        Index("ix_employees_department_name", "department_id", "full_name", "id"),
+        Index("ix_employees_position_name", "position_id", "full_name", "id"),
+    )
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     full_name = Column(String(255), nullable=False)
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
     position_id = Column(Integer, ForeignKey("positions.id"), nullable=True)
+    level = Column(Integer, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+
+class Function(Base):
+    __tablename__ = "functions"
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), nullable=True, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+
+position_functions = Table(
+    "position_functions", Base.metadata,
+    Column("position_id", Integer, ForeignKey("positions.id", ondelete="CASCADE"), primary_key=True),
+    Column("function_id", Integer, ForeignKey("functions.id", ondelete="CASCADE"), primary_key=True),
+)
+
+class Competency(Base):
+    __tablename__ = "competencies"
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), nullable=True, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    category = Column(String(100), nullable=True)
+
+class Criterion(Base):
+    __tablename__ = "criteria"
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), nullable=True, index=True)
+    competency_id = Column(Integer, ForeignKey("competencies.id", ondelete="CASCADE"), nullable=True, index=True)
+    scale_type = Column(String(20), nullable=False, default="one_to_five")
+    weight = Column(Float, nullable=False, default=0.0)
+    auto_weight = Column(Boolean, nullable=False, default=True)
+
+class Task(Base):
+    __tablename__ = "tasks"
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), nullable=True, index=True)
+    function_id = Column(Integer, ForeignKey("functions.id", ondelete="SET NULL"), nullable=True, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    weight = Column(Float, nullable=False, default=0.0)
+    auto_weight = Column(Boolean, nullable=False, default=True)
+    mandatory_for_level = Column(Boolean, nullable=False, default=False)
+    mandatory_for_apex = Column(Boolean, nullable=False, default=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+
+class TaskCriterion(Base):
+    __tablename__ = "task_criteria"
+    __table_args__ = (Index("ix_task_criteria_criterion", "criterion_id", "task_id", "weight"),)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    criterion_id = Column(Integer, ForeignKey("criteria.id", ondelete="CASCADE"), primary_key=True)
+    weight = Column(Float, nullable=False, default=0.0)
+    auto_weight = Column(Boolean, nullable=False, default=True)
+
+class Score(Base):
+    __tablename__ = "scores"
+    __table_args__ = (
+        Index("ix_scores_employee_task", "employee_id", "task_id", "normalized"),
+        Index("ix_scores_employee_criterion", "employee_id", "criterion_id", "normalized"),
+    )
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
+    date = Column(Date, nullable=False)
+    criterion_id = Column(Integer, ForeignKey("criteria.id", ondelete="SET NULL"), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
+    raw_value = Column(Float, nullable=True)
+    normalized = Column(Float, nullable=True)
+
+class LevelConfig(Base):
+    __tablename__ = "level_configs"
+    id = Column(Integer, primary_key=True)
+    L1_threshold = Column(Float, nullable=False, default=0.85)
+    L2_threshold = Column(Float, nullable=False, default=0.60)
+    order_desc = Column(Boolean, nullable=False, default=True)
+
+class ScoringRule(Base):
+    __tablename__ = "scoring_rules"
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), nullable=True)
+    scale_type = Column(String(20), nullable=False)
+    rule_json = Column(Text, nullable=False)
+
+class Plan(Base):
+    __tablename__ = "plans"
+    __table_args__ = (Index("ix_plans_employee_recent", "employee_id", text("id DESC")),)
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    status = Column(String(20), nullable=False, default="draft")
+    completion_pct = Column(Integer, nullable=False, default=10)
+    recommend_promotion = Column(Boolean, nullable=False, default=False)
+
+class PlanItem(Base):
+    __tablename__ = "plan_items"
+    id = Column(Integer, primary_key=True)
+    plan_id = Column(Integer, ForeignKey("plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    competency_id = Column(Integer, ForeignKey("competencies.id", ondelete="SET NULL"), nullable=True)
+    function_id = Column(Integer, nullable=True)
+    criterion_id = Column(Integer, ForeignKey("criteria.id", ondelete="SET NULL"), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
+    expected_result = Column(Text, nullable=True)
+    employee_report = Column(Text, nullable=True)
+    is_visible_to_employee = Column(Boolean, nullable=False, default=True)
+
+# --- Materialised score rollups (maintained by app.services.score_rollup) ---
+
+class ScoreTaskRollup(Base):
+    __tablename__ = "score_task_rollups"
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Float, nullable=True)
+    n = Column(Integer, nullable=False, default=0)
+    avg = Column(Float, nullable=True)
+
+class ScoreCriterionRollup(Base):
+    __tablename__ = "score_criterion_rollups"
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    criterion_id = Column(Integer, ForeignKey("criteria.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)
+
+class ScoreCompetencyRollup(Base):
+    __tablename__ = "score_competency_rollups"
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    competency_id = Column(Integer, ForeignKey("competencies.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)
+
+class ScoreTotalRollup(Base):
+    __tablename__ = "score_total_rollups"
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+
+# --- Data versions for HTTP validators (maintained by app.core.versions) ---
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    entity = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,183 @@
+"""
+Slow-query log and N+1 detection on top of Engine cursor events.
+
+Statements slower than settings.SQL_SLOW_QUERY_MS are logged to
+`webhr.sql.slow` with their parameters, duration and the application frame
+that issued them. Within a tracked unit (a request through
+QueryTrackerMiddleware, or a `track_queries()` block) statements are grouped
+by shape; when one shape runs more than settings.SQL_NPLUSONE_THRESHOLD
+times a warning goes to `webhr.sql.nplusone`, once per shape and unit.
+
+`assert_max_queries(n)` tracks every thread, so it also sees statements run
+by the TestClient's event loop; tests get it as the `max_queries` fixture.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+slow_log = logging.getLogger("webhr.sql.slow")
+nplusone_log = logging.getLogger("webhr.sql.nplusone")
+
+APP_DIR = str(Path(__file__).resolve().parents[1])
+_SKIP_FILES = (__file__, str(Path(__file__).with_name("metrics.py")), str(Path(__file__).with_name("db.py")),
+               str(Path(__file__).with_name("db_async.py")))
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with literals and IN-list lengths folded away."""
+    s = _LITERAL.sub("?", statement)
+    s = _IN_LIST.sub("(?)", s)
+    return _SPACE.sub(" ", s).strip()
+
+
+def app_frame() -> Optional[str]:
+    """`file:line in function` of the innermost caller inside the app package."""
+    f = sys._getframe(1)
+    while f is not None:
+        name = f.f_code.co_filename
+        if name.startswith(APP_DIR) and name not in _SKIP_FILES:
+            return f"{Path(name).relative_to(Path(APP_DIR).parent)}:{f.f_lineno} in {f.f_code.co_name}"
+        f = f.f_back
+    return None
+
+
+def _short(params, limit: int = 500) -> str:
+    text = repr(params)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class QueryTracker:
+    """Statement counts by shape for one unit of work."""
+
+    def __init__(self, threshold: Optional[int] = None, log: bool = True):
+        self.threshold = settings.SQL_NPLUSONE_THRESHOLD if threshold is None else threshold
+        self.log = log
+        self.count = 0
+        self.shapes: Counter = Counter()
+        self.flagged: Dict[str, str] = {}  # shape -> frame where the threshold was crossed
+        self._lock = threading.Lock()
+
+    def record(self, statement: str) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.shapes[shape] += 1
+            crossed = self.threshold and self.shapes[shape] == self.threshold + 1
+        if crossed:
+            frame = app_frame() or "?"
+            self.flagged[shape] = frame
+            if self.log:
+                nplusone_log.warning("N+1: statement ran more than %d times at %s: %s",
+                                     self.threshold, frame, shape)
+
+    def report(self, top: int = 10) -> str:
+        lines = [f"{self.count} statements"]
+        lines += [f"{n:5d}x {shape}" for shape, n in self.shapes.most_common(top)]
+        return "\n".join(lines)
+
+
+_current: contextvars.ContextVar[Optional[QueryTracker]] = contextvars.ContextVar("webhr_query_tracker", default=None)
+_global_trackers: List[QueryTracker] = []
+_global_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("webhr_querylog_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("webhr_querylog_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    slow_ms = settings.SQL_SLOW_QUERY_MS
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        slow_log.warning("slow query %.1fms at %s: %s params=%s",
+                         elapsed * 1000, app_frame() or "?", _SPACE.sub(" ", statement), _short(parameters))
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.record(statement)
+    if _global_trackers:
+        with _global_lock:
+            trackers = list(_global_trackers)
+        for t in trackers:
+            if t is not tracker:
+                t.record(statement)
+
+
+_installed = False
+
+
+def install_query_log() -> None:
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def track_queries(threshold: Optional[int] = None, all_threads: bool = False, log: bool = True) -> Iterator[QueryTracker]:
+    """Track a unit of work: this context only, or every thread with all_threads."""
+    install_query_log()
+    tracker = QueryTracker(threshold, log=log)
+    if all_threads:
+        with _global_lock:
+            _global_trackers.append(tracker)
+        try:
+            yield tracker
+        finally:
+            with _global_lock:
+                _global_trackers.remove(tracker)
+    else:
+        token = _current.set(tracker)
+        try:
+            yield tracker
+        finally:
+            _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, nplusone: Optional[int] = None) -> Iterator[QueryTracker]:
+    """Fail when the block runs more than `limit` statements or, with
+    `nplusone`, when any one shape runs more than that many times."""
+    with track_queries(threshold=nplusone or 0, all_threads=True, log=False) as tracker:
+        yield tracker
+    assert tracker.count <= limit, f"expected at most {limit} queries, got {tracker.report()}"
+    assert not tracker.flagged, "N+1 detected:\n" + "\n".join(f"{f}: {s}" for s, f in tracker.flagged.items())
+
+
+class QueryTrackerMiddleware:
+    """Runs each HTTP request as one tracked unit."""
+
+    def __init__(self, app: ASGIApp, threshold: Optional[int] = None):
+        self.app = app
+        self.threshold = threshold
+        install_query_log()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current.set(QueryTracker(self.threshold))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
@@ -1,14 +1,20 @@
 from __future__ import annotations
-from typing import Callable, Generator
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Generator, Optional, Tuple
 from fastapi import Depends, HTTPException, status, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 try:
-    from app.core.db import SessionLocal
+    # permission and user lookups only read
+    from app.core.db import ReadSessionLocal as SessionLocal
 except Exception:
     SessionLocal = None  # type: ignore
 
-from app.core.models import User  # type: ignore
+from app.core.models import User, Permission, user_roles, role_permissions  # type: ignore
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -21,6 +27,114 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# --- effective permissions -----------------------------------------------------
+
+# other workers may change roles, so entries also expire after this many seconds
+CACHE_TTL = 30.0
+CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What the permission checks need to know about a user."""
+    user_id: int
+    is_active: bool
+    is_superuser: bool
+    permissions: FrozenSet[str]
+
+    def has(self, code: str) -> bool:
+        return self.is_superuser or code in self.permissions
+
+
+class PermissionCache:
+    """LRU of Principals keyed by (user id, RBAC version) with a TTL.
+    Bumping the version makes every cached entry stale at once."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Tuple[int, int], Tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        key = (user_id, self.version)
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is None:
+                return None
+            if time.monotonic() - hit[0] >= self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return hit[1]
+
+    def put(self, principal: Principal, version: int) -> None:
+        with self._lock:
+            if version != self.version:
+                return  # loaded before an RBAC change; do not cache
+            key = (principal.user_id, version)
+            self._items[key] = (time.monotonic(), principal)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._items.clear()
+
+
+permission_cache = PermissionCache()
+
+
+def bump_rbac_version() -> None:
+    """Call after any change to roles, permissions or their assignments."""
+    permission_cache.bump()
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """User flags and permission codes of all their roles, in one query."""
+    rows = db.execute(
+        select(User.is_active, User.is_superuser, Permission.code)
+        .select_from(User)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .outerjoin(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+        .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+        .where(User.id == user_id)
+    ).all()
+    if not rows:
+        return None
+    return Principal(
+        user_id=user_id,
+        is_active=bool(rows[0][0]),
+        is_superuser=bool(rows[0][1]),
+        permissions=frozenset(code for _, _, code in rows if code),
+    )
+
+
+def get_principal(db: Session, user_id: int) -> Optional[Principal]:
+    principal = permission_cache.get(user_id)
+    if principal is None:
+        version = permission_cache.version
+        principal = load_principal(db, user_id)
+        if principal is not None:
+            permission_cache.put(principal, version)
+    return principal
+
+
+def _session_user_id(request: Request) -> Optional[int]:
+    user_obj = getattr(request.state, "user", None)
+    if isinstance(user_obj, User):
+        return user_obj.id
+    try:
+        return request.session.get("user_id")
+    except Exception:
+        return None
+
+
+# --- dependencies --------------------------------------------------------------
+
 def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     user_obj = getattr(request.state, "user", None)
     if isinstance(user_obj, User):
@@ -28,12 +142,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
         return user_obj
 
-    user_id = None
-    try:
-        user_id = request.session.get("user_id")
-    except Exception:
-        user_id = None
-
+    user_id = _session_user_id(request)
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
@@ -43,29 +152,30 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
+def current_principal(request: Request, db: Session = Depends(get_db)) -> Principal:
+    # the session is only used (and a connection opened) on a cache miss
+    user_id = _session_user_id(request)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    principal = get_principal(db, user_id)
+    if principal is None or not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+    return principal
+
+
 def require_login() -> Callable[[User], User]:
     def _dep(user: User = Depends(get_current_user)) -> User:
         return user
     return _dep
 
 
-def _user_has_permission(user: User, code: str) -> bool:
-    if getattr(user, "is_superuser", False):
-        return True
-    for role in getattr(user, "roles", []) or []:
-        for perm in getattr(role, "permissions", []) or []:
-            if getattr(perm, "code", None) == code:
-                return True
-    return False
-
-
-def require_permission(code: str) -> Callable[[User], User]:
-    def _dep(user: User = Depends(get_current_user)) -> User:
-        if not _user_has_permission(user, code):
+def require_permission(code: str) -> Callable[[Principal], Principal]:
+    def _dep(principal: Principal = Depends(current_principal)) -> Principal:
+        if not principal.has(code):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        return user
+        return principal
     return _dep
 
 
-def require_perm(code: str) -> Callable[[User], User]:
+def require_perm(code: str) -> Callable[[Principal], Principal]:
     return require_permission(code)
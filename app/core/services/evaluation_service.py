@@ -1,9 +1,10 @@
 from __future__ import annotations
 from typing import Dict, List, Tuple, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, func
+from app.services.scoring_rules import normalize_one
 from app.core.models import (
-    ScoringRule, Score, Criterion, TaskCriterion, Task, Plan, PlanItem
+    ScoringRule, Score, Criterion, TaskCriterion, Task, Plan, PlanItem, position_functions
 )
 
 def normalize_weights(pairs: List[Tuple[int, float]], auto_ids: List[int]) -> Dict[int, float]:
@@ -19,19 +20,9 @@ def normalize_weights(pairs: List[Tuple[int, float]], auto_ids: List[int]) -> Di
         out = {k: v / s for k, v in out.items()}
     return out
 
-def normalize_value(db: Session, scale_type: str, raw_value: Optional[float]) -> float:
-    if raw_value is None:
-        return 0.0
-    # simple defaults; can be extended by ScoringRule
-    if scale_type == "binary":
-        return 1.0 if raw_value >= 1.0 else 0.0
-    if scale_type == "one_to_five":
-        return max(0.0, min(1.0, (raw_value - 1.0) / 4.0))
-    if scale_type == "percent":
-        return max(0.0, min(1.0, raw_value / 100.0))
-    if scale_type == "text_map":
-        return 0.0
-    return max(0.0, min(1.0, float(raw_value)))
+def normalize_value(db: Session, scale_type: str, raw_value: Optional[float], department_id: Optional[int] = None) -> float:
+    # ScoringRule-aware; built-in defaults when no rule exists (see app.services.scoring_rules)
+    return normalize_one(db, raw_value, scale_type, department_id)
 
 # Placeholder aggregation APIs (wire up to your UI/handlers)
 def compute_criterion_score(db: Session, employee_id: int, criterion_id: int) -> float:
@@ -45,3 +36,26 @@ def compute_criterion_score(db: Session, employee_id: int, criterion_id: int) ->
         acc += (sc.normalized if sc and sc.normalized is not None else 0.0) * (tc.weight or 0.0)
     return acc
 
+
+def compute_scores(db: Session, employee_id: int, department_id: Optional[int] = None) -> Dict[str, object]:
+    # cabinet summary, read from the materialised rollups (app.services.score_rollup)
+    from app.services import score_rollup
+    return {
+        "employee_total": score_rollup.employee_total(db, employee_id),
+        "competencies": score_rollup.competency_scores(db, employee_id),
+    }
+
+
+def distance_to_apex(db: Session, employee_id: int, position_id: int) -> Dict[str, object]:
+    # apex-mandatory tasks of the position's functions not scored yet, and the gap of the total to 100%
+    from app.services import score_rollup
+    done = select(Score.task_id).where(Score.employee_id == employee_id, Score.task_id.is_not(None))
+    missing = db.execute(
+        select(func.count(Task.id))
+        .join(position_functions, position_functions.c.function_id == Task.function_id)
+        .where(position_functions.c.position_id == position_id,
+               Task.mandatory_for_apex == True, Task.is_active == True,  # noqa: E712
+               Task.id.not_in(done))
+    ).scalar() or 0
+    total = score_rollup.employee_total(db, employee_id)
+    return {"missing_tasks": int(missing), "score_deficit_pct": max(0.0, 1.0 - total) * 100.0}
@@ -0,0 +1,179 @@
+"""
+Fingerprinted, precompressed static assets.
+
+`python -m scripts.build_static` copies settings.STATIC_DIR into
+settings.STATIC_BUILD_DIR. For every file it writes:
+- the file itself
+- a copy named by its content hash (style.css -> style.1a2b3c4d5e.css)
+- .gz and, when the brotli package is installed, .br variants of the
+  compressible ones
+Logical names map to hashed names in manifest.json.
+
+Templates link assets with `static_url("style.css")`, which resolves through
+the manifest (or returns the plain path when there is no build).
+AssetStaticFiles serves the build:
+- hashed names get a year-long immutable Cache-Control, so repeat page
+  loads fetch nothing
+- plain names are revalidated on every use
+- a .br/.gz twin is sent when the client accepts it
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants only
+    brotli = None
+
+MANIFEST = "manifest.json"
+HASH_LEN = 10
+COMPRESSIBLE = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".html", ".xml", ".ico"}
+MIN_COMPRESS_SIZE = 256  # below this the headers outweigh the savings
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # preference order
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+    stem, dot, ext = name.rpartition(".")
+    return f"{stem}.{digest}.{ext}" if dot and stem else f"{name}.{digest}"
+
+
+def _compress(path: Path, data: bytes) -> None:
+    if path.suffix not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return
+    gz = gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0: identical builds give identical bytes
+    if len(gz) < len(data):
+        path.with_name(path.name + ".gz").write_bytes(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            path.with_name(path.name + ".br").write_bytes(br)
+
+
+def build(source: str, dest: str) -> Dict[str, str]:
+    """Rebuild `dest` from `source`; returns the manifest (logical -> hashed, '/'-separated)."""
+    src, out = Path(source), Path(dest)
+    if out.resolve() == src.resolve() or src.resolve() in out.resolve().parents:
+        raise ValueError("the build directory must not be inside the source directory")
+    tmp = out.with_name(out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    manifest: Dict[str, str] = {}
+    for path in sorted(p for p in src.rglob("*") if p.is_file()):
+        rel = path.relative_to(src)
+        if any(part.startswith(".") for part in rel.parts):
+            continue
+        data = path.read_bytes()
+        hashed = rel.with_name(fingerprint(rel.name, data))
+        for target in (tmp / rel, tmp / hashed):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            _compress(target, data)
+        manifest[rel.as_posix()] = hashed.as_posix()
+    tmp.mkdir(parents=True, exist_ok=True)
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    # swap in the finished build so a running app never sees a half-written one
+    old = out.with_name(out.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if out.exists():
+        out.rename(old)
+    tmp.rename(out)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def load_manifest(directory: str) -> Dict[str, str]:
+    try:
+        return json.loads((Path(directory) / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+_manifest: Optional[Dict[str, str]] = None
+
+
+def static_dir() -> str:
+    """The built directory when a build exists, else the sources."""
+    build_dir = settings.STATIC_BUILD_DIR
+    if build_dir and (Path(build_dir) / MANIFEST).exists():
+        return build_dir
+    return settings.STATIC_DIR
+
+
+def manifest() -> Dict[str, str]:
+    global _manifest
+    if _manifest is None:
+        _manifest = load_manifest(settings.STATIC_BUILD_DIR) if settings.STATIC_BUILD_DIR else {}
+    return _manifest
+
+
+def reload_manifest() -> None:
+    global _manifest
+    _manifest = None
+
+
+def static_url(name: str) -> str:
+    """Template helper: /static URL of an asset, fingerprinted when built."""
+    name = name.lstrip("/")
+    return "/static/" + manifest().get(name, name)
+
+
+class AssetStaticFiles(StaticFiles):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # lookup_path() hands over resolved paths; compare against the resolved root
+        self.root = os.path.realpath(self.directory) if self.directory else ""
+        self.hashed = set(load_manifest(self.root).values()) if self.root else set()
+        # which files have a precompressed twin, found once instead of stat()ing per request
+        self.variants: Dict[str, set] = {}
+        if self.root and os.path.isdir(self.root):
+            for root, _, files in os.walk(self.root):
+                names = set(files)
+                for name in files:
+                    for encoding, suffix in ENCODINGS:
+                        if name + suffix in names:
+                            self.variants.setdefault(os.path.join(root, name), set()).add(encoding)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        available = self.variants.get(full_path, ())
+        response = None
+        if available:
+            accepted = set()
+            for part in request_headers.get("accept-encoding", "").split(","):
+                name, _, params = part.strip().partition(";")
+                if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                    accepted.add(name.strip().lower())
+            for encoding, suffix in ENCODINGS:
+                if encoding in available and encoding in accepted:
+                    variant = full_path + suffix
+                    response = FileResponse(variant, status_code=status_code, stat_result=os.stat(variant),
+                                            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+                                            headers={"Content-Encoding": encoding})
+                    break
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        if available:
+            response.headers["Vary"] = "Accept-Encoding"
+        rel = os.path.relpath(full_path, self.root).replace(os.sep, "/") if self.root else ""
+        response.headers["Cache-Control"] = IMMUTABLE if rel in self.hashed else REVALIDATE
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,195 @@
+"""
+Data-version registry.
+
+One row per entity in `data_versions` counts the committed writes to the
+tables behind it:
+
+    scores  scores, their rollups and the scoring structure (competencies, criteria, tasks, rules)
+    org     departments, positions, employees
+    plans   development plans and their items
+    rbac    users, roles, permissions and their assignments
+
+Any Session flush that touches one of those tables - ORM objects or Core
+DML run through Session.execute - marks the entity; the counters move on the
+session's own connection just before it commits (under a savepoint), so the
+data and its version land together, and no second connection is needed - the
+tuned SQLite writer pool holds exactly one. The rows stay locked only from
+then to the commit. Counters live in the database so every worker agrees on
+them; reads go through a cache that is at most settings.DATA_VERSION_TTL
+seconds old (local commits refresh it). Writes made outside a Session call
+bump_versions() themselves.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.models import DataVersion
+
+log = logging.getLogger(__name__)
+
+ENTITIES = ("scores", "org", "plans", "rbac")
+
+TABLE_ENTITIES = {
+    "scores": "scores", "competencies": "scores", "criteria": "scores", "tasks": "scores",
+    "task_criteria": "scores", "functions": "scores", "position_functions": "scores", "scoring_rules": "scores",
+    "score_task_rollups": "scores", "score_criterion_rollups": "scores", "score_competency_rollups": "scores",
+    "score_total_rollups": "scores",
+    "departments": "org", "positions": "org", "employees": "org",
+    "plans": "plans", "plan_items": "plans",
+    "users": "rbac", "roles": "rbac", "permissions": "rbac", "user_roles": "rbac", "role_permissions": "rbac",
+}
+
+Version = Tuple[int, Optional[datetime]]  # (counter, last change as aware UTC)
+
+
+def _utcnow() -> datetime:
+    # naive UTC, like the CURRENT_TIMESTAMP server default
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DataVersions:
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.DATA_VERSION_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Version] = {}
+        self._loaded_at = float("-inf")
+
+    def load(self, db: Session) -> Dict[str, Version]:
+        rows = {}
+        for entity, version, updated_at in db.execute(
+                select(DataVersion.entity, DataVersion.version, DataVersion.updated_at)):
+            rows[entity] = (version, updated_at.replace(tzinfo=timezone.utc) if updated_at else None)
+        with self._lock:
+            self._rows, self._loaded_at = rows, time.monotonic()
+        return rows
+
+    def snapshot(self, db: Optional[Session] = None) -> Dict[str, Version]:
+        """Every entity's version; opens a read session only when the cache is stale."""
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.ttl:
+                return self._rows
+        if db is not None:
+            return self.load(db)
+        from app.core.db import ReadSessionLocal
+        with ReadSessionLocal() as db:
+            return self.load(db)
+
+    def get(self, entities: Iterable[str], db: Optional[Session] = None) -> Dict[str, Version]:
+        rows = self.snapshot(db)
+        return {e: rows.get(e, (0, None)) for e in entities}
+
+    def bump(self, bind, entities: Iterable[str]) -> None:
+        """Bump in a transaction of its own on `bind` (an Engine)."""
+        entities = sorted(set(entities))
+        if not entities:
+            return
+        try:
+            with bind.begin() as conn:
+                _write(conn, entities)
+        except SQLAlchemyError as exc:
+            # no table yet (an unmigrated database): validators are simply not emitted
+            log.warning("could not bump data versions %s: %s", entities, exc)
+        self.invalidate()
+
+    def bump_in(self, conn, entities: Iterable[str]) -> None:
+        """Bump inside the transaction `conn` is in; a failure rolls back only the bump."""
+        entities = sorted(set(entities))
+        if not entities:
+            return
+        try:
+            with conn.begin_nested():
+                _write(conn, entities)
+        except SQLAlchemyError as exc:
+            log.warning("could not bump data versions %s: %s", entities, exc)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = float("-inf")
+
+
+def _write(conn, entities) -> None:
+    now = _utcnow()
+    done = conn.execute(
+        update(DataVersion).where(DataVersion.entity.in_(entities))
+        .values(version=DataVersion.version + 1, updated_at=now)
+    ).rowcount
+    if done < len(entities):
+        have = set(conn.execute(select(DataVersion.entity).where(DataVersion.entity.in_(entities))).scalars())
+        missing = [e for e in entities if e not in have]
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(DataVersion), [{"entity": e, "version": 1, "updated_at": now} for e in missing])
+        except IntegrityError:
+            pass  # another worker created them first; its bump counts
+
+
+data_versions = DataVersions()
+
+
+def bump_versions(*entities: str, bind=None) -> None:
+    """For writes that bypass Session (raw connections, other processes' imports)."""
+    if bind is None:
+        from app.core.db import engine as bind
+    data_versions.bump(bind, entities)
+
+
+def mark_changed(session: Session, *entities: str) -> None:
+    """Bump these entities when `session` commits."""
+    session.info.setdefault("data_changed", set()).update(entities)
+
+
+def _entity_of(obj) -> Optional[str]:
+    table = getattr(obj, "__table__", None)
+    return TABLE_ENTITIES.get(table.name) if table is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    changed: Set[str] = set()
+    for objs in (session.new, session.dirty, session.deleted):
+        for obj in objs:
+            entity = _entity_of(obj)
+            if entity is not None:
+                changed.add(entity)
+    if changed:
+        mark_changed(session, *changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _core_dml(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        entity = TABLE_ENTITIES.get(getattr(table, "name", None))
+        if entity is not None:
+            mark_changed(state.session, entity)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    # commit() flushes after this hook: flush here so the last changes are counted too
+    session.flush()
+    changed = session.info.pop("data_changed", None)
+    if changed:
+        data_versions.bump_in(session.connection(), changed)
+        session.info["data_bumped"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop("data_bumped", False):
+        data_versions.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("data_changed", None)
+    session.info.pop("data_bumped", None)
@@ -1,4 +1,210 @@
-from openpyxl import Workbook
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook, load_workbook
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.models import Department, Position, Function, Task, position_functions
+
+TASK_COLUMNS = ['department_code','position_name','function_name','task_name','weight','mandatory_for_level','mandatory_for_apex','is_active']
 
 def make_template(path: str):
-    wb = Workbook(); ws = wb.active; ws.title='Tasks'; ws.append(['department_code','position_name','function_name','task_name','weight','mandatory_for_level','mandatory_for_apex','is_active']); wb.save(path)
+    wb = Workbook(); ws = wb.active; ws.title='Tasks'; ws.append(TASK_COLUMNS); wb.save(path)
+
+
+# --- Task catalogue import ---------------------------------------------------
+
+CHUNK_SIZE = 2000       # rows per transaction
+MAX_ERRORS = 1000       # row errors kept in the report (all are counted)
+
+_TRUE = {"1", "true", "yes", "y", "да", "x", "+"}
+_FALSE = {"0", "false", "no", "n", "нет", "-"}
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (sheet row number, message)
+
+    def error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((row, message))
+
+
+def _text(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip()
+
+
+def _flag(v, default: bool) -> bool:
+    s = _text(v).lower()
+    if not s:
+        return default
+    if s in _TRUE:
+        return True
+    if s in _FALSE:
+        return False
+    raise ValueError(f"not a yes/no value: {v!r}")
+
+
+def _rows(path: str) -> Iterator[Tuple[int, tuple]]:
+    """Stream (row number, values) from the Tasks sheet in read-only mode."""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb["Tasks"] if "Tasks" in wb.sheetnames else wb.worksheets[0]
+        it = ws.iter_rows(values_only=True)
+        header = [_text(h).lower() for h in next(it, ())]
+        missing = [c for c in ('department_code', 'task_name') if c not in header]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        pos = [header.index(c) if c in header else None for c in TASK_COLUMNS]
+        for n, values in enumerate(it, start=2):
+            if not values or all(v is None for v in values):
+                continue
+            yield n, tuple(values[i] if i is not None and i < len(values) else None for i in pos)
+    finally:
+        wb.close()
+
+
+class _Catalogue:
+    """In-memory lookups, built once: departments by code, positions and
+    functions by (department, name), tasks by (department, function, name)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.departments = {(c or "").strip().lower(): i for i, c in db.execute(select(Department.id, Department.code))}
+        self.positions = {(d, (n or "").strip().lower()): i for i, d, n in db.execute(select(Position.id, Position.department_id, Position.name))}
+        self.reload_functions()
+        self.links = {(p, f) for p, f in db.execute(select(position_functions.c.position_id, position_functions.c.function_id))}
+        self.tasks = {(d, f, (n or "").strip().lower()): i for i, d, f, n in db.execute(select(Task.id, Task.department_id, Task.function_id, Task.name))}
+
+    def function_id(self, dep_id: int, name: str) -> Optional[int]:
+        if not name:
+            return None
+        key = (dep_id, name.lower())
+        if key not in self.functions:
+            fn = Function(department_id=dep_id, name=name)
+            self.db.add(fn); self.db.flush()
+            self.functions[key] = fn.id
+        return self.functions[key]
+
+    def reload_functions(self) -> None:
+        self.functions = {(d, (n or "").strip().lower()): i for i, d, n in self.db.execute(select(Function.id, Function.department_id, Function.name))}
+
+
+def _parse(cat: _Catalogue, values: tuple) -> Tuple[dict, Optional[int]]:
+    dep_code, pos_name, fn_name, task_name, weight, m_level, m_apex, active = values
+    code = _text(dep_code)
+    if not code:
+        raise ValueError("department_code is empty")
+    dep_id = cat.departments.get(code.lower())
+    if dep_id is None:
+        raise ValueError(f"unknown department_code {code!r}")
+    name = _text(task_name)
+    if not name:
+        raise ValueError("task_name is empty")
+    if len(name) > 200:
+        raise ValueError("task_name is longer than 200 characters")
+    pos_id = None
+    if _text(pos_name):
+        pos_id = cat.positions.get((dep_id, _text(pos_name).lower()))
+        if pos_id is None:
+            raise ValueError(f"unknown position {_text(pos_name)!r} in {code}")
+    try:
+        w = float(weight) if _text(weight) else 0.0
+    except (TypeError, ValueError):
+        raise ValueError(f"weight is not a number: {weight!r}")
+    if w < 0:
+        raise ValueError("weight must not be negative")
+    row = {
+        "department_id": dep_id,
+        "function_name": _text(fn_name),
+        "name": name,
+        "weight": w,
+        "auto_weight": not _text(weight),
+        "mandatory_for_level": _flag(m_level, False),
+        "mandatory_for_apex": _flag(m_apex, False),
+        "is_active": _flag(active, True),
+    }
+    return row, pos_id
+
+
+def _flush(db: Session, cat: _Catalogue, chunk: List[Tuple[int, dict, Optional[int]]], report: ImportReport) -> None:
+    """Upsert one chunk of validated rows in a single transaction."""
+    try:
+        new: Dict[tuple, dict] = {}
+        changed: Dict[int, dict] = {}
+        links = set()
+        for _, row, pos_id in chunk:
+            row = dict(row)
+            fn_id = cat.function_id(row["department_id"], row.pop("function_name"))
+            row["function_id"] = fn_id
+            key = (row["department_id"], fn_id, row["name"].lower())
+            task_id = cat.tasks.get(key)
+            if task_id is None:
+                new[key] = row          # a later duplicate row wins
+            else:
+                changed[task_id] = dict(row, id=task_id)
+            if pos_id is not None and fn_id is not None and (pos_id, fn_id) not in cat.links:
+                links.add((pos_id, fn_id))
+        created: Dict[tuple, int] = {}
+        if new:
+            db.execute(insert(Task), list(new.values()))
+            names = list({r["name"] for r in new.values()})
+            deps = list({r["department_id"] for r in new.values()})
+            for i, d, f, n in db.execute(
+                select(Task.id, Task.department_id, Task.function_id, Task.name)
+                .where(Task.department_id.in_(deps), Task.name.in_(names))
+            ):
+                key = (d, f, n.strip().lower())
+                if key in new:
+                    created[key] = i
+        if changed:
+            db.execute(update(Task), list(changed.values()))
+        if links:
+            db.execute(insert(position_functions), [{"position_id": p, "function_id": f} for p, f in links])
+        db.commit()
+        cat.tasks.update(created)
+        cat.links.update(links)
+        report.inserted += len(new)
+        report.updated += len(changed)
+    except Exception as e:  # noqa: BLE001 - one bad chunk must not stop the import
+        db.rollback()
+        cat.reload_functions()  # drop functions created by the rolled-back chunk
+        for n, _, _ in chunk:
+            report.error(n, f"chunk rolled back: {e}")
+
+
+def import_tasks(db: Session, path: str, chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    """Stream the Tasks sheet of `path` into the task catalogue.
+
+    Rows are validated against lookups built once, then upserted by
+    (department, function, task name) in chunks of `chunk_size`, one
+    transaction per chunk. Invalid rows are reported and skipped.
+    """
+    cat = _Catalogue(db)
+    report = ImportReport()
+    chunk: List[Tuple[int, dict, Optional[int]]] = []
+    for n, values in _rows(path):
+        report.rows += 1
+        try:
+            row, pos_id = _parse(cat, values)
+        except ValueError as e:
+            report.error(n, str(e))
+            continue
+        chunk.append((n, row, pos_id))
+        if len(chunk) >= chunk_size:
+            _flush(db, cat, chunk, report)
+            chunk = []
+    if chunk:
+        _flush(db, cat, chunk, report)
+    return report
@@ -1,83 +1,165 @@
 
 from __future__ import annotations
 
-import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Iterable, Optional
 
-from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi import FastAPI, Response
+from fastapi.responses import RedirectResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
-from app.core.db import Base, engine
-
-app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG)
-
-# --- Static ---
-static_dir = Path(getattr(settings, "STATIC_DIR", "static"))
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-
-# --- Templates (FIX) ---
-templates_dir = Path(getattr(settings, "TEMPLATES_DIR", "templates"))
-# Ensure directory exists or fallback to ./templates
-if not templates_dir.exists():
-    templates_dir = Path("templates")
-app.state.templates = Jinja2Templates(directory=str(templates_dir))
-
-# --- Sessions ---
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.SECRET_KEY,
-    session_cookie=getattr(settings, "SESSION_COOKIE_NAME", "session"),
-    same_site="lax",
-)
-
-# --- DB bootstrap for safety (create tables if missing) ---
-# This is safe with Alembic since CREATE TABLE IF NOT EXISTS logic is used by SQLAlchemy.
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception:
-    # Don't block startup if DB bootstrap fails, let error middleware expose details later
-    if settings.DEBUG:
-        raise
-
-# --- Routers ---
-from app.routers import auth as auth_router  # noqa: E402
-from app.routers import dashboard as dashboard_router  # noqa: E402
-from app.routers import plans as plans_router  # noqa: E402
-from app.routers import matrices as matrices_router  # noqa: E402
-
-app.include_router(auth_router.router)
-app.include_router(dashboard_router.router)
-app.include_router(plans_router.router)
-app.include_router(matrices_router.router)
-
-# --- Simple favicon to avoid 404 noise ---
-from fastapi import Response  # noqa: E402
-@app.get("/favicon.ico", include_in_schema=False)
-async def favicon():
-    return Response(status_code=204)
-
-# --- Error middleware ---
-@app.middleware("http")
-async def error_middleware(request: Request, call_next):
+
+
+# --- DB bootstrap (create tables if missing), only with DB_BOOTSTRAP=true; Alembic owns the schema ---
+def bootstrap_schema() -> None:
+    from app.core import models  # noqa: F401 - registers every table on Base.metadata
+    from app.core.db import Base, engine
+    from app.services import score_rollup
     try:
-        response = await call_next(request)
-        return response
+        Base.metadata.create_all(bind=engine)
+        # rollup tables just created next to existing scores start out empty
+        score_rollup.fill_if_empty(engine)
     except Exception:
+        # Don't block startup if DB bootstrap fails, let error middleware expose details later
         if settings.DEBUG:
             raise
-        return JSONResponse(status_code=500, content={"detail": "Internal server error"})
 
-# --- Root redirect ---
-@app.get("/", include_in_schema=False)
-async def root():
-    return RedirectResponse("/dashboard")
 
-# --- Health ---
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "debug": settings.DEBUG}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.notifications import notification_buffer
+    if settings.DB_BOOTSTRAP:
+        await run_in_threadpool(bootstrap_schema)
+    if settings.TEMPLATE_WARMUP:
+        from app.templates_utils import warm_templates
+        await run_in_threadpool(warm_templates)
+    # one ThreadedSession per reader connection at a time (app.core.db_async)
+    from app.core.db_async import read_session_slots
+    app.state.read_slots = read_session_slots()
+    notification_buffer.start()
+    yield
+    # write out whatever is still buffered
+    await run_in_threadpool(notification_buffer.stop)
+    from app.reports.pdf_batch import shutdown_pool
+    await run_in_threadpool(shutdown_pool)
+
+
+class ErrorMiddleware:
+    """Plain ASGI rather than @app.middleware("http"): that wrapper copies every
+    response body through a memory stream, which long-lived streams pay for."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = False
+
+        async def _send(message: Message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        except Exception:
+            if settings.DEBUG or started:
+                raise
+            await JSONResponse(status_code=500, content={"detail": "Internal server error"})(scope, receive, send)
+
+
+def create_app(routers: Optional[Iterable[str]] = None) -> FastAPI:
+    """Build the application. Nothing touches the database here; router
+    modules are imported only when registered (all of ROUTER_MODULES by default)."""
+    from app.core.db import SessionLocal
+    from app.core.identity import UserLoaderMiddleware, identity_cache
+    from app.routers import include_routers
+    from app.services.score_rollup import track_score_writes
+    from app.templates_utils import templates
+
+    app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG, lifespan=lifespan)
+
+    # --- Static: the fingerprinted build when there is one (scripts.build_static) ---
+    from app.core.static_assets import AssetStaticFiles, reload_manifest, static_dir
+    reload_manifest()
+    if Path(static_dir()).exists():
+        app.mount("/static", AssetStaticFiles(directory=static_dir()), name="static")
+
+    # --- Templates: one shared environment (app.templates_utils) ---
+    app.state.templates = templates
+
+    # --- Score rollups follow every Score write made through SessionLocal ---
+    track_score_writes(SessionLocal)
+
+    # --- Data versions (ETag / Last-Modified) follow every committed write ---
+    from app.core import versions  # noqa: F401 - registers the Session listeners
+
+    # --- Current user (request.state.user); added first so it runs inside the session middleware ---
+    app.add_middleware(UserLoaderMiddleware)
+    app.state.identity_cache = identity_cache
+
+    # --- Sessions ---
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.SECRET_KEY,
+        session_cookie=getattr(settings, "SESSION_COOKIE_NAME", "session"),
+        same_site="lax",
+    )
+
+    # --- Error middleware ---
+    app.add_middleware(ErrorMiddleware)
+
+    # --- Compression: streamed pages chunk by chunk; skips SSE and anything already encoded ---
+    if settings.GZIP_ENABLED:
+        app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=settings.GZIP_LEVEL)
+
+    # --- Slow-query log; each request is one unit for the N+1 detector ---
+    from app.core.querylog import QueryTrackerMiddleware, install_query_log
+    install_query_log()
+    if settings.SQL_NPLUSONE_THRESHOLD:
+        app.add_middleware(QueryTrackerMiddleware)
+
+    # --- Request metrics; added last so it times everything above ---
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import MetricsMiddleware, metrics
+        app.add_middleware(MetricsMiddleware, server_timing=settings.DEBUG)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics_endpoint():
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    # --- Routers ---
+    include_routers(app, routers)
+
+    # --- Simple favicon to avoid 404 noise ---
+    @app.get("/favicon.ico", include_in_schema=False)
+    async def favicon():
+        return Response(status_code=204)
+
+    # --- Root redirect ---
+    @app.get("/", include_in_schema=False)
+    async def root():
+        return RedirectResponse("/dashboard")
+
+    # --- Health ---
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "debug": settings.DEBUG}
+
+    return app
+
+
+# `uvicorn app.main:app` keeps working: the module-level app is built on first access
+def __getattr__(name: str):
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,50 @@
+from itertools import groupby
+import xlsxwriter
+from sqlalchemy import select
+from app.core.models import Employee, Department, Position, Competency, ScoreCompetencyRollup, ScoreTotalRollup
+
+ROWS_PER_FETCH = 2000
+
+def make_company_xlsx(db, path, department_ids=None):
+    """One row per employee, one column per competency, plus total and level.
+
+    Written with xlsxwriter in constant_memory mode from a single streamed
+    query over the score rollups, so memory does not grow with headcount.
+    """
+    comps = db.execute(select(Competency.id, Competency.name).order_by(Competency.name, Competency.id)).all()
+    col = {cid: i for i, (cid, _) in enumerate(comps)}
+
+    stmt = (
+        select(Employee.id, Employee.full_name, Department.name, Position.name, Employee.level,
+               ScoreTotalRollup.total, ScoreCompetencyRollup.competency_id, ScoreCompetencyRollup.score)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(Position, Position.id == Employee.position_id)
+        .outerjoin(ScoreTotalRollup, ScoreTotalRollup.employee_id == Employee.id)
+        .outerjoin(ScoreCompetencyRollup, ScoreCompetencyRollup.employee_id == Employee.id)
+        .order_by(Employee.full_name, Employee.id)
+        .execution_options(yield_per=ROWS_PER_FETCH)
+    )
+    if department_ids:
+        stmt = stmt.where(Employee.department_id.in_(list(department_ids)))
+
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+    ws = wb.add_worksheet("Сотрудники")
+    bold = wb.add_format({"bold": True})
+    num = wb.add_format({"num_format": "0.000"})
+    header = ["ФИО", "Отдел", "Должность", "Уровень", "Итог"] + [name for _, name in comps]
+    ws.write_row(0, 0, header, bold)
+    ws.freeze_panes(1, 1)
+    r = 0
+    for _, rows in groupby(db.execute(stmt), key=lambda row: row[0]):
+        rows = list(rows)
+        _, full_name, dept, pos, level, total, _, _ = rows[0]
+        r += 1
+        ws.write_row(r, 0, [full_name, dept or "", pos or "", level if level is not None else ""])
+        ws.write_number(r, 4, round(total or 0.0, 3), num)
+        scores = [0.0] * len(comps)
+        for *_, comp_id, score in rows:
+            if comp_id in col:
+                scores[col[comp_id]] = round(score or 0.0, 3)
+        ws.write_row(r, 5, scores, num)
+    wb.close()
+    return r
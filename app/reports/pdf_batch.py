@@ -0,0 +1,166 @@
+"""
+Batch rendering of employee profile PDFs.
+
+Scores for every employee are read up front in a few set queries and handed
+to worker processes as plain data, so workers never touch the database.
+Finished PDFs are appended to a ZIP that is streamed as it grows. One pool
+of worker processes serves every request; the lifespan shuts it down.
+"""
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.models import Employee, Department, Position, Competency, ScoreCompetencyRollup
+from app.reports.employee_profile import render_profile_pdf
+
+
+@dataclass
+class ProfileData:
+    employee_id: int
+    full_name: str
+    department: str
+    position: str
+    scores: List[Tuple[str, float]]
+
+    @property
+    def filename(self) -> str:
+        return f"employee_{self.employee_id}.pdf"
+
+
+def collect_profiles(db: Session, department_ids: Optional[Iterable[int]] = None,
+                     employee_ids: Optional[Iterable[int]] = None) -> List[ProfileData]:
+    """Profiles of the selected employees (all when both filters are None)."""
+    stmt = (
+        select(Employee.id, Employee.full_name, Department.name, Position.name)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(Position, Position.id == Employee.position_id)
+        .order_by(Employee.full_name, Employee.id)
+    )
+    scope = select(Employee.id)
+    if department_ids is not None:
+        scope = scope.where(Employee.department_id.in_(list(department_ids)))
+    if employee_ids is not None:
+        scope = scope.where(Employee.id.in_(list(employee_ids)))
+    emps = db.execute(stmt.where(Employee.id.in_(scope))).all()
+    if not emps:
+        return []
+    comps = db.execute(select(Competency.id, Competency.name).order_by(Competency.name, Competency.id)).all()
+    scores = {(e, c): float(s or 0.0) for e, c, s in db.execute(
+        select(ScoreCompetencyRollup.employee_id, ScoreCompetencyRollup.competency_id, ScoreCompetencyRollup.score)
+        .where(ScoreCompetencyRollup.employee_id.in_(scope))
+    )}
+    return [
+        ProfileData(i, name, dep or "", pos or "", [(cn, scores.get((i, ci), 0.0)) for ci, cn in comps])
+        for i, name, dep, pos in emps
+    ]
+
+
+def render_pdf(profile: ProfileData) -> Tuple[str, bytes]:
+    """Worker entry point: (archive name, PDF bytes)."""
+    buf = io.BytesIO()
+    render_profile_pdf(profile.full_name, profile.department, profile.position, profile.scores, buf)
+    return profile.filename, buf.getvalue()
+
+
+def default_workers() -> int:
+    from app.core.config import settings
+    return settings.REPORT_WORKERS or os.cpu_count() or 1
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared render pool, started on first use with default_workers()
+    processes. Workers come from a forkserver (spawn where there is none):
+    a fork of the running server would inherit its threads' held locks."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=default_workers(), mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the shared pool, dropping queued renders; the next batch starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def iter_pdfs(profiles: List[ProfileData], workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """Render profiles, yielding (name, bytes) in completion order.
+    workers=1 renders in the calling process; otherwise the shared pool does,
+    with at most 2 * workers renders of this batch queued at a time, so one
+    large batch does not hold up the others."""
+    workers = min(workers or default_workers(), len(profiles) or 1)
+    if workers <= 1:
+        for p in profiles:
+            yield render_pdf(p)
+        return
+    pool = get_pool()
+    todo = iter(profiles)
+    pending = set()
+    try:
+        while True:
+            pending.update(pool.submit(render_pdf, p) for p in islice(todo, 2 * workers - len(pending)))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+    finally:
+        # GeneratorExit when the download is aborted (or a render failed):
+        # drop the queued jobs instead of rendering them for nobody
+        for fut in pending:
+            fut.cancel()
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only sink; zipfile falls back to data descriptors on it."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.parts.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+def stream_zip(pdfs: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """ZIP archive of (name, bytes) entries, yielded piece by piece."""
+    sink = _Chunks()
+    try:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+            for name, data in pdfs:
+                zf.writestr(name, data)  # PDFs are already compressed
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        # closed early (client gone): stop the producer now rather than whenever it is collected
+        close = getattr(pdfs, "close", None)
+        if close is not None:
+            close()
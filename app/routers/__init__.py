@@ -1 +1,26 @@
-from . import auth, dashboard, plans, matrices  # noqa: F401
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Iterable, Optional
+
+# registered by app.main.create_app, in this order; modules are imported on registration
+ROUTER_MODULES = (
+    "auth",
+    "dashboard",
+    "plans",
+    "matrices",
+    "employee_portal",
+    "notifications",
+    "hr_company",
+    "manager",
+    "reports",
+    "levels",
+    "admin",
+    "admin_rbac",
+    "dept",
+)
+
+
+def include_routers(app, names: Optional[Iterable[str]] = None) -> None:
+    for name in (ROUTER_MODULES if names is None else names):
+        app.include_router(import_module(f"{__name__}.{name}").router)
@@ -13,12 +13,12 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/org", response_class=HTMLResponse, dependencies=[Depends(require_perm("admin.all"))])
 def org_dashboard(request: Request, db: Session = Depends(get_db)):
     departments = db.execute(select(Department).order_by(Department.name)).scalars().all()
-    return templates.TemplateResponse("admin/org.html", {"request": request, "departments": departments, "active_id": None})
+    return templates.TemplateResponse(request, "admin/org.html", {"departments": departments, "active_id": None})
 
 @router.get("/departments", response_class=HTMLResponse, dependencies=[Depends(require_perm("admin.all"))])
 def departments_page(request: Request, db: Session = Depends(get_db)):
     departments = db.execute(select(Department).order_by(Department.name)).scalars().all()
-    return templates.TemplateResponse("admin/departments.html", {"request": request, "departments": departments, "active_id": None})
+    return templates.TemplateResponse(request, "admin/departments.html", {"departments": departments, "active_id": None})
 
 @router.post("/departments/add", dependencies=[Depends(require_perm("admin.all"))])
 def add_department(request: Request, name: str = Form(...), db: Session = Depends(get_db)):
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.core.db import get_db
-from app.core.rbac import require_permission
+from app.core.rbac import require_permission, bump_rbac_version
 from app.core.models import Role, Permission
 
 router = APIRouter(prefix="/admin/rbac", tags=["Admin/RBAC"])
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/admin/rbac", tags=["Admin/RBAC"])
 def rbac_page(request: Request, db: Session = Depends(get_db)):
     roles = db.execute(select(Role)).scalars().all()
     perms = db.execute(select(Permission)).scalars().all()
-    return request.app.state.templates.TemplateResponse("admin/rbac.html", {"request": request, "roles": roles, "perms": perms})
+    return request.app.state.templates.TemplateResponse(request, "admin/rbac.html", {"roles": roles, "perms": perms})
 
 @router.post("/role", dependencies=[Depends(require_permission("admin_all"))])
 def create_role(name: str = Form(...), description: str = Form(""), db: Session = Depends(get_db)):
@@ -22,6 +22,7 @@ def create_role(name: str = Form(...), description: str = Form(""), db: Session
         raise HTTPException(400, "Role already exists")
     r = Role(name=name, description=description, is_system=False)
     db.add(r); db.commit()
+    bump_rbac_version()
     return {"ok": True, "id": r.id}
 
 @router.post("/role/{role_id}/toggle", dependencies=[Depends(require_permission("admin_all"))])
@@ -38,4 +39,5 @@ def toggle_perm(role_id: int, perm_code: str = Form(...), db: Session = Depends(
     else:
         role.permissions.append(perm)
     db.add(role); db.commit()
+    bump_rbac_version()
     return {"ok": True}
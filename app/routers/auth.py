@@ -11,13 +11,13 @@ router = APIRouter()
 
 @router.get("/login")
 def login_form(request: Request):
-    return request.app.state.templates.TemplateResponse("login.html", {"request": request, "error": None})
+    return request.app.state.templates.TemplateResponse(request, "login.html", {"error": None})
 
 @router.post("/login")
 def login(request: Request, username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
     user = db.execute(select(User).where(User.username == username, User.is_active == True)).scalars().first()
     if not user or not bcrypt.verify(password, user.password_hash):
-        return request.app.state.templates.TemplateResponse("login.html", {"request": request, "error": "Неверный логин или пароль"}, status_code=400)
+        return request.app.state.templates.TemplateResponse(request, "login.html", {"error": "Неверный логин или пароль"}, status_code=400)
     request.session["user_id"] = user.id
     resp = RedirectResponse(url="/dashboard", status_code=303)
     return resp
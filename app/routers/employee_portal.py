@@ -1,47 +1,48 @@
 from __future__ import annotations
 from fastapi import APIRouter, Request, Depends, Form
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from app.core.conditional import Conditional, conditional
 from app.core.db import get_db
+from app.core.db_async import get_async_db
 from app.core.rbac import require_login
-from app.core.models import Employee, Plan, PlanItem, Department, Position, EmployeeCompetencyVisibility
+from app.templates_utils import templates
+from app.core.models import Employee, Plan, PlanItem, Department, Position
 from app.core.services.evaluation_service import compute_scores, distance_to_apex
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 def _get_employee_by_user(db: Session, user_id: int) -> Employee | None:
     return db.execute(select(Employee).where(Employee.user_id==user_id)).scalars().first()
 
 @router.get("/me")
-def my_cabinet(request: Request, db: Session = Depends(get_db), user=Depends(require_login)):
-    emp = _get_employee_by_user(db, user.id)
+async def my_cabinet(request: Request, db=Depends(get_async_db), user=Depends(require_login()),
+                     cond: Conditional = Depends(conditional("scores", "org", "plans"))):
+    if cond.fresh:
+        return cond.not_modified()
+    emp = (await db.execute(select(Employee).where(Employee.user_id==user.id))).scalars().first()
     if not emp:
-        return templates.TemplateResponse("employee/empty.html", {"request": request, "msg": "Профиль сотрудника не найден."})
-    dept = db.get(Department, emp.department_id) if emp.department_id else None
-    pos = db.get(Position, emp.position_id) if emp.position_id else None
-    scores = compute_scores(db, emp.id, emp.department_id)
-    apex = distance_to_apex(db, emp.id, emp.position_id) if emp.position_id else {"missing_tasks": 0, "score_deficit_pct": 0.0}
-    return templates.TemplateResponse("employee/cabinet.html", {"request": request, "emp": emp, "dept": dept, "pos": pos, "scores": scores, "apex": apex})
+        return cond.apply(templates.TemplateResponse(request, "employee/empty.html", {"msg": "Профиль сотрудника не найден."}))
+    dept = await db.get(Department, emp.department_id) if emp.department_id else None
+    pos = await db.get(Position, emp.position_id) if emp.position_id else None
+    scores = await db.run_sync(compute_scores, emp.id, emp.department_id)
+    apex = await db.run_sync(distance_to_apex, emp.id, emp.position_id) if emp.position_id else {"missing_tasks": 0, "score_deficit_pct": 0.0}
+    return cond.apply(templates.TemplateResponse(request, "employee/cabinet.html", {"emp": emp, "dept": dept, "pos": pos, "scores": scores, "apex": apex}))
 
 @router.get("/me/plan")
-def my_plan(request: Request, db: Session = Depends(get_db), user=Depends(require_login)):
+def my_plan(request: Request, db: Session = Depends(get_db), user=Depends(require_login())):
     emp = _get_employee_by_user(db, user.id)
     if not emp:
-        return templates.TemplateResponse("employee/empty.html", {"request": request, "msg": "План не найден."})
+        return templates.TemplateResponse(request, "employee/empty.html", {"msg": "План не найден."})
     plan = db.execute(select(Plan).where(Plan.employee_id==emp.id).order_by(Plan.id.desc())).scalars().first()
     if not plan:
-        return templates.TemplateResponse("employee/empty.html", {"request": request, "msg": "Нет активного плана."})
-    vis_ids = {row.competency_id for row in db.execute(select(EmployeeCompetencyVisibility).where(EmployeeCompetencyVisibility.employee_id==emp.id)).scalars().all()}
-    items = db.execute(select(PlanItem).where(PlanItem.plan_id==plan.id)).scalars().all()
-    if vis_ids:
-        items = [it for it in items]  # simplified filter placeholder
+        return templates.TemplateResponse(request, "employee/empty.html", {"msg": "Нет активного плана."})
+    items = db.execute(select(PlanItem).where(PlanItem.plan_id==plan.id, PlanItem.is_visible_to_employee==True)).scalars().all()
     editable = plan.status in ("draft","in_progress")
-    return templates.TemplateResponse("employee/plan.html", {"request": request, "plan": plan, "items": items, "editable": editable})
+    return templates.TemplateResponse(request, "employee/plan.html", {"plan": plan, "items": items, "editable": editable})
 
 @router.post("/me/plan/save")
-def my_plan_save(request: Request, db: Session = Depends(get_db), user=Depends(require_login), plan_id: int = Form(...), item_id: int = Form(...), report_text: str = Form("")):
+def my_plan_save(request: Request, db: Session = Depends(get_db), user=Depends(require_login()), plan_id: int = Form(...), item_id: int = Form(...), report_text: str = Form("")):
     item = db.get(PlanItem, item_id)
     if item and item.plan_id == plan_id:
         item.report_text = report_text
@@ -49,7 +50,7 @@ def my_plan_save(request: Request, db: Session = Depends(get_db), user=Depends(r
     return my_plan(request, db, user)
 
 @router.post("/me/plan/submit")
-def my_plan_submit(request: Request, db: Session = Depends(get_db), user=Depends(require_login), plan_id: int = Form(...)):
+def my_plan_submit(request: Request, db: Session = Depends(get_db), user=Depends(require_login()), plan_id: int = Form(...)):
     plan = db.get(Plan, plan_id)
     if not plan:
         return my_plan(request, db, user)
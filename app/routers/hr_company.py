@@ -1,20 +1,75 @@
 from __future__ import annotations
+from typing import Optional
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from app.core.conditional import Conditional, conditional
+from app.core.config import settings
 from app.core.db import get_db
-from app.core.models import Employee
 from app.core.rbac import require_perm
+from app.services.directory import DirectoryFilter, fetch_page, filter_options
+from app.services.org import get_org
 from app.templates_utils import templates
 
 router = APIRouter(prefix="/company", tags=["company"])
 
+def _opt_int(value: Optional[str]) -> Optional[int]:
+    # empty <select> options arrive as ""
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+def _opt_bool(value: Optional[str]) -> Optional[bool]:
+    if value in (None, ""):
+        return None
+    return value.lower() in ("1", "true", "yes", "on")
+
+def _filters(department_id: Optional[str], position_id: Optional[str], level: Optional[str],
+             active: Optional[str]) -> DirectoryFilter:
+    return DirectoryFilter(_opt_int(department_id), _opt_int(position_id), _opt_int(level), _opt_bool(active))
+
 @router.get("/employees", response_class=HTMLResponse, dependencies=[Depends(require_perm("employees.view"))])
-def employees_page(request: Request, db: Session = Depends(get_db)):
+def employees_page(request: Request, department_id: Optional[str] = None, position_id: Optional[str] = None,
+                   level: Optional[str] = None, active: Optional[str] = None, cursor: Optional[str] = None,
+                   db: Session = Depends(get_db), cond: Conditional = Depends(conditional("org"))):
     # Require login
     user = getattr(request.state, "user", None)
     if not user:
         return RedirectResponse("/login", status_code=303)
-    employees = db.execute(select(Employee).order_by(Employee.last_name, Employee.first_name)).scalars().all()
-    return templates.TemplateResponse("company/employees.html", {"request": request, "employees": employees})
+    if cond.fresh:
+        return cond.not_modified()
+    filters = _filters(department_id, position_id, level, active)
+    employees, next_cursor = fetch_page(db, filters, cursor, settings.DIRECTORY_PAGE_SIZE)
+    departments, positions = filter_options(db)
+    next_url = "/company/employees?" + urlencode({**filters.params(), "cursor": next_cursor}) if next_cursor else None
+    return cond.apply(templates.TemplateResponse(request, "company/employees.html", {
+        "employees": employees, "filters": filters, "next_url": next_url,
+        "departments": departments, "positions": positions,
+    }))
+
+@router.get("/employees.json", dependencies=[Depends(require_perm("employees.view"))])
+def employees_json(department_id: Optional[str] = None, position_id: Optional[str] = None,
+                   level: Optional[str] = None, active: Optional[str] = None, cursor: Optional[str] = None,
+                   limit: Optional[int] = None, db: Session = Depends(get_db),
+                   cond: Conditional = Depends(conditional("org"))):
+    if cond.fresh:
+        return cond.not_modified()
+    limit = max(1, min(limit or settings.DIRECTORY_PAGE_SIZE, settings.DIRECTORY_MAX_PAGE_SIZE))
+    filters = _filters(department_id, position_id, level, active)
+    items, next_cursor = fetch_page(db, filters, cursor, limit)
+    return cond.apply(JSONResponse({"items": items, "next_cursor": next_cursor}))
+
+@router.get("/employees/tree", response_class=HTMLResponse, dependencies=[Depends(require_perm("employees.view"))])
+def employees_tree(request: Request, dept_id: Optional[int] = None, mine: bool = False, db: Session = Depends(get_db),
+                   cond: Conditional = Depends(conditional("org"))):
+    user = getattr(request.state, "user", None)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    if cond.fresh:
+        return cond.not_modified()
+    org = get_org(db)
+    # the whole company, one department's subtree, or the subtrees the user manages
+    roots = [dept_id] if dept_id is not None else (org.managed_roots(user.id) if mine else None)
+    return cond.apply(templates.StreamingTemplateResponse(request, "company/employees_tree.html", org.tree(roots)))
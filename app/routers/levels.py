@@ -12,7 +12,7 @@ router = APIRouter(prefix="/settings", tags=["Settings"])
 @router.get("/levels", dependencies=[Depends(require_permission("manage_levels"))])
 def levels_view(request: Request, db: Session = Depends(get_db)):
     cfg = db.execute(select(LevelConfig)).scalars().first()
-    return request.app.state.templates.TemplateResponse("settings/levels.html", {"request": request, "cfg": cfg})
+    return request.app.state.templates.TemplateResponse(request, "settings/levels.html", {"cfg": cfg})
 
 @router.post("/levels", dependencies=[Depends(require_permission("manage_levels"))])
 def levels_save(L1_threshold: float = Form(0.85), L2_threshold: float = Form(0.60), order_desc: bool = Form(True), db: Session = Depends(get_db)):
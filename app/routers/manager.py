@@ -11,4 +11,4 @@ def probation(request: Request):
     user = getattr(request.state, "user", None)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
-    return templates.TemplateResponse("stub.html", {"request": request, "title": "План испытательного срока", "body": "Здесь будет логика планов."})
+    return templates.TemplateResponse(request, "stub.html", {"title": "План испытательного срока", "body": "Здесь будет логика планов."})
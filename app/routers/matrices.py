@@ -1,26 +1,24 @@
 from __future__ import annotations
-from fastapi import APIRouter, Request, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from app.core.db import get_db
-from app.core.models import User
+from app.core.conditional import Conditional, conditional
+from app.core.db_async import get_async_db
+from app.services.matrix import load_competency_matrix
 
 router = APIRouter(prefix="/matrices", tags=["matrices"])
 
-def _user(request: Request, db: Session):
-    uid = request.session.get("user_id")
-    return db.get(User, uid) if uid else None
-
 @router.get("/competencies")
-def competencies_matrix(request: Request, db: Session = Depends(get_db)):
-    user = _user(request, db)
+async def competencies_matrix(request: Request, department_id: Optional[List[int]] = Query(None), db=Depends(get_async_db),
+                              cond: Conditional = Depends(conditional("scores", "org"))):
+    user = getattr(request.state, "user", None)
     if not user:
         return RedirectResponse("/login", status_code=303)
-    # placeholder data
-    employees = []
-    competencies = []
-    matrix = []
-    return request.app.state.templates.TemplateResponse(
-        "matrices/competencies.html",
-        {"request": request, "user": user, "employees": employees, "competencies": competencies, "matrix": matrix},
-    )
+    if cond.fresh:
+        return cond.not_modified()
+    m = await db.run_sync(load_competency_matrix, department_id or None)
+    return cond.apply(request.app.state.templates.StreamingTemplateResponse(
+        request, "matrices/competencies.html",
+        {"user": user, "employees": m.employees, "competencies": m.competencies, "matrix": m.rows(),
+         "row_versions": m.row_versions(), "scope": ",".join(map(str, sorted(department_id or [])))},
+    ))
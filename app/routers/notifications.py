@@ -1,19 +1,119 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from app.core.db import get_db
-from app.core.models import Notification
-from app.core.rbac import require_perm
+from app.core.config import settings
+from app.core.db import get_db, ReadSessionLocal
+from app.core.querylog import track_queries
+from app.core.db_async import get_async_db
+from app.core.rbac import get_principal, require_perm
+from app.services.notification_hub import notification_hub
+from app.services.notifications import (
+    latest_id, mark_all_read_stmt, mark_read_stmt, page_query, payloads_after, split_page, unread_count, unread_counts,
+)
 from app.templates_utils import templates
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 @router.get("", response_class=HTMLResponse, dependencies=[Depends(require_perm("notifications.view"))])
-def list_notifs(request: Request, db: Session = Depends(get_db)):
+async def list_notifs(request: Request, cursor: Optional[str] = None, db=Depends(get_async_db)):
     user = getattr(request.state, "user", None)
     if not user:
         return RedirectResponse("/login", status_code=303)
-    items = db.execute(select(Notification).where(Notification.user_id==user.id).order_by(Notification.created_at.desc())).scalars().all()
-    return templates.TemplateResponse("notifications.html", {"request": request, "items": items})
+    limit = settings.NOTIFICATIONS_PAGE_SIZE
+    rows = (await db.execute(page_query(user.id, cursor, limit))).scalars().all()
+    items, next_cursor = split_page(rows, limit)
+    unread = await db.run_sync(unread_count, user.id)
+    return templates.TemplateResponse(request, "notifications.html",
+                                      {"items": items, "next_cursor": next_cursor, "unread": unread})
+
+@router.post("/read-all", dependencies=[Depends(require_perm("notifications.view"))])
+def read_all(request: Request, db: Session = Depends(get_db)):
+    user = getattr(request.state, "user", None)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    db.execute(mark_all_read_stmt(user.id))
+    db.commit()
+    unread_counts.set(user.id, 0)
+    notification_hub.publish(user.id, [])
+    return RedirectResponse("/notifications", status_code=303)
+
+@router.post("/{notification_id}/read", dependencies=[Depends(require_perm("notifications.view"))])
+def read_one(request: Request, notification_id: int, db: Session = Depends(get_db)):
+    user = getattr(request.state, "user", None)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    if db.execute(mark_read_stmt(user.id, notification_id)).rowcount:
+        db.commit()
+        unread_counts.add({user.id: -1})
+        notification_hub.publish(user.id, [])
+    return RedirectResponse("/notifications", status_code=303)
+
+# --- live stream (Server-Sent Events) ---
+
+def _read(fn, *args):
+    # each wake-up is its own unit of work for the N+1 detector
+    with track_queries(), ReadSessionLocal() as db:
+        return fn(db, *args)
+
+def _event(name: str, data, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _stream(request: Request, user_id: int, last_id: Optional[int]) -> AsyncIterator[str]:
+    sub = notification_hub.subscribe(user_id)
+    try:
+        yield f"retry: {int(settings.SSE_HEARTBEAT_SECONDS * 1000)}\n\n"
+        resync = last_id is not None  # a reconnect: replay what was missed
+        if last_id is None:
+            last_id = await run_in_threadpool(_read, latest_id, user_id)
+        items, changed = [], True
+        while True:
+            if resync:
+                while True:
+                    batch = await run_in_threadpool(_read, payloads_after, user_id, last_id, settings.SSE_BATCH)
+                    for p in batch:
+                        yield _event("notification", p, p["id"])
+                        last_id = p["id"]
+                    if len(batch) < settings.SSE_BATCH:
+                        break
+            for p in items:
+                if p["id"] > last_id:
+                    yield _event("notification", p, p["id"])
+                    last_id = p["id"]
+            if changed:
+                yield _event("unread", await run_in_threadpool(_read, unread_count, user_id))
+            try:
+                await asyncio.wait_for(sub.wake.wait(), settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+                items, resync, changed = [], False, False
+                continue
+            items, resync, changed = sub.take()
+            changed = changed or bool(items)
+    finally:
+        notification_hub.unsubscribe(sub)
+
+@router.get("/stream")
+async def stream(request: Request, last_event_id: Optional[int] = None):
+    user = getattr(request.state, "user", None)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    # not require_perm: a dependency's session would stay checked out for the whole stream
+    principal = await run_in_threadpool(_read, get_principal, user.id)
+    if principal is None or not principal.is_active or not principal.has("notifications.view"):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        last_event_id = int(header)
+    return StreamingResponse(
+        _stream(request, user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
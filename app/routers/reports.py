@@ -1,24 +1,33 @@
 from __future__ import annotations
+from typing import List, Optional
 from fastapi import APIRouter, Depends, Request, Query
-from fastapi.responses import FileResponse, PlainTextResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 import os, tempfile
 
+from app.core.conditional import Conditional, conditional
 from app.core.db import get_db
 from app.core.rbac import require_permission
 from app.core.models import Employee
 from app.reports.employee_profile import make_employee_profile_pdf
 from app.reports.employee_profile_xlsx import make_employee_profile_xlsx
+from app.reports.company_xlsx import make_company_xlsx
+from app.reports.pdf_batch import collect_profiles, iter_pdfs, stream_zip
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 @router.get("", dependencies=[Depends(require_permission("view_reports"))])
 def reports_index(request: Request):
-    return request.app.state.templates.TemplateResponse("reports/index.html", {"request": request})
+    return request.app.state.templates.TemplateResponse(request, "reports/index.html", {})
 
 @router.get("/employee/{employee_id}", dependencies=[Depends(require_permission("view_reports"))])
-def employee_profile(employee_id: int, fmt: str = Query("pdf"), db: Session = Depends(get_db)):
+def employee_profile(employee_id: int, fmt: str = Query("pdf"), db: Session = Depends(get_db),
+                     cond: Conditional = Depends(conditional("scores", "org", "plans"))):
+    if cond.fresh:
+        # the client's copy is current: no lookup, no regeneration
+        return cond.not_modified()
     emp = db.get(Employee, employee_id)
     if not emp:
         return PlainTextResponse("Employee not found", status_code=404)
@@ -28,4 +37,24 @@ def employee_profile(employee_id: int, fmt: str = Query("pdf"), db: Session = De
         make_employee_profile_pdf(db, emp, path)
     else:
         make_employee_profile_xlsx(db, emp, path)
-    return FileResponse(path, filename=f"employee_{employee_id}.{fmt}")
+    return cond.apply(FileResponse(path, filename=f"employee_{employee_id}.{fmt}",
+                                   background=BackgroundTask(os.remove, path)))
+
+@router.get("/company.xlsx", dependencies=[Depends(require_permission("view_reports"))])
+def company_xlsx(department_id: Optional[List[int]] = Query(None), db: Session = Depends(get_db)):
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    make_company_xlsx(db, path, department_id)
+    # streamed from disk in chunks; the temp file is removed once sent
+    return FileResponse(path, filename="employees.xlsx", background=BackgroundTask(os.remove, path))
+
+@router.get("/profiles.zip", dependencies=[Depends(require_permission("view_reports"))])
+def profiles_zip(department_id: Optional[List[int]] = Query(None), employee_id: Optional[List[int]] = Query(None),
+                 db: Session = Depends(get_db)):
+    if department_id is None and employee_id is None:
+        return PlainTextResponse("department_id or employee_id is required", status_code=400)
+    profiles = collect_profiles(db, department_id, employee_id)
+    if not profiles:
+        return PlainTextResponse("No employees found", status_code=404)
+    return StreamingResponse(stream_zip(iter_pdfs(profiles)), media_type="application/zip",
+                             headers={"Content-Disposition": 'attachment; filename="profiles.zip"'})
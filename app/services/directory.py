@@ -0,0 +1,102 @@
+"""
+Employee directory (/company/employees).
+
+One statement per page: employees outer-joined to their department and
+position names, filtered server-side and ordered by (full_name, id). Pages
+are keyset-paginated on that pair, so page N costs the same as page 1 and
+rows inserted meanwhile do not shift later pages.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.models import Department, Employee, Position
+
+
+@dataclass(frozen=True)
+class DirectoryFilter:
+    department_id: Optional[int] = None
+    position_id: Optional[int] = None
+    level: Optional[int] = None
+    active: Optional[bool] = None  # None: active and inactive
+
+    def params(self) -> dict:
+        """The non-empty filters as query parameters (for next-page links)."""
+        out = {}
+        for key in ("department_id", "position_id", "level"):
+            value = getattr(self, key)
+            if value is not None:
+                out[key] = value
+        if self.active is not None:
+            out["active"] = int(self.active)
+        return out
+
+
+def encode_cursor(full_name: str, employee_id: int) -> str:
+    raw = json.dumps([full_name, employee_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        name, ident = json.loads(raw)
+        return str(name), int(ident)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def page_query(filters: DirectoryFilter = DirectoryFilter(), cursor: Optional[str] = None, limit: int = 50):
+    """By (full_name, id); one extra row tells whether a next page exists."""
+    stmt = (
+        select(Employee.id, Employee.full_name, Employee.level, Employee.is_active,
+               Employee.department_id, Department.name.label("department_name"),
+               Employee.position_id, Position.name.label("position_name"))
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(Position, Position.id == Employee.position_id)
+        .order_by(Employee.full_name, Employee.id)
+        .limit(limit + 1)
+    )
+    if filters.department_id is not None:
+        stmt = stmt.where(Employee.department_id == filters.department_id)
+    if filters.position_id is not None:
+        stmt = stmt.where(Employee.position_id == filters.position_id)
+    if filters.level is not None:
+        stmt = stmt.where(Employee.level == filters.level)
+    if filters.active is not None:
+        stmt = stmt.where(Employee.is_active == filters.active)
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        stmt = stmt.where(tuple_(Employee.full_name, Employee.id) > tuple_(*after))
+    return stmt
+
+
+def _row(r) -> dict:
+    return {"id": r.id, "full_name": r.full_name, "level": r.level, "is_active": bool(r.is_active),
+            "department_id": r.department_id, "department": r.department_name,
+            "position_id": r.position_id, "position": r.position_name}
+
+
+def fetch_page(db: Session, filters: DirectoryFilter = DirectoryFilter(), cursor: Optional[str] = None,
+               limit: int = 50) -> Tuple[List[dict], Optional[str]]:
+    """(rows, next_cursor); next_cursor is None on the last page."""
+    rows = db.execute(page_query(filters, cursor, limit)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return [_row(r) for r in rows], encode_cursor(rows[-1].full_name, rows[-1].id)
+    return [_row(r) for r in rows], None
+
+
+def filter_options(db: Session) -> Tuple[list, list]:
+    """(departments, positions) as (id, name[, department_id]) rows for the filter form."""
+    departments = db.execute(select(Department.id, Department.name).order_by(Department.name)).all()
+    positions = db.execute(
+        select(Position.id, Position.name, Position.department_id).order_by(Position.name, Position.id)
+    ).all()
+    return departments, positions
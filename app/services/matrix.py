@@ -0,0 +1,144 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.models import Employee, Competency, Criterion, TaskCriterion, Score, ScoreCompetencyRollup
+
+
+@dataclass
+class CompetencyMatrix:
+    """Competency x employee score matrix; values[i, j] is the score of
+    employees[j] in competencies[i]."""
+    employees: List[Tuple[int, str]]
+    competencies: List[Tuple[int, str]]
+    values: np.ndarray
+
+    def rows(self) -> List[List[float]]:
+        return self.values.tolist()
+
+    def row_versions(self) -> List[str]:
+        """Digest of each competency row (name and values) for the template
+        fragment cache: a row renders again only when its numbers change."""
+        out = []
+        for (_, name), row in zip(self.competencies, self.values):
+            h = hashlib.blake2b(row.tobytes(), digest_size=12)
+            h.update(name.encode())
+            out.append(h.hexdigest())
+        return out
+
+
+def _index(ids: Iterable[int]) -> dict:
+    return {v: i for i, v in enumerate(ids)}
+
+
+def _scatter(rows, row_idx: dict, col_idx: dict) -> np.ndarray:
+    """Dense (len(row_idx), len(col_idx)) array from (row_id, col_id, value)
+    triples; ids missing from either index are dropped."""
+    out = np.zeros((len(row_idx), len(col_idx)))
+    if not rows:
+        return out
+    # column-wise conversion: np.array over Row objects is an order of magnitude slower
+    row_ids, col_ids, vals = (np.array(col, dtype=float) for col in zip(*rows))
+    r = _positions(row_ids, row_idx)
+    c = _positions(col_ids, col_idx)
+    keep = (r >= 0) & (c >= 0)
+    out[r[keep], c[keep]] = np.nan_to_num(vals[keep])
+    return out
+
+
+def _positions(ids: np.ndarray, idx: dict) -> np.ndarray:
+    ids = np.nan_to_num(ids, nan=-1).astype(np.intp)
+    lookup = np.full(max(max(idx), int(ids.max(initial=0))) + 1, -1, dtype=np.intp)
+    lookup[list(idx)] = list(idx.values())
+    return np.where(ids >= 0, lookup[np.clip(ids, 0, None)], -1)
+
+
+def _axes(db: Session, deps: Optional[List[int]]):
+    emp_stmt = select(Employee.id, Employee.full_name).order_by(Employee.full_name, Employee.id)
+    comp_stmt = select(Competency.id, Competency.name).order_by(Competency.name, Competency.id)
+    if deps is not None:
+        emp_stmt = emp_stmt.where(Employee.department_id.in_(deps))
+        comp_stmt = comp_stmt.where(or_(Competency.department_id.in_(deps), Competency.department_id.is_(None)))
+    return [(i, n) for i, n in db.execute(emp_stmt)], [(i, n) for i, n in db.execute(comp_stmt)]
+
+
+def load_competency_matrix(db: Session, department_ids: Optional[Iterable[int]] = None) -> CompetencyMatrix:
+    """Same matrix as build_competency_matrix, read from score_competency_rollups."""
+    deps = list(department_ids) if department_ids is not None else None
+    employees, competencies = _axes(db, deps)
+    if not employees or not competencies:
+        return CompetencyMatrix(employees, competencies, np.zeros((len(competencies), len(employees))))
+    stmt = select(ScoreCompetencyRollup.competency_id, ScoreCompetencyRollup.employee_id, ScoreCompetencyRollup.score)
+    if deps is not None:
+        stmt = stmt.where(ScoreCompetencyRollup.employee_id.in_(select(Employee.id).where(Employee.department_id.in_(deps))))
+    rows = db.connection().execute(stmt).all()
+    values = _scatter(rows, _index(i for i, _ in competencies), _index(i for i, _ in employees))
+    return CompetencyMatrix(employees, competencies, values)
+
+
+def build_competency_matrix(db: Session, department_ids: Optional[Iterable[int]] = None) -> CompetencyMatrix:
+    """Score every (competency, employee) pair with a handful of set queries and
+    two matrix products.
+
+    employee x task averages (A) times task x competency weights (W) gives the
+    scores of task-linked criteria; criteria without task links contribute
+    employee x criterion direct averages (D) times criterion x competency
+    weights (V). Same numbers as competency_score, cell for cell.
+    """
+    deps = list(department_ids) if department_ids is not None else None
+    employees, competencies = _axes(db, deps)
+    values = np.zeros((len(competencies), len(employees)))
+    if not employees or not competencies:
+        return CompetencyMatrix(employees, competencies, values)
+
+    emp_idx = _index(i for i, _ in employees)
+    comp_idx = _index(i for i, _ in competencies)
+    crits = {cid: (comp_idx[comp_id], float(w or 0.0)) for cid, comp_id, w in db.execute(
+        select(Criterion.id, Criterion.competency_id, Criterion.weight)
+    ) if comp_id in comp_idx}
+    all_links = db.execute(select(TaskCriterion.task_id, TaskCriterion.criterion_id, TaskCriterion.weight)).all()
+    linked_crits = {c for _, c, _ in all_links}
+    links = [(t, c, float(w or 0.0)) for t, c, w in all_links if c in crits]
+    emp_scope = select(Employee.id)
+    if deps is not None:
+        emp_scope = emp_scope.where(Employee.department_id.in_(deps))
+
+    # task x competency weights: TaskCriterion.weight * Criterion.weight
+    task_idx = _index(dict.fromkeys(t for t, _, _ in links))
+    if task_idx:
+        W = np.zeros((len(task_idx), len(competencies)))
+        t_pos = np.fromiter((task_idx[t] for t, _, _ in links), dtype=np.intp, count=len(links))
+        c_pos = np.fromiter((crits[c][0] for _, c, _ in links), dtype=np.intp, count=len(links))
+        w = np.fromiter((tw * crits[c][1] for _, c, tw in links), dtype=float, count=len(links))
+        np.add.at(W, (t_pos, c_pos), w)
+
+        rows = db.connection().execute(
+            select(Score.employee_id, Score.task_id, func.avg(Score.normalized))
+            .where(Score.task_id.is_not(None), Score.employee_id.in_(emp_scope))
+            .group_by(Score.employee_id, Score.task_id)
+        ).all()
+        A = _scatter(rows, emp_idx, task_idx)
+        values += (A @ W).T
+
+    # criteria without task links are scored by their direct averages
+    direct = {c: v for c, v in crits.items() if c not in linked_crits}
+    if direct:
+        crit_idx = _index(direct)
+        V = np.zeros((len(crit_idx), len(competencies)))
+        for c, (ci, cw) in direct.items():
+            V[crit_idx[c], ci] = cw
+        rows = db.connection().execute(
+            select(Score.employee_id, Score.criterion_id, func.avg(Score.normalized))
+            .where(Score.criterion_id.is_not(None), Score.employee_id.in_(emp_scope))
+            .where(Score.criterion_id.not_in(select(TaskCriterion.criterion_id)))
+            .group_by(Score.employee_id, Score.criterion_id)
+        ).all()
+        D = _scatter(rows, emp_idx, crit_idx)
+        values += (D @ V).T
+
+    return CompetencyMatrix(employees, competencies, values)
@@ -0,0 +1,100 @@
+"""
+In-process pub/sub for live notifications (one hub per worker).
+
+Each SSE connection subscribes for its user and gets a Subscription: an
+asyncio.Event plus a bounded deque of notification payloads. publish() may be
+called from any thread (the notification flusher, sync route handlers); it
+hands the payloads to the subscriber's loop with call_soon_threadsafe.
+
+When a subscriber falls more than `maxlen` payloads behind, or a publisher
+has no payloads to give (the rows' ids are unknown), the deque is dropped
+and the subscription is marked lagged; the stream then re-reads the missed
+rows from the notifications table after its last event id. Memory per
+connection therefore stays bounded however slow the client is.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class Subscription:
+    __slots__ = ("user_id", "loop", "maxlen", "wake", "items", "lagged", "unread_changed")
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxlen: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.maxlen = maxlen
+        self.wake = asyncio.Event()
+        self.items: deque = deque()
+        self.lagged = False
+        self.unread_changed = False
+
+    def _push(self, payloads: Optional[List[dict]], unread_changed: bool) -> None:
+        # runs on the subscriber's loop
+        if payloads is None or self.lagged or len(self.items) + len(payloads) > self.maxlen:
+            self.items.clear()
+            self.lagged = True
+        else:
+            self.items.extend(payloads)
+        self.unread_changed = self.unread_changed or unread_changed
+        self.wake.set()
+
+    def take(self) -> Tuple[List[dict], bool, bool]:
+        """(payloads, lagged, unread_changed) since the last call."""
+        items, lagged, changed = list(self.items), self.lagged, self.unread_changed
+        self.items.clear()
+        self.lagged = self.unread_changed = False
+        self.wake.clear()
+        return items, lagged, changed
+
+
+class NotificationHub:
+    def __init__(self, maxlen: Optional[int] = None):
+        self.maxlen = maxlen or settings.SSE_QUEUE_SIZE
+        self._lock = threading.Lock()
+        self._subs: Dict[int, Set[Subscription]] = {}
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Call from the event loop that will consume the subscription."""
+        sub = Subscription(user_id, asyncio.get_running_loop(), self.maxlen)
+        with self._lock:
+            self._subs.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subs
+
+    def publish(self, user_id: int, payloads: Optional[List[dict]] = None, unread_changed: bool = True) -> None:
+        """New notifications (None: some, re-read them) and/or an unread-count change."""
+        with self._lock:
+            subs = list(self._subs.get(user_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._push, payloads, unread_changed)
+            except RuntimeError:  # the loop is gone
+                self.unsubscribe(sub)
+
+    def publish_many(self, by_user: Dict[int, Optional[List[dict]]]) -> None:
+        for user_id, payloads in by_user.items():
+            if user_id in self._subs:
+                self.publish(user_id, payloads)
+
+
+notification_hub = NotificationHub()
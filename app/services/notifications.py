@@ -1,4 +1,352 @@
+"""
+In-app notifications.
+
+notify_in_app() only appends to a write-behind buffer; the buffer bulk-inserts
+Notification rows when it reaches NOTIFY_BATCH_SIZE or every
+NOTIFY_FLUSH_INTERVAL seconds (flusher thread started by the app lifespan).
+Each batch commits on its own. Rows the database refuses (a constraint, a
+value too long) are found by splitting the batch and are logged and
+dropped, so one bad row never holds back the others; when the database
+itself fails the rows stay buffered, up to NOTIFY_MAX_PENDING.
+Unread counts for the header badge are kept per user in `unread_counts`:
+loaded with one COUNT, then moved by flushes and mark-read calls.
+"""
+from __future__ import annotations
+
+import base64
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.models import Notification
+from app.services.notification_hub import notification_hub
+
+log = logging.getLogger(__name__)
+
+MESSAGE_MAX = 500  # Notification.message is String(500)
+
+
+def _utcnow() -> datetime:
+    # naive UTC, like the CURRENT_TIMESTAMP server default
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# --- unread counters -------------------------------------------------------------
+
+class UnreadCounter:
+    """Per-user unread counts. Other workers write too, so entries expire
+    after `ttl`; a count loaded while a flush ran is not cached."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            hit = self._items.get(user_id)
+            if hit is None:
+                return None
+            if time.monotonic() - hit[0] >= self.ttl:
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return hit[1]
+
+    def put(self, user_id: int, count: int, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._items[user_id] = (time.monotonic(), count)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def add(self, deltas: Dict[int, int]) -> None:
+        """Apply count changes to cached users (uncached ones load fresh later)."""
+        with self._lock:
+            self.generation += 1
+            for user_id, delta in deltas.items():
+                hit = self._items.get(user_id)
+                if hit is not None:
+                    self._items[user_id] = (hit[0], max(0, hit[1] + delta))
+
+    def set(self, user_id: int, count: int) -> None:
+        with self._lock:
+            self.generation += 1
+            self._items[user_id] = (time.monotonic(), count)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._items.clear()
+
+
+unread_counts = UnreadCounter()
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    count = unread_counts.get(user_id)
+    if count is None:
+        generation = unread_counts.generation
+        count = db.scalar(
+            select(func.count()).select_from(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == False)  # noqa: E712
+        ) or 0
+        unread_counts.put(user_id, count, generation)
+    return count
+
+
+# --- live payloads -------------------------------------------------------------------
+
+_PAYLOAD_COLUMNS = (Notification.id, Notification.user_id, Notification.message, Notification.created_at,
+                    Notification.is_read)
+
+
+def _payload(n) -> dict:
+    return {"id": n.id, "message": n.message, "is_read": bool(n.is_read),
+            "created_at": n.created_at.isoformat() if n.created_at else None}
+
+
+def latest_id(db: Session, user_id: int) -> int:
+    return db.scalar(select(func.max(Notification.id)).where(Notification.user_id == user_id)) or 0
+
+
+def payloads_after(db: Session, user_id: int, last_id: int, limit: int) -> List[dict]:
+    """Oldest first: what a stream that last saw `last_id` has missed."""
+    rows = db.execute(
+        select(*_PAYLOAD_COLUMNS)
+        .where(Notification.user_id == user_id, Notification.id > last_id)
+        .order_by(Notification.id)
+        .limit(limit)
+    ).all()
+    return [_payload(n) for n in rows]
+
+
+# --- write-behind buffer -----------------------------------------------------------
+
+class NotificationBuffer:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None,
+                 batch_size: Optional[int] = None, interval: Optional[float] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.NOTIFY_BATCH_SIZE
+        self.interval = interval or settings.NOTIFY_FLUSH_INTERVAL
+        self.max_pending = settings.NOTIFY_MAX_PENDING
+        self.dropped = 0  # rows given up on: refused by the database or over max_pending
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time keeps rows in order
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, user_ids: Iterable[int], message: str) -> None:
+        now = _utcnow()
+        rows = [{"user_id": int(u), "message": message[:MESSAGE_MAX], "is_read": False, "created_at": now}
+                for u in dict.fromkeys(user_ids)]
+        with self._lock:
+            self._pending.extend(rows)
+            self._trim()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            try:
+                self.flush()
+            except Exception:
+                # the rows stay buffered for the flusher; the caller's request goes on
+                log.exception("notification flush failed, %d rows buffered", self.pending())
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _trim(self) -> None:
+        # under self._lock
+        over = len(self._pending) - self.max_pending
+        if over > 0:
+            del self._pending[:over]
+            self.dropped += over
+            log.error("notification buffer full: dropped the %d oldest rows", over)
+
+    def _write(self, db: Session, rows: List[dict], returning: bool, payloads: Dict[int, List[dict]],
+               written: List[dict], refused: List[dict]) -> None:
+        """Insert and commit `rows` into `written`. Rows the database refuses
+        are isolated by halving the batch, then logged and moved to `refused`."""
+        try:
+            if returning:
+                inserted = [(n.user_id, _payload(n)) for n in db.execute(insert(Notification).returning(*_PAYLOAD_COLUMNS), rows)]
+            else:
+                db.execute(insert(Notification), rows)
+            db.commit()
+        except (IntegrityError, DataError) as exc:
+            db.rollback()
+            if len(rows) == 1:
+                log.error("dropping notification for user %s: %s", rows[0]["user_id"], exc.orig)
+                refused.append(rows[0])
+                return
+            mid = len(rows) // 2
+            self._write(db, rows[:mid], returning, payloads, written, refused)
+            self._write(db, rows[mid:], returning, payloads, written, refused)
+            return
+        if returning:
+            for user_id, p in inserted:
+                payloads.setdefault(user_id, []).append(p)
+        written.extend(rows)
+
+    def flush(self) -> int:
+        """Insert everything buffered so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            factory = self.session_factory
+            if factory is None:
+                from app.core.db import SessionLocal as factory
+            live = any(notification_hub.has_subscribers(r["user_id"]) for r in rows)
+            payloads: Dict[int, List[dict]] = {}
+            written: List[dict] = []
+            refused: List[dict] = []
+            error = None
+            try:
+                with factory() as db:
+                    # ids are only needed for live streams, and only some backends return them in bulk
+                    returning = live and db.get_bind().dialect.insert_executemany_returning
+                    for i in range(0, len(rows), self.batch_size):
+                        self._write(db, rows[i:i + self.batch_size], returning, payloads, written, refused)
+            except Exception as exc:
+                error = exc
+                settled = {id(r) for r in written + refused}
+                with self._lock:
+                    # keep the rest for the next attempt
+                    self._pending[:0] = [r for r in rows if id(r) not in settled]
+                    self._trim()
+            self.dropped += len(refused)
+            deltas: Dict[int, int] = {}
+            for r in written:
+                deltas[r["user_id"]] = deltas.get(r["user_id"], 0) + 1
+            unread_counts.add(deltas)
+            if live:
+                for user_id in deltas:
+                    # None: the stream re-reads the rows after its last event id
+                    notification_hub.publish(user_id, sorted(payloads[user_id], key=lambda p: p["id"])
+                                             if user_id in payloads else None)
+            if error is not None:
+                raise error
+            return len(written)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                # rows stay buffered; retried on the next tick
+                log.exception("notification flush failed, %d rows buffered", self.pending())
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+notification_buffer = NotificationBuffer()
+
+
 def notify_in_app(user_ids, message: str) -> None:
-    print(f"[notify] to={list(user_ids)}: {message}")
+    notification_buffer.add(user_ids, message)
+
+
 def notify_email(emails, subject: str, body: str) -> None:
     print(f"[email] to={list(emails)}: {subject}")
+
+
+# --- list page ------------------------------------------------------------------------
+
+def encode_cursor(n: Notification) -> str:
+    raw = f"{n.created_at.isoformat()}|{n.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, ident = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(ident)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def page_query(user_id: int, cursor: Optional[str] = None, limit: int = 50):
+    """Newest first by (created_at, id); one extra row tells whether a next page exists."""
+    stmt = (
+        select(Notification)
+        .where(Notification.user_id == user_id)
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
+    )
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) < tuple_(*after))
+    return stmt
+
+
+def split_page(rows: List[Notification], limit: int) -> Tuple[List[Notification], Optional[str]]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def mark_all_read_stmt(user_id: int):
+    return (
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False)  # noqa: E712
+        .values(is_read=True)
+    )
+
+
+def mark_read_stmt(user_id: int, notification_id: int):
+    return (
+        update(Notification)
+        .where(Notification.id == notification_id, Notification.user_id == user_id,
+               Notification.is_read == False)  # noqa: E712
+        .values(is_read=True)
+    )
+
+
+# --- retention --------------------------------------------------------------------------
+
+def purge_read(db: Session, older_than_days: Optional[int] = None, chunk: int = 5000) -> int:
+    """Delete read notifications older than the cutoff, `chunk` rows per
+    transaction so the write lock is never held for long. Returns rows deleted."""
+    days = settings.NOTIFICATIONS_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = _utcnow() - timedelta(days=days)
+    total = 0
+    while True:
+        # ids first: MySQL does not allow LIMIT inside an IN subquery
+        ids = db.execute(
+            select(Notification.id)
+            .where(Notification.is_read == True, Notification.created_at < cutoff)  # noqa: E712
+            .limit(chunk)
+        ).scalars().all()
+        if ids:
+            db.execute(delete(Notification).where(Notification.id.in_(ids)))
+            db.commit()
+        total += len(ids)
+        if len(ids) < chunk:
+            return total
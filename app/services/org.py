@@ -0,0 +1,274 @@
+"""
+Organisation hierarchy index.
+
+Departments nest through Department.parent_id; the ancestor/descendant pairs
+come from one recursive CTE (`closure_query`), the rest from three flat
+selects. The resulting OrgIndex is an immutable snapshot that answers subtree
+membership, headcounts and the company tree page from memory, each in time
+proportional to the subtree asked for.
+
+`org_cache` keeps one snapshot per org version. ORM writes to departments,
+positions or employees bump the version (mapper events below); bulk Core
+writes must call invalidate_org() themselves. The version moves again when
+the writing session commits or rolls back, so a snapshot rebuilt from
+uncommitted rows never outlives the transaction. Other workers write too,
+so a snapshot also expires after `ttl`.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, literal, select
+from sqlalchemy.orm import Session, aliased, object_session
+
+from app.core.models import Department, Employee, Position
+
+# deeper chains are treated as a cycle in parent_id and cut off
+MAX_DEPTH = 32
+
+_builds = itertools.count(1)
+
+
+class OrgDepartment(NamedTuple):
+    id: int
+    name: str
+    parent_id: Optional[int]
+    manager_user_id: Optional[int]
+    is_active: bool
+    depth: int  # 0 for a top-level department
+
+
+class OrgPosition(NamedTuple):
+    id: int
+    title: str  # Position.name
+    department_id: int
+
+
+class OrgEmployee(NamedTuple):
+    id: int
+    full_name: str
+    department_id: Optional[int]
+    position_id: Optional[int]
+    user_id: Optional[int]
+    level: Optional[int]
+    is_active: bool
+
+
+def closure_query(root_id: Optional[int] = None):
+    """(ancestor_id, descendant_id, depth) for every department pair on one
+    branch, itself included at depth 0; with root_id only that subtree."""
+    start = select(Department.id.label("ancestor_id"), Department.id.label("descendant_id"),
+                   literal(0).label("depth"))
+    if root_id is not None:
+        start = start.where(Department.id == root_id)
+    tree = start.cte("org_tree", recursive=True)
+    child = aliased(Department)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .join(child, child.parent_id == tree.c.descendant_id)
+        .where(tree.c.depth < MAX_DEPTH)
+    )
+    return select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+
+
+class OrgIndex:
+    def __init__(self, departments: Iterable[OrgDepartment], positions: Iterable[OrgPosition],
+                 employees: Iterable[OrgEmployee], closure: Iterable[Tuple[int, int, int]], version: int = 0):
+        self.version = version
+        # unique per snapshot (a TTL rebuild keeps the version); fragment caches key on it
+        self.stamp = (version, next(_builds))
+        self.departments: Dict[int, OrgDepartment] = {d.id: d for d in departments}
+        self.positions: Dict[int, OrgPosition] = {p.id: p for p in positions}
+        self.employees: Dict[int, OrgEmployee] = {}
+        self.by_dept: Dict[int, List[OrgEmployee]] = {}
+        for e in employees:  # already ordered by name
+            self.employees[e.id] = e
+            self.by_dept.setdefault(e.department_id, []).append(e)
+
+        # descendants in depth-first order: parents before children, siblings by name
+        children: Dict[Optional[int], List[int]] = {}
+        for d in sorted(self.departments.values(), key=lambda d: (d.name, d.id)):
+            parent = d.parent_id if d.parent_id in self.departments else None
+            children.setdefault(parent, []).append(d.id)
+        self.children = children
+        order: List[int] = []
+        stack = list(reversed(children.get(None, [])))
+        seen = set()
+        while stack:
+            dept_id = stack.pop()
+            if dept_id in seen:
+                continue
+            seen.add(dept_id)
+            order.append(dept_id)
+            stack.extend(reversed(children.get(dept_id, [])))
+        self.order = order
+        position = {dept_id: i for i, dept_id in enumerate(order)}
+
+        self._descendants: Dict[int, List[int]] = {}
+        for ancestor, descendant, _ in closure:
+            if ancestor in self.departments and descendant in self.departments:
+                self._descendants.setdefault(ancestor, []).append(descendant)
+        for ids in self._descendants.values():
+            ids.sort(key=lambda i: position.get(i, len(position)))
+
+        own = {dept_id: sum(1 for e in emps if e.is_active) for dept_id, emps in self.by_dept.items()}
+        self._headcount: Dict[int, int] = {
+            dept_id: sum(own.get(d, 0) for d in ids) for dept_id, ids in self._descendants.items()
+        }
+        self._managed: Dict[int, List[int]] = {}
+        for dept_id in order:
+            manager = self.departments[dept_id].manager_user_id
+            if manager is not None:
+                self._managed.setdefault(manager, []).append(dept_id)
+
+    @classmethod
+    def load(cls, db: Session, version: int = 0) -> "OrgIndex":
+        closure = db.execute(closure_query()).all()
+        depth: Dict[int, int] = {}
+        for _, descendant, d in closure:
+            depth[descendant] = max(depth.get(descendant, 0), d)
+        departments = [
+            OrgDepartment(r.id, r.name, r.parent_id, r.manager_user_id, r.is_active is not False, depth.get(r.id, 0))
+            for r in db.execute(select(Department.id, Department.name, Department.parent_id,
+                                       Department.manager_user_id, Department.is_active))
+        ]
+        positions = [OrgPosition(*r) for r in db.execute(select(Position.id, Position.name, Position.department_id))]
+        employees = [
+            OrgEmployee(r.id, r.full_name, r.department_id, r.position_id, r.user_id, r.level, bool(r.is_active))
+            for r in db.execute(
+                select(Employee.id, Employee.full_name, Employee.department_id, Employee.position_id,
+                       Employee.user_id, Employee.level, Employee.is_active)
+                .order_by(Employee.full_name, Employee.id)
+            )
+        ]
+        return cls(departments, positions, employees, closure, version)
+
+    # --- queries ---------------------------------------------------------------------
+
+    def subtree(self, dept_id: int) -> List[int]:
+        """The department and everything below it, depth first."""
+        return list(self._descendants.get(dept_id, ()))
+
+    def employees_under(self, dept_id: int, active_only: bool = True) -> List[OrgEmployee]:
+        out: List[OrgEmployee] = []
+        for d in self._descendants.get(dept_id, ()):
+            out.extend(e for e in self.by_dept.get(d, ()) if e.is_active or not active_only)
+        return out
+
+    def headcount(self, dept_id: int, subtree: bool = True) -> int:
+        """Active employees in the department (and, with subtree, below it)."""
+        if subtree:
+            return self._headcount.get(dept_id, 0)
+        return sum(1 for e in self.by_dept.get(dept_id, ()) if e.is_active)
+
+    def managed_roots(self, user_id: int) -> List[int]:
+        """Departments the user manages that are not already inside another one they manage."""
+        managed = self._managed.get(user_id, [])
+        inside = {d for root in managed for d in self._descendants.get(root, ())[1:]}
+        return [d for d in managed if d not in inside]
+
+    def employees_managed_by(self, user_id: int, active_only: bool = True) -> List[OrgEmployee]:
+        """Everyone in the subtrees the user manages, except the user."""
+        return [e for root in self.managed_roots(user_id) for e in self.employees_under(root, active_only)
+                if e.user_id != user_id]
+
+    def tree(self, roots: Optional[Iterable[int]] = None) -> dict:
+        """Template context for company/employees_tree.html: the whole company,
+        or the given subtrees. by_dept and positions are shared, not copied."""
+        if roots is None:
+            ids = self.order
+        else:
+            ids, seen = [], set()
+            for root in roots:
+                for d in self._descendants.get(root, ()):
+                    if d not in seen:
+                        seen.add(d)
+                        ids.append(d)
+        return {
+            "depts": [self.departments[d] for d in ids],
+            "by_dept": self.by_dept,
+            "positions": self.positions,
+            "headcount": self._headcount,
+            "org_version": self.stamp,
+        }
+
+
+class OrgCache:
+    """The current OrgIndex, rebuilt after an org write or when older than `ttl`."""
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._entry: Optional[Tuple[float, OrgIndex]] = None
+
+    def _fresh(self) -> Optional[OrgIndex]:
+        entry = self._entry
+        if entry is not None and entry[1].version == self.version and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def get(self, db: Session) -> OrgIndex:
+        index = self._fresh()
+        if index is not None:
+            return index
+        with self._build_lock:  # one rebuild at a time; the others wait for it
+            index = self._fresh()
+            if index is not None:
+                return index
+            version = self.version
+            index = OrgIndex.load(db, version)
+            with self._lock:
+                if version == self.version:  # not invalidated while loading
+                    self._entry = (time.monotonic(), index)
+            return index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entry = None
+
+
+org_cache = OrgCache()
+
+
+def invalidate_org() -> None:
+    """Call after bulk (Core) writes to departments, positions or employees."""
+    org_cache.invalidate()
+
+
+def get_org(db: Session) -> OrgIndex:
+    return org_cache.get(db)
+
+
+@event.listens_for(Department, "after_insert")
+@event.listens_for(Department, "after_update")
+@event.listens_for(Department, "after_delete")
+@event.listens_for(Position, "after_insert")
+@event.listens_for(Position, "after_update")
+@event.listens_for(Position, "after_delete")
+@event.listens_for(Employee, "after_insert")
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def _org_changed(mapper, connection, target) -> None:
+    org_cache.invalidate()
+    session = object_session(target)
+    if session is not None:
+        session.info["org_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _org_committed(session) -> None:
+    # again after commit: a rebuild between flush and commit saw the old rows
+    if session.info.pop("org_changed", False):
+        org_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _org_rolled_back(session) -> None:
+    if session.info.pop("org_changed", False):
+        org_cache.invalidate()
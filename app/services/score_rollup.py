@@ -0,0 +1,242 @@
+"""
+Materialised score rollups.
+
+score_task_rollups       AVG(Score.normalized) per (employee, task)
+score_criterion_rollups  criterion score per (employee, criterion)
+score_competency_rollups competency score per (employee, competency)
+score_total_rollups      total per employee
+
+Rows are recomputed for the (employee, task/criterion) keys touched by a
+Score write and propagated upwards, so reads are single primary-key lookups.
+Sessions opt in with track_score_writes(); bulk writes that bypass the ORM
+call refresh_scores() themselves. Weight or catalogue edits (TaskCriterion,
+Criterion, Competency) are not tracked: run `python -m scripts.rollup_scores`.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, delete, insert, func, event, inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.models import (
+    Competency, Criterion, TaskCriterion, Score,
+    ScoreTaskRollup, ScoreCriterionRollup, ScoreCompetencyRollup, ScoreTotalRollup,
+)
+from app.core.versions import mark_changed
+from app.services.scoring_batch import CHUNK_SIZE, compute_score_tables
+
+_TR = ScoreTaskRollup.__table__
+_CR = ScoreCriterionRollup.__table__
+_KR = ScoreCompetencyRollup.__table__
+_TOT = ScoreTotalRollup.__table__
+
+
+def _refresh(conn: Connection, employee_ids: Optional[List[int]] = None,
+             task_ids: Optional[Set[int]] = None, criterion_ids: Optional[Set[int]] = None,
+             full: bool = False) -> None:
+    """Recompute rollups. With full=True everything is rebuilt; otherwise the
+    given employees are refreshed for the given tasks / directly scored
+    criteria and every criterion, competency and total above them."""
+    def emp(stmt, col):
+        return stmt if employee_ids is None else stmt.where(col.in_(employee_ids))
+
+    # 1. per (employee, task) averages
+    if full or task_ids:
+        stmt = emp(delete(_TR), _TR.c.employee_id)
+        if not full:
+            stmt = stmt.where(_TR.c.task_id.in_(task_ids))
+        conn.execute(stmt)
+        src = emp(
+            select(Score.employee_id, Score.task_id, func.sum(Score.normalized),
+                   func.count(Score.normalized), func.avg(Score.normalized))
+            .where(Score.task_id.is_not(None))
+            .group_by(Score.employee_id, Score.task_id),
+            Score.employee_id,
+        )
+        if not full:
+            src = src.where(Score.task_id.in_(task_ids))
+        conn.execute(insert(_TR).from_select(["employee_id", "task_id", "total", "n", "avg"], src))
+
+    # 2. criteria fed by those tasks, plus directly scored ones
+    if full:
+        crits = None
+    else:
+        crits = set(criterion_ids or ())
+        if task_ids:
+            crits.update(conn.execute(
+                select(TaskCriterion.criterion_id).where(TaskCriterion.task_id.in_(task_ids)).distinct()
+            ).scalars())
+        if not crits:
+            return
+    stmt = emp(delete(_CR), _CR.c.employee_id)
+    if crits is not None:
+        stmt = stmt.where(_CR.c.criterion_id.in_(crits))
+    conn.execute(stmt)
+    linked = emp(
+        select(_TR.c.employee_id, TaskCriterion.criterion_id,
+               func.sum(func.coalesce(TaskCriterion.weight, 0.0) * func.coalesce(_TR.c.avg, 0.0)))
+        .join(TaskCriterion, TaskCriterion.task_id == _TR.c.task_id)
+        .group_by(_TR.c.employee_id, TaskCriterion.criterion_id),
+        _TR.c.employee_id,
+    )
+    direct = emp(
+        select(Score.employee_id, Score.criterion_id, func.coalesce(func.avg(Score.normalized), 0.0))
+        .where(Score.criterion_id.is_not(None))
+        .where(Score.criterion_id.not_in(select(TaskCriterion.criterion_id)))
+        .group_by(Score.employee_id, Score.criterion_id),
+        Score.employee_id,
+    )
+    if crits is not None:
+        linked = linked.where(TaskCriterion.criterion_id.in_(crits))
+        direct = direct.where(Score.criterion_id.in_(crits))
+    for src in (linked, direct):
+        conn.execute(insert(_CR).from_select(["employee_id", "criterion_id", "score"], src))
+
+    # 3. competencies of those criteria
+    comps = None
+    if crits is not None:
+        comps = set(conn.execute(
+            select(Criterion.competency_id).where(Criterion.id.in_(crits), Criterion.competency_id.is_not(None)).distinct()
+        ).scalars())
+    stmt = emp(delete(_KR), _KR.c.employee_id)
+    if comps is not None:
+        stmt = stmt.where(_KR.c.competency_id.in_(comps))
+    conn.execute(stmt)
+    src = emp(
+        select(_CR.c.employee_id, Criterion.competency_id,
+               func.sum(func.coalesce(Criterion.weight, 0.0) * _CR.c.score))
+        .join(Criterion, Criterion.id == _CR.c.criterion_id)
+        .where(Criterion.competency_id.is_not(None))
+        .group_by(_CR.c.employee_id, Criterion.competency_id),
+        _CR.c.employee_id,
+    )
+    if comps is not None:
+        src = src.where(Criterion.competency_id.in_(comps))
+    conn.execute(insert(_KR).from_select(["employee_id", "competency_id", "score"], src))
+
+    # 4. totals: mean over every competency, unscored ones counting as 0
+    conn.execute(emp(delete(_TOT), _TOT.c.employee_id))
+    n = conn.execute(select(func.count(Competency.id))).scalar() or 0
+    if n:
+        src = emp(
+            select(_KR.c.employee_id, func.sum(_KR.c.score) / float(n))
+            .where(_KR.c.competency_id.in_(select(Competency.id)))
+            .group_by(_KR.c.employee_id),
+            _KR.c.employee_id,
+        )
+        conn.execute(insert(_TOT).from_select(["employee_id", "total"], src))
+
+
+def refresh_scores(db: Session, employee_ids: Iterable[int], task_ids: Iterable[Optional[int]] = (),
+                   criterion_ids: Iterable[Optional[int]] = ()) -> None:
+    """Bring rollups up to date after Score rows of these employees were written
+    for these tasks / criteria (ids of None are ignored)."""
+    emps = sorted({e for e in employee_ids if e is not None})
+    tasks = {t for t in task_ids if t is not None}
+    crits = {c for c in criterion_ids if c is not None}
+    if not emps or not (tasks or crits):
+        return
+    conn = db.connection()
+    for i in range(0, len(emps), CHUNK_SIZE):
+        _refresh(conn, emps[i:i + CHUNK_SIZE], tasks, crits)
+    # Core statements on the connection are not seen by the version listeners
+    mark_changed(db, "scores")
+
+
+def rebuild(db: Session) -> None:
+    """Rebuild every rollup table from the scores table."""
+    _refresh(db.connection(), full=True)
+    mark_changed(db, "scores")
+
+
+def fill_if_empty(engine: Engine) -> bool:
+    """Rebuild when there are scores but no rollups yet (tables just created
+    on an existing database); returns whether it did."""
+    with Session(engine) as db:
+        if db.execute(select(_TR.c.employee_id).limit(1)).first() is not None \
+                or db.execute(select(Score.id).limit(1)).first() is None:
+            return False
+        rebuild(db)
+        db.commit()
+        return True
+
+
+def check(db: Session, tolerance: float = 1e-9) -> List[Tuple[str, tuple, float, float]]:
+    """Compare rollups against a from-scratch batch computation.
+    Returns (level, key, expected, stored) for every mismatch."""
+    tables = compute_score_tables(db)
+    out: List[Tuple[str, tuple, float, float]] = []
+
+    def compare(level, expected: Dict, stored: Dict):
+        for key in expected.keys() | stored.keys():
+            a, b = expected.get(key, 0.0), stored.get(key, 0.0)
+            if abs(a - b) > tolerance:
+                out.append((level, key if isinstance(key, tuple) else (key,), a, b))
+
+    compare("criterion", tables.criteria,
+            {(e, c): s for e, c, s in db.execute(select(_CR.c.employee_id, _CR.c.criterion_id, _CR.c.score))})
+    known = set(tables.competency_ids)
+    compare("competency", {k: v for k, v in tables.competencies.items() if k[1] in known},
+            {(e, c): s for e, c, s in db.execute(select(_KR.c.employee_id, _KR.c.competency_id, _KR.c.score)) if c in known})
+    compare("total", tables.totals,
+            {e: t for e, t in db.execute(select(_TOT.c.employee_id, _TOT.c.total))})
+    return out
+
+
+# --- reads -------------------------------------------------------------------
+
+def employee_total(db: Session, employee_id: int) -> float:
+    value = db.execute(select(_TOT.c.total).where(_TOT.c.employee_id == employee_id)).scalar()
+    return float(value or 0.0)
+
+
+def competency_scores(db: Session, employee_id: int) -> Dict[int, float]:
+    """competency_id -> score for one employee (missing competencies score 0.0)."""
+    return {c: float(s) for c, s in db.execute(
+        select(_KR.c.competency_id, _KR.c.score).where(_KR.c.employee_id == employee_id)
+    )}
+
+
+# --- session tracking --------------------------------------------------------
+
+def _score_keys(session: Session) -> Tuple[Set[int], Set[int], Set[int]]:
+    emps: Set[int] = set()
+    tasks: Set[int] = set()
+    crits: Set[int] = set()
+
+    def add(e, t, c):
+        emps.add(e); tasks.add(t); crits.add(c)
+
+    for obj in session.new:
+        if isinstance(obj, Score):
+            add(obj.employee_id, obj.task_id, obj.criterion_id)
+    for obj in session.deleted:
+        if isinstance(obj, Score):
+            add(obj.employee_id, obj.task_id, obj.criterion_id)
+    for obj in session.dirty:
+        if isinstance(obj, Score) and session.is_modified(obj):
+            add(obj.employee_id, obj.task_id, obj.criterion_id)
+            state = inspect(obj)
+            old = {a: state.attrs[a].history.deleted for a in ("employee_id", "task_id", "criterion_id")}
+            if any(old.values()):
+                add((old["employee_id"] or [obj.employee_id])[0],
+                    (old["task_id"] or [obj.task_id])[0],
+                    (old["criterion_id"] or [obj.criterion_id])[0])
+    for s in (emps, tasks, crits):
+        s.discard(None)
+    return emps, tasks, crits
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    emps, tasks, crits = _score_keys(session)
+    if emps:
+        refresh_scores(session, emps, tasks, crits)
+
+
+def track_score_writes(target) -> None:
+    """Keep rollups current on every flush of `target` (a Session, sessionmaker
+    or the Session class)."""
+    if not event.contains(target, "after_flush", _after_flush):
+        event.listen(target, "after_flush", _after_flush)
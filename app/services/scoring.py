@@ -1,54 +1,23 @@
 from __future__ import annotations
 from typing import Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.core.models import (
-    Employee, Competency, Criterion, Task, TaskCriterion, Score, LevelConfig
-)
+from app.core.models import LevelConfig
+from app.services.scoring_rules import normalize_one
+from app.services.scoring_batch import criterion_scores, competency_scores, compute_score_tables
 
 def normalize_value(db: Session, raw_value: float, scale_type: str, department_id: int|None=None) -> float:
-    st = (scale_type or "one_to_five").lower()
-    try:
-        rv = float(raw_value)
-    except Exception:
-        rv = 0.0
-    if st == "one_to_five":
-        return max(0.0, min(1.0, rv / 5.0))
-    if st == "binary":
-        return 1.0 if rv >= 1 else 0.0
-    if st == "percent":
-        return max(0.0, min(1.0, rv / 100.0))
-    return max(0.0, min(1.0, rv))
+    return normalize_one(db, raw_value, scale_type, department_id)
 
 def criterion_score(db: Session, employee_id: int, criterion_id: int) -> float:
-    links = db.execute(select(TaskCriterion.task_id, TaskCriterion.weight).where(TaskCriterion.criterion_id == criterion_id)).all()
-    if not links:
-        row = db.execute(select(func.avg(Score.normalized)).where(Score.employee_id==employee_id, Score.criterion_id==criterion_id)).first()
-        return float(row[0] or 0.0)
-    total = 0.0
-    for task_id, weight in links:
-        norm = db.execute(select(func.avg(Score.normalized)).where(Score.employee_id==employee_id, Score.task_id==task_id)).scalar()
-        total += (weight or 0.0) * float(norm or 0.0)
-    return float(total)
+    return criterion_scores(db, [employee_id], [criterion_id]).get((employee_id, criterion_id), 0.0)
 
 def competency_score(db: Session, employee_id: int, competency_id: int) -> float:
-    crits = db.execute(select(Criterion.id, Criterion.weight).where(Criterion.competency_id==competency_id)).all()
-    if not crits:
-        return 0.0
-    total = 0.0
-    for cid, weight in crits:
-        total += (weight or 0.0) * criterion_score(db, employee_id, cid)
-    return float(total)
+    return competency_scores(db, [employee_id], [competency_id]).get((employee_id, competency_id), 0.0)
 
 def employee_total(db: Session, employee_id: int) -> float:
-    comps = db.execute(select(Competency.id)).scalars().all()
-    if not comps:
-        return 0.0
-    s = 0.0
-    for cid in comps:
-        s += competency_score(db, employee_id, cid)
-    return float(s/len(comps))
+    return compute_score_tables(db, [employee_id]).total(employee_id)
 
 def get_level_config(db: Session) -> Tuple[float, float, bool]:
     cfg = db.execute(select(LevelConfig).limit(1)).scalars().first()
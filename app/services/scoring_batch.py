@@ -0,0 +1,150 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.models import Employee, Competency, Criterion, TaskCriterion, Score
+
+# SQLite limits the number of bound parameters per statement, so long
+# employee lists are processed in chunks (a fixed number of queries per chunk).
+CHUNK_SIZE = 500
+
+
+@dataclass
+class ScoreTables:
+    """Scores for a set of employees: (employee_id, criterion_id) -> score,
+    (employee_id, competency_id) -> score and employee_id -> total."""
+    employee_ids: List[int]
+    competency_ids: List[int]
+    criteria: Dict[Tuple[int, int], float] = field(default_factory=dict)
+    competencies: Dict[Tuple[int, int], float] = field(default_factory=dict)
+    totals: Dict[int, float] = field(default_factory=dict)
+
+    def criterion(self, employee_id: int, criterion_id: int) -> float:
+        return self.criteria.get((employee_id, criterion_id), 0.0)
+
+    def competency(self, employee_id: int, competency_id: int) -> float:
+        return self.competencies.get((employee_id, competency_id), 0.0)
+
+    def total(self, employee_id: int) -> float:
+        return self.totals.get(employee_id, 0.0)
+
+
+def _chunks(ids: Optional[Iterable[int]], size: int = CHUNK_SIZE) -> Iterator[Optional[List[int]]]:
+    if ids is None:
+        yield None
+        return
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def task_averages(employee_ids: Optional[List[int]] = None):
+    """Subquery: AVG(Score.normalized) per (employee_id, task_id)."""
+    stmt = (
+        select(Score.employee_id, Score.task_id, func.avg(Score.normalized).label("avg"))
+        .where(Score.task_id.is_not(None))
+        .group_by(Score.employee_id, Score.task_id)
+    )
+    if employee_ids is not None:
+        stmt = stmt.where(Score.employee_id.in_(employee_ids))
+    return stmt.subquery("task_avg")
+
+
+def criterion_scores(db: Session, employee_ids: Optional[Iterable[int]] = None,
+                     criterion_ids: Optional[Iterable[int]] = None) -> Dict[Tuple[int, int], float]:
+    """Criterion scores for many employees in two grouped queries per chunk.
+
+    A criterion linked to tasks scores SUM(TaskCriterion.weight * task average);
+    a criterion without links falls back to the average of its direct scores.
+    Pairs with nothing scored are omitted (their score is 0.0).
+    """
+    crit_filter = list(criterion_ids) if criterion_ids is not None else None
+    out: Dict[Tuple[int, int], float] = {}
+    for chunk in _chunks(employee_ids):
+        ta = task_averages(chunk)
+        linked = (
+            select(
+                ta.c.employee_id,
+                TaskCriterion.criterion_id,
+                func.sum(func.coalesce(TaskCriterion.weight, 0.0) * func.coalesce(ta.c.avg, 0.0)),
+            )
+            .join(TaskCriterion, TaskCriterion.task_id == ta.c.task_id)
+            .group_by(ta.c.employee_id, TaskCriterion.criterion_id)
+        )
+        direct = (
+            select(Score.employee_id, Score.criterion_id, func.avg(Score.normalized))
+            .where(Score.criterion_id.is_not(None))
+            .where(Score.criterion_id.not_in(select(TaskCriterion.criterion_id)))
+            .group_by(Score.employee_id, Score.criterion_id)
+        )
+        if chunk is not None:
+            direct = direct.where(Score.employee_id.in_(chunk))
+        if crit_filter is not None:
+            linked = linked.where(TaskCriterion.criterion_id.in_(crit_filter))
+            direct = direct.where(Score.criterion_id.in_(crit_filter))
+        for stmt in (linked, direct):
+            for emp_id, crit_id, value in db.execute(stmt):
+                out[(emp_id, crit_id)] = float(value or 0.0)
+    return out
+
+
+def competency_scores(db: Session, employee_ids: Optional[Iterable[int]] = None,
+                      competency_ids: Optional[Iterable[int]] = None) -> Dict[Tuple[int, int], float]:
+    """Competency scores: SUM(Criterion.weight * criterion score) per (employee, competency)."""
+    stmt = select(Criterion.id, Criterion.competency_id, Criterion.weight).where(Criterion.competency_id.is_not(None))
+    if competency_ids is not None:
+        stmt = stmt.where(Criterion.competency_id.in_(list(competency_ids)))
+    crits = {cid: (comp_id, float(weight or 0.0)) for cid, comp_id, weight in db.execute(stmt)}
+    if not crits:
+        return {}
+    crit_scores = criterion_scores(db, employee_ids, crits.keys() if competency_ids is not None else None)
+    out: Dict[Tuple[int, int], float] = {}
+    for (emp_id, crit_id), value in crit_scores.items():
+        meta = crits.get(crit_id)
+        if meta is None:
+            continue
+        comp_id, weight = meta
+        out[(emp_id, comp_id)] = out.get((emp_id, comp_id), 0.0) + weight * value
+    return out
+
+
+def compute_score_tables(db: Session, employee_ids: Optional[Iterable[int]] = None) -> ScoreTables:
+    """Criterion, competency and total scores for the given employees (all when None).
+
+    The total is the mean of competency scores over every competency, unscored
+    competencies counting as 0.0.
+    """
+    if employee_ids is None:
+        emp_ids = list(db.execute(select(Employee.id).order_by(Employee.id)).scalars())
+    else:
+        emp_ids = list(dict.fromkeys(employee_ids))
+    comp_ids = list(db.execute(select(Competency.id).order_by(Competency.id)).scalars())
+    tables = ScoreTables(employee_ids=emp_ids, competency_ids=comp_ids)
+    if not emp_ids:
+        return tables
+
+    crits = {cid: (comp_id, float(weight or 0.0)) for cid, comp_id, weight in db.execute(
+        select(Criterion.id, Criterion.competency_id, Criterion.weight).where(Criterion.competency_id.is_not(None))
+    )}
+    tables.criteria = criterion_scores(db, emp_ids if employee_ids is not None else None)
+    wanted = set(emp_ids)
+    for (emp_id, crit_id), value in tables.criteria.items():
+        meta = crits.get(crit_id)
+        if meta is None or emp_id not in wanted:
+            continue
+        key = (emp_id, meta[0])
+        tables.competencies[key] = tables.competencies.get(key, 0.0) + meta[1] * value
+
+    n = len(comp_ids)
+    known = set(comp_ids)
+    totals = {e: 0.0 for e in emp_ids}
+    if n:
+        for (emp_id, comp_id), value in tables.competencies.items():
+            if comp_id in known:
+                totals[emp_id] += value
+        totals = {e: s / n for e, s in totals.items()}
+    tables.totals = totals
+    return tables
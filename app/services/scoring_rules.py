@@ -0,0 +1,223 @@
+"""
+Compiled ScoringRule normalisers.
+
+Each ScoringRule row (department_id, scale_type, rule_json) is parsed once into
+a CompiledRule and cached per department. rule_json is an object with one of
+
+    {"map": {"A": 1, "B": 0.5, "3": 0.4}}          lookup table (text_map, codes)
+    {"points": [[0, 0], [50, 0.4], [100, 1]]}      piecewise-linear map
+    {"min": 1, "max": 5}                           linear min..max -> 0..1
+    {"threshold": 1}                               binary: value >= threshold -> 1
+
+plus optional "clamp": [lo, hi] (default [0, 1]) and "default" (used for
+missing or unmapped values, default 0). Without a rule the built-in defaults
+below apply. A department rule wins over a global one (department_id NULL).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, event, inspect, or_
+from sqlalchemy.orm import Session, object_session
+
+from app.core.models import ScoringRule
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RULES: Dict[str, Dict[str, Any]] = {
+    "one_to_five": {"min": 1, "max": 5},
+    "binary": {"threshold": 1},
+    "percent": {"min": 0, "max": 100},
+    "text_map": {"map": {}},
+}
+FALLBACK_RULE: Dict[str, Any] = {"min": 0, "max": 1}
+
+# other workers may edit rules, so cached departments are also reloaded after this many seconds
+CACHE_TTL = 60.0
+
+
+def _key(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower()
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class CompiledRule:
+    """Normaliser for one (department, scale_type); call it with a single raw
+    value or use many() for a whole array."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        lo, hi = spec.get("clamp", (0.0, 1.0))
+        self.clamp = (float(lo), float(hi))
+        self.default = float(spec.get("default", 0.0))
+        if "map" in spec:
+            self.kind = "map"
+            self.lookup = {_key(k): float(v) for k, v in spec["map"].items()}
+            numeric = {_to_float(k): v for k, v in spec["map"].items()}
+            if self.lookup and not any(np.isnan(k) for k in numeric):
+                # all keys numeric: vectorised lookup via searchsorted
+                keys = sorted(numeric)
+                self.keys = np.array(keys, dtype=float)
+                self.vals = np.array([float(numeric[k]) for k in keys], dtype=float)
+            else:
+                self.keys = None
+        elif "points" in spec:
+            self.kind = "points"
+            pts = sorted((float(x), float(y)) for x, y in spec["points"])
+            if not pts:
+                raise ValueError("points must not be empty")
+            self.xs = np.array([p[0] for p in pts])
+            self.ys = np.array([p[1] for p in pts])
+        elif "threshold" in spec:
+            self.kind = "threshold"
+            self.threshold = float(spec["threshold"])
+        elif "min" in spec and "max" in spec:
+            self.kind = "linear"
+            self.lo, self.hi = float(spec["min"]), float(spec["max"])
+            if self.hi == self.lo:
+                raise ValueError("min and max must differ")
+        else:
+            raise ValueError(f"unsupported rule: {spec!r}")
+
+    def __call__(self, raw_value: Any) -> float:
+        return float(self.many([raw_value])[0])
+
+    def many(self, raw_values: Iterable[Any]) -> np.ndarray:
+        """Normalise an array of raw values in one vectorised pass."""
+        if self.kind == "map" and self.keys is None:
+            out = np.fromiter(
+                (self.default if v is None else self.lookup.get(_key(v), self.default) for v in raw_values),
+                dtype=float,
+            )
+            return np.clip(out, *self.clamp)
+        x = np.asarray(raw_values, dtype=object)
+        try:
+            x = x.astype(float)
+        except (TypeError, ValueError):
+            x = np.array([_to_float(v) for v in x.ravel()], dtype=float)
+        if self.kind == "map":
+            if len(self.keys):
+                idx = np.clip(np.searchsorted(self.keys, x), 0, len(self.keys) - 1)
+                out = np.where(self.keys[idx] == x, self.vals[idx], self.default)
+            else:
+                out = np.full(x.shape, self.default)
+        elif self.kind == "points":
+            out = np.interp(x, self.xs, self.ys)
+        elif self.kind == "threshold":
+            out = (x >= self.threshold).astype(float)
+        else:
+            out = (x - self.lo) / (self.hi - self.lo)
+        out = np.where(np.isnan(x), self.default, out)
+        return np.clip(out, *self.clamp)
+
+
+def compile_rule(scale_type: str, rule_json: Optional[str] = None) -> CompiledRule:
+    """Compile rule_json, falling back to the built-in rule for scale_type when
+    it is empty or invalid."""
+    default = DEFAULT_RULES.get((scale_type or "").lower(), FALLBACK_RULE)
+    if rule_json:
+        try:
+            spec = json.loads(rule_json)
+            if isinstance(spec, dict):
+                return CompiledRule(spec)
+            raise ValueError("rule_json must be an object")
+        except (ValueError, TypeError) as e:
+            log.warning("invalid ScoringRule for %s: %s", scale_type, e)
+    return CompiledRule(default)
+
+
+class RuleCache:
+    def __init__(self, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rules: Dict[Optional[int], Tuple[float, Dict[str, CompiledRule]]] = {}
+        self._defaults: Dict[str, CompiledRule] = {}
+
+    def _load(self, db: Session, department_id: Optional[int]) -> Dict[str, CompiledRule]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._rules.get(department_id)
+            if hit and now - hit[0] < self.ttl:
+                return hit[1]
+        # one query per department: its own rules and the global ones
+        stmt = select(ScoringRule.department_id, ScoringRule.scale_type, ScoringRule.rule_json)
+        if department_id is None:
+            stmt = stmt.where(ScoringRule.department_id.is_(None))
+        else:
+            stmt = stmt.where(or_(ScoringRule.department_id == department_id, ScoringRule.department_id.is_(None)))
+        rules: Dict[str, CompiledRule] = {}
+        for dep, scale, rule_json in sorted(db.execute(stmt), key=lambda r: r[0] is not None):
+            rules[(scale or "").lower()] = compile_rule(scale, rule_json)
+        with self._lock:
+            self._rules[department_id] = (now, rules)
+        return rules
+
+    def get(self, db: Optional[Session], scale_type: str, department_id: Optional[int] = None) -> CompiledRule:
+        st = (scale_type or "one_to_five").lower()
+        if db is not None:
+            rule = self._load(db, department_id).get(st)
+            if rule is not None:
+                return rule
+        rule = self._defaults.get(st)
+        if rule is None:
+            rule = self._defaults[st] = compile_rule(st)
+        return rule
+
+    def invalidate(self, department_id: Optional[int] = None) -> None:
+        """Drop cached rules of a department; a global rule (None) affects all."""
+        with self._lock:
+            if department_id is None:
+                self._rules.clear()
+            else:
+                self._rules.pop(department_id, None)
+
+
+rule_cache = RuleCache()
+
+
+def get_normalizer(db: Optional[Session], scale_type: str, department_id: Optional[int] = None) -> CompiledRule:
+    return rule_cache.get(db, scale_type, department_id)
+
+
+def normalize_one(db: Optional[Session], raw_value: Any, scale_type: str, department_id: Optional[int] = None) -> float:
+    if raw_value is None:
+        return 0.0
+    return get_normalizer(db, scale_type, department_id)(raw_value)
+
+
+def normalize_many(db: Optional[Session], raw_values: Iterable[Any], scale_type: str,
+                   department_id: Optional[int] = None) -> np.ndarray:
+    return get_normalizer(db, scale_type, department_id).many(raw_values)
+
+
+@event.listens_for(ScoringRule, "after_insert")
+@event.listens_for(ScoringRule, "after_update")
+@event.listens_for(ScoringRule, "after_delete")
+def _rule_changed(mapper, connection, target) -> None:
+    departments = {target.department_id, *(inspect(target).attrs.department_id.history.deleted or ())}
+    for department_id in departments:
+        rule_cache.invalidate(department_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("rules_changed", set()).update(departments)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _rules_settled(session) -> None:
+    # again once settled: a load between flush and commit saw the old rows
+    for department_id in session.info.pop("rules_changed", ()):
+        rule_cache.invalidate(department_id)
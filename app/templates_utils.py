@@ -1,10 +1,144 @@
 from __future__ import annotations
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+import jinja2
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 from starlette.templating import Jinja2Templates
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.fragments import FragmentCacheExtension
+from app.core.static_assets import static_url
+
+log = logging.getLogger(__name__)
+
+APP_TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def _search_path():
+    # settings.TEMPLATES_DIR (./templates), then app/templates; one namespace, so a
+    # name must live in only one of them (tests/test_pages.py checks)
+    root = Path(getattr(settings, "TEMPLATES_DIR", "templates"))
+    if not root.exists():
+        root = Path("templates")
+    return [str(root), str(APP_TEMPLATES_DIR)]
+
+
+def unread_notifications(request) -> int:
+    """Header badge; one COUNT per user until the cached counter expires."""
+    from app.core.db import ReadSessionLocal
+    from app.services.notifications import unread_count, unread_counts
+    user = getattr(request.state, "user", None)
+    if user is None:
+        return 0
+    count = unread_counts.get(user.id)
+    if count is None:
+        with ReadSessionLocal() as db:
+            count = unread_count(db, user.id)
+    return count
+
+
+def _bytecode_cache() -> Optional[jinja2.BytecodeCache]:
+    # compiled templates shared by every worker and kept across restarts
+    directory = settings.TEMPLATE_BYTECODE_DIR
+    if not directory:
+        return None
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return jinja2.FileSystemBytecodeCache(directory)
+
+
+def create_environment() -> jinja2.Environment:
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(_search_path()),
+        autoescape=jinja2.select_autoescape(),
+        bytecode_cache=_bytecode_cache(),
+        extensions=[FragmentCacheExtension],
+        # outside DEBUG templates only change with a deploy: skip the mtime check on every render
+        auto_reload=settings.DEBUG,
+    )
+
+
+def warm_templates(env: Optional[jinja2.Environment] = None) -> int:
+    """Compile every template now (from the bytecode cache when it is warm)
+    rather than on each one's first request; returns how many loaded."""
+    env = env or templates.env
+    loaded = 0
+    for name in env.list_templates(extensions=("html", "txt", "xml")):
+        try:
+            env.get_template(name)
+            loaded += 1
+        except jinja2.TemplateError:
+            log.exception("template %s does not compile", name)
+    return loaded
+
+
+# the page head (stylesheet link, navigation) goes out as soon as this much is rendered
+FIRST_CHUNK = 1024
+
+
+def _chunks(pieces: Iterator[str], size: int) -> Iterator[bytes]:
+    # Template.generate() yields every text run and {{ }} separately: batch them
+    buf, buffered, limit = [], 0, min(FIRST_CHUNK, size)
+    for piece in pieces:
+        buf.append(piece)
+        buffered += len(piece)
+        if buffered >= limit:
+            yield "".join(buf).encode()
+            buf, buffered, limit = [], 0, size
+    if buf:
+        yield "".join(buf).encode()
+
+
+class StreamingTemplateResponse(StreamingResponse):
+    """Sends the page while it renders: memory stays at one chunk instead of
+    the whole document, and the browser gets the head before the last table
+    row exists. The status and headers are committed with the first chunk, so
+    an error while rendering cuts the page off instead of turning into a 500;
+    load everything that can fail before returning this."""
+
+    def __init__(self, template: jinja2.Template, context: Dict[str, Any], status_code: int = 200,
+                 headers: Optional[Mapping[str, str]] = None, media_type: str = "text/html",
+                 background: Optional[BackgroundTask] = None, chunk_size: Optional[int] = None):
+        self.template = template
+        self.context = context
+        # a sync iterator: StreamingResponse renders each chunk in the threadpool
+        chunks = _chunks(template.generate(context), chunk_size or settings.TEMPLATE_STREAM_CHUNK)
+        super().__init__(chunks, status_code, headers, media_type, background)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # like starlette's template response: lets TestClient expose .template / .context
+        if "http.response.debug" in scope.get("extensions", {}):
+            await send({"type": "http.response.debug", "info": {"template": self.template, "context": self.context}})
+        await super().__call__(scope, receive, send)
+
+
+class Templates(Jinja2Templates):
+    def StreamingTemplateResponse(self, request: Request, name: str, context: Optional[Dict[str, Any]] = None,
+                                  status_code: int = 200, headers: Optional[Mapping[str, str]] = None,
+                                  background: Optional[BackgroundTask] = None):
+        """TemplateResponse for large pages; falls back to it when settings.TEMPLATE_STREAMING is off."""
+        if not settings.TEMPLATE_STREAMING:
+            return self.TemplateResponse(request, name, context, status_code, headers, background=background)
+        context = context or {}
+        context.setdefault("request", request)
+        for context_processor in self.context_processors:
+            context.update(context_processor(request))
+        return StreamingTemplateResponse(self.get_template(name), context, status_code, headers,
+                                         background=background)
+
 
 # single templates instance; accessed as request.app.state.templates
-templates = Jinja2Templates(directory="templates")
+templates = Templates(env=create_environment())
+templates.env.globals["unread_notifications"] = unread_notifications
+templates.env.globals["static_url"] = static_url
 
 def get_templates():
     return templates
 
-__all__ = ["templates", "get_templates"]
+__all__ = ["templates", "get_templates", "warm_templates", "StreamingTemplateResponse"]
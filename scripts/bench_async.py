@@ -0,0 +1,123 @@
+"""
+Concurrency benchmark of the hot read endpoints in sync (threadpool) and
+async (AsyncSession) database modes, in-process over ASGI.
+A throwaway SQLite database is seeded in a temp directory.
+Usage:
+    python -m scripts.bench_async [clients,...] [requests per client]
+    python -m scripts.bench_async 50,200,500 4
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+settings = None  # app.core.config.settings, imported after the env is prepared
+
+ENDPOINTS = ["/dashboard", "/me", "/notifications", "/matrices/competencies"]
+
+
+def _prepare_env(tmp: Path) -> None:
+    # must run before anything imports app.core.config
+    os.environ.update(ENV="bench", DEBUG="false", DATABASE_URL=f"sqlite:///{tmp / 'bench.db'}")
+
+
+def _seed(n_emp: int = 200, n_comp: int = 12) -> None:
+    import random
+    from app.core.db import Base, engine, SessionLocal
+    from app.core.models import (
+        User, Department, Position, Employee, Competency, Criterion, Task, TaskCriterion, Score, Notification,
+    )
+    from app.services import score_rollup
+
+    rnd = random.Random(1)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(username="bench", password_hash="-", full_name="Bench", is_active=True, is_superuser=True)
+        dep = Department(name="Bench")
+        db.add_all([user, dep]); db.flush()
+        pos = Position(name="Engineer", department_id=dep.id); db.add(pos); db.flush()
+        emps = [Employee(full_name=f"Сотрудник {i:04d}", department_id=dep.id, position_id=pos.id) for i in range(n_emp)]
+        emps[0].user_id = user.id
+        comps = [Competency(name=f"Компетенция {i:02d}", department_id=dep.id) for i in range(n_comp)]
+        db.add_all(emps + comps); db.flush()
+        crits = [Criterion(competency_id=c.id, department_id=dep.id, weight=1 / 3) for c in comps for _ in range(3)]
+        tasks = [Task(name=f"Задача {i}", department_id=dep.id) for i in range(n_comp * 2)]
+        db.add_all(crits + tasks); db.flush()
+        db.add_all(TaskCriterion(task_id=rnd.choice(tasks).id, criterion_id=c.id, weight=1.0) for c in crits)
+        db.add_all(Score(employee_id=e.id, date=date(2025, 1, 1), task_id=rnd.choice(tasks).id, normalized=rnd.random())
+                   for e in emps for _ in range(10))
+        db.add_all(Notification(user_id=user.id, message=f"Уведомление {i}") for i in range(30))
+        db.flush()
+        score_rollup.rebuild(db)
+        db.commit()
+
+
+def _session_cookie(data: dict) -> str:
+    # same encoding as starlette's SessionMiddleware, so no password check is needed
+    import json
+    from base64 import b64encode
+    from itsdangerous import TimestampSigner
+    return TimestampSigner(str(settings.SECRET_KEY)).sign(b64encode(json.dumps(data).encode())).decode()
+
+
+async def _run(app, clients: int, per_client: int):
+    try:
+        import httpx2 as httpx
+    except ImportError:
+        import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    cookies = {settings.SESSION_COOKIE_NAME: _session_cookie({"user_id": 1})}
+
+    latencies, errors = [], 0
+
+    async def client(i: int):
+        nonlocal errors
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=cookies) as c:
+            for k in range(per_client):
+                url = ENDPOINTS[(i + k) % len(ENDPOINTS)]
+                t0 = time.perf_counter()
+                r = await c.get(url)
+                latencies.append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    return len(latencies) / wall, p(0.5), p(0.95), errors
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    levels = [int(x) for x in argv[0].split(",")] if argv else [50, 200, 500]
+    per_client = int(argv[1]) if len(argv) > 1 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        global settings
+        _prepare_env(Path(tmp))
+        from app.core.config import settings
+        _seed()
+        from app.main import app
+        print(f"[bench] {per_client} requests per client over {', '.join(ENDPOINTS)}")
+        asyncio.run(_bench(app, levels, per_client))
+    return 0
+
+
+async def _bench(app, levels, per_client: int) -> None:
+    # one event loop throughout: pooled aiosqlite connections are bound to it
+    for mode in ("sync", "async"):
+        settings.DB_ASYNC = mode == "async"
+        for n in levels:
+            rps, p50, p95, errors = await _run(app, n, per_client)
+            print(f"[bench] {mode:<5} clients={n:<4} {rps:8.1f} req/s  p50={p50:7.1f}ms  p95={p95:7.1f}ms  errors={errors}")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""
+Throughput of batch profile PDF rendering versus worker count.
+Profiles are synthetic, so no database is needed.
+Usage:
+    python -m scripts.bench_pdf_batch [profiles] [competencies] [workers,...]
+    python -m scripts.bench_pdf_batch 400 40 1,2,4,8
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+from app.core.config import settings
+from app.reports.pdf_batch import ProfileData, iter_pdfs, shutdown_pool, stream_zip
+
+
+def make_profiles(n: int, n_comp: int, seed: int = 1):
+    rnd = random.Random(seed)
+    comps = [f"Компетенция {i}" for i in range(n_comp)]
+    return [
+        ProfileData(i, f"Сотрудник {i}", "Отдел", "Должность", [(c, rnd.random()) for c in comps])
+        for i in range(1, n + 1)
+    ]
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if len(argv) > 0 else 400
+    n_comp = int(argv[1]) if len(argv) > 1 else 40
+    cpus = os.cpu_count() or 1
+    workers = [int(w) for w in argv[2].split(",")] if len(argv) > 2 else sorted({1, 2, 4, cpus})
+    profiles = make_profiles(n, n_comp)
+    settings.REPORT_WORKERS = max(workers)  # size of the shared pool; fewer workers use part of it
+    print(f"[bench] {n} profiles x {n_comp} competencies, {cpus} CPUs")
+    if max(workers) > 1:
+        list(iter_pdfs(profiles[:max(workers)], max(workers)))  # start the shared pool outside the timings
+    base = None
+    for w in workers:
+        t0 = time.perf_counter()
+        size = sum(len(part) for part in stream_zip(iter_pdfs(profiles, w)))
+        dt = time.perf_counter() - t0
+        rate = n / dt
+        base = base or rate
+        print(f"[bench] workers={w:<3} {dt:7.2f}s {rate:8.1f} PDF/s  x{rate / base:4.2f}  zip={size // 1024} KiB")
+    shutdown_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
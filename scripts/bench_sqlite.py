@@ -0,0 +1,117 @@
+"""
+Mixed read/write throughput on SQLite with and without the production
+profile (SQLITE_TUNED: WAL, PRAGMAs, single writer + read-only pool).
+Readers load the competency matrix and single-employee rollups; writers add
+Score rows through tracked sessions (rollups refreshed on flush).
+Usage:
+    python -m scripts.bench_sqlite [readers] [writers] [seconds]
+    python -m scripts.bench_sqlite 8 2 10
+"""
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base, make_engines
+from app.core.models import Department, Employee, Competency, Criterion, Task, TaskCriterion, Score
+from app.services import score_rollup
+from app.services.matrix import load_competency_matrix
+
+
+def _seed(url: str, n_emp: int = 500, n_comp: int = 20) -> None:
+    rnd = random.Random(1)
+    writer, _ = make_engines(url)
+    Base.metadata.create_all(writer)
+    with sessionmaker(bind=writer)() as db:
+        dep = Department(name="Bench"); db.add(dep); db.flush()
+        emps = [Employee(full_name=f"E{i:04d}", department_id=dep.id) for i in range(n_emp)]
+        comps = [Competency(name=f"C{i:02d}", department_id=dep.id) for i in range(n_comp)]
+        db.add_all(emps + comps); db.flush()
+        crits = [Criterion(competency_id=c.id, department_id=dep.id, weight=1 / 3) for c in comps for _ in range(3)]
+        tasks = [Task(name=f"T{i}", department_id=dep.id) for i in range(n_comp * 2)]
+        db.add_all(crits + tasks); db.flush()
+        db.add_all(TaskCriterion(task_id=rnd.choice(tasks).id, criterion_id=c.id, weight=1.0) for c in crits)
+        db.add_all(Score(employee_id=e.id, date=date(2025, 1, 1), task_id=rnd.choice(tasks).id, normalized=rnd.random())
+                   for e in emps for _ in range(20))
+        db.flush()
+        score_rollup.rebuild(db)
+        db.commit()
+    writer.dispose()
+
+
+def _run(url: str, tuned: bool, readers: int, writers: int, seconds: float):
+    writer, reader = make_engines(url, tuned=tuned)
+    Writes = sessionmaker(bind=writer)
+    Reads = sessionmaker(bind=reader)
+    score_rollup.track_score_writes(Writes)
+    with Reads() as db:
+        emp_ids = [e for e, in db.query(Employee.id)]
+        task_ids = [t for t, in db.query(Task.id)]
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def read_loop(seed):
+        rnd = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with Reads() as db:
+                    if rnd.random() < 0.2:
+                        load_competency_matrix(db)
+                    else:
+                        score_rollup.competency_scores(db, rnd.choice(emp_ids))
+                bump("reads")
+            except Exception:  # noqa: BLE001 - counted, e.g. "database is locked"
+                bump("errors")
+
+    def write_loop(seed):
+        rnd = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with Writes() as db:
+                    db.add(Score(employee_id=rnd.choice(emp_ids), date=date(2025, 2, 1),
+                                 task_id=rnd.choice(task_ids), normalized=rnd.random()))
+                    db.commit()
+                bump("writes")
+            except Exception:  # noqa: BLE001
+                bump("errors")
+
+    threads = [threading.Thread(target=read_loop, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=write_loop, args=(1000 + i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.dispose(); reader.dispose()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    readers = int(argv[0]) if len(argv) > 0 else 8
+    writers = int(argv[1]) if len(argv) > 1 else 2
+    seconds = float(argv[2]) if len(argv) > 2 else 10.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for tuned in (False, True):
+            url = f"sqlite:///{Path(tmp) / f'bench_{int(tuned)}.db'}"
+            _seed(url)
+            r = _run(url, tuned, readers, writers, seconds)
+            label = "tuned  " if tuned else "default"
+            print(f"[bench] {label} readers={readers} writers={writers}: "
+                  f"{r['reads']:8.1f} reads/s {r['writes']:8.1f} writes/s {r['errors']:6.1f} errors/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""
+Time to first byte and peak memory of the competency matrix page, rendered
+in full (TemplateResponse) and streamed (StreamingTemplateResponse), with and
+without gzip. Requests go straight to the ASGI app, so the first body chunk
+is observed when the app sends it. A throwaway SQLite database with N
+employees is seeded in a temp directory; the fragment cache is cleared
+before every request so each one renders every row.
+Usage:
+    python -m scripts.bench_stream [employees] [rounds]
+    python -m scripts.bench_stream 5000 5
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from scripts.bench_async import _prepare_env, _seed, _session_cookie
+
+PATH = "/matrices/competencies"
+
+
+async def _get(app, cookie: str, encoding: str):
+    """(status, seconds to first body byte, seconds total, body bytes)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": PATH, "raw_path": PATH.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"cookie", cookie.encode()), (b"accept-encoding", encoding.encode())],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    finished = asyncio.Event()
+    requested = False
+    status, first, size = 0, None, 0
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()  # the response listens for a disconnect meanwhile
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, first, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first is None:
+                first = time.perf_counter()
+            size += len(message["body"])
+
+    t0 = time.perf_counter()
+    await app(scope, receive, send)
+    finished.set()
+    return status, (first or time.perf_counter()) - t0, time.perf_counter() - t0, size
+
+
+_loaded = {}
+
+
+def _track_render(matrices) -> None:
+    """Render peak = the peak after the matrix is loaded, over what was held then."""
+    load = matrices.load_competency_matrix
+
+    def traced(*args, **kwargs):
+        m = load(*args, **kwargs)
+        if tracemalloc.is_tracing():
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _loaded["render_peak"] = lambda: tracemalloc.get_traced_memory()[1] - held
+        return m
+    matrices.load_competency_matrix = traced
+
+
+async def _bench(app, rounds: int) -> None:
+    from app.core.config import settings
+    from app.core.fragments import fragment_cache
+
+    cookie = f"{settings.SESSION_COOKIE_NAME}={_session_cookie({'user_id': 1})}"
+    await _get(app, cookie, "identity")  # compile the template, fill the caches
+    for streaming in (False, True):
+        settings.TEMPLATE_STREAMING = streaming
+        for encoding in ("identity", "gzip"):
+            ttfb, total = [], []
+            for _ in range(rounds):
+                fragment_cache.clear()
+                status, first, took, size = await _get(app, cookie, encoding)
+                assert status == 200, status
+                ttfb.append(first)
+                total.append(took)
+            # traced separately: tracemalloc slows rendering several times over
+            fragment_cache.clear()
+            tracemalloc.start()
+            await _get(app, cookie, encoding)
+            peak, render_peak = tracemalloc.get_traced_memory()[1], _loaded["render_peak"]()
+            tracemalloc.stop()
+            mode = "streamed" if streaming else "buffered"
+            print(f"[bench] {mode:<8} {encoding:<8} ttfb={statistics.median(ttfb) * 1000:7.1f}ms  "
+                  f"total={statistics.median(total) * 1000:7.1f}ms  peak={peak / 2**20:6.1f}MiB  "
+                  f"render peak={render_peak / 2**20:6.1f}MiB  body={size / 1024:7.0f}KiB")
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    n_emp = int(argv[0]) if argv else 5000
+    rounds = int(argv[1]) if len(argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare_env(Path(tmp))
+        import scripts.bench_async as bench_async
+        from app.core.config import settings
+        bench_async.settings = settings  # _session_cookie reads the module global
+        _seed(n_emp=n_emp)
+        from app.main import create_app
+        from app.routers import matrices
+        _track_render(matrices)
+        app = create_app()
+        print(f"[bench] {PATH}: {n_emp} employees, median of {rounds}")
+        asyncio.run(_bench(app, rounds))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,32 @@
+"""
+Build fingerprinted, precompressed static assets for production.
+Writes STATIC_BUILD_DIR from STATIC_DIR: hashed copies, .gz/.br variants
+(.br needs the brotli package) and manifest.json; restart the app after.
+Usage:
+    python -m scripts.build_static                 # settings.STATIC_DIR -> settings.STATIC_BUILD_DIR
+    python -m scripts.build_static SRC DEST
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from app.core.config import settings
+from app.core.static_assets import brotli, build
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    source = argv[0] if argv else settings.STATIC_DIR
+    dest = argv[1] if len(argv) > 1 else settings.STATIC_BUILD_DIR
+    t0 = time.perf_counter()
+    manifest = build(source, dest)
+    print(f"[static] {len(manifest)} assets {source} -> {dest} in {time.perf_counter() - t0:.2f}s"
+          f"{'' if brotli is not None else ' (no brotli package: gzip variants only)'}")
+    for name, hashed in sorted(manifest.items()):
+        print(f"  {name} -> {hashed}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
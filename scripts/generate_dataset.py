@@ -0,0 +1,317 @@
+"""
+Generate a synthetic organisation for load tests and benchmarks.
+Deterministic for a given seed and scale; rows are bulk-inserted in chunked
+transactions with explicit ids, then score rollups are rebuilt.
+Usage:
+    python -m scripts.generate_dataset [--db data/synthetic.db | --url URL] [--seed 1]
+        [--departments 50] [--employees 20000] [--scores 1000000] [--years 3]
+        [--notifications 100000] [--chunk 50000] [--no-rollups] [--force]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.db import Base
+from app.core.models import (
+    User, Role, Permission, user_roles, role_permissions, Department, Position, Employee, Function, position_functions,
+    Competency, Criterion, Task, TaskCriterion, Score, LevelConfig, Plan, PlanItem, Notification,
+)
+from app.services import score_rollup
+
+CHUNK_SIZE = 50_000
+END_DATE = date(2025, 12, 31)  # fixed, so datasets do not depend on the day they are built
+
+
+@dataclass
+class Scale:
+    departments: int = 50
+    employees: int = 20_000
+    positions_per_department: int = 5
+    functions_per_department: int = 4
+    tasks_per_function: int = 6
+    competencies_per_department: int = 8
+    criteria_per_competency: int = 4
+    scores: int = 1_000_000
+    years: int = 3
+    notifications: int = 100_000
+    user_share: float = 0.25         # employees with a login
+    plan_share: float = 0.5          # employees with a development plan
+    direct_score_share: float = 0.1  # scores on criteria without task links
+
+
+def _chunks(rows: List[dict], size: int) -> Iterator[List[dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _weights(rng: np.random.Generator, n: int) -> List[float]:
+    w = rng.uniform(0.5, 1.5, n)
+    return (w / w.sum()).round(6).tolist()
+
+
+class Generator:
+    def __init__(self, engine: Engine, scale: Scale, seed: int = 1, chunk_size: int = CHUNK_SIZE, log=print):
+        self.engine = engine
+        self.scale = scale
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.log = log
+        self.counts: Dict[str, int] = {}
+
+    def _insert(self, table, rows: List[dict]) -> None:
+        table = getattr(table, "__table__", table)
+        for chunk in _chunks(rows, self.chunk_size):
+            with self.engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def run(self, rollups: bool = True) -> Dict[str, int]:
+        Base.metadata.create_all(self.engine)
+        self.org()
+        self.catalogue()
+        self.people()
+        self.score_rows()
+        self.plans()
+        self.notification_rows()
+        if rollups:
+            t0 = time.perf_counter()
+            with Session(self.engine) as db:
+                score_rollup.rebuild(db)
+                db.commit()
+            self.log(f"[gen] rollups rebuilt in {time.perf_counter() - t0:.1f}s")
+        return self.counts
+
+    # --- organisation: departments, positions, functions -------------------------
+
+    def org(self) -> None:
+        s, rng = self.scale, self.rng
+        self._insert(Department, [
+            {"id": d, "name": f"Отдел {d:03d}", "code": f"D{d:03d}", "is_active": True}
+            for d in range(1, s.departments + 1)
+        ])
+        self._insert(Position, [
+            {"id": (d - 1) * s.positions_per_department + p, "department_id": d, "name": f"Должность {p}"}
+            for d in range(1, s.departments + 1) for p in range(1, s.positions_per_department + 1)
+        ])
+        self._insert(Function, [
+            {"id": (d - 1) * s.functions_per_department + f, "department_id": d, "name": f"Функция {f}",
+             "description": None}
+            for d in range(1, s.departments + 1) for f in range(1, s.functions_per_department + 1)
+        ])
+        links = []
+        for d in range(1, s.departments + 1):
+            for p in range(1, s.positions_per_department + 1):
+                k = int(rng.integers(1, s.functions_per_department + 1))
+                for f in rng.choice(s.functions_per_department, size=k, replace=False):
+                    links.append({"position_id": (d - 1) * s.positions_per_department + p,
+                                  "function_id": (d - 1) * s.functions_per_department + int(f) + 1})
+        self._insert(position_functions, links)
+        self._insert(LevelConfig, [{"id": 1, "L1_threshold": 0.85, "L2_threshold": 0.60, "order_desc": True}])
+
+    # --- competency -> criterion -> task trees ----------------------------------
+
+    def catalogue(self) -> None:
+        s, rng = self.scale, self.rng
+        tasks_per_dep = s.functions_per_department * s.tasks_per_function
+        comps, crits, tasks, links = [], [], [], []
+        crit_id = 0
+        self.direct_criteria: Dict[int, List[int]] = {}
+        for d in range(1, s.departments + 1):
+            task_base = (d - 1) * tasks_per_dep
+            for f in range(s.functions_per_department):
+                for t in range(s.tasks_per_function):
+                    tid = task_base + f * s.tasks_per_function + t + 1
+                    tasks.append({
+                        "id": tid, "department_id": d, "function_id": (d - 1) * s.functions_per_department + f + 1,
+                        "name": f"Задача {f + 1}.{t + 1}", "description": None, "weight": 0.0, "auto_weight": True,
+                        "mandatory_for_level": bool(rng.random() < 0.2), "mandatory_for_apex": bool(rng.random() < 0.1),
+                        "is_active": True,
+                    })
+            direct = self.direct_criteria[d] = []
+            for c in range(s.competencies_per_department):
+                comp_id = (d - 1) * s.competencies_per_department + c + 1
+                comps.append({"id": comp_id, "department_id": d, "name": f"Компетенция {c + 1}",
+                              "description": None, "category": ("core", "soft", "tech")[c % 3]})
+                for w in _weights(rng, s.criteria_per_competency):
+                    crit_id += 1
+                    crits.append({"id": crit_id, "department_id": d, "competency_id": comp_id,
+                                  "scale_type": "one_to_five", "weight": w, "auto_weight": False})
+                    if crit_id % s.criteria_per_competency == 0:
+                        direct.append(crit_id)  # the last criterion of each competency is scored directly
+                        continue
+                    k = int(rng.integers(1, 4))
+                    picked = rng.choice(tasks_per_dep, size=min(k, tasks_per_dep), replace=False)
+                    for t, tw in zip(picked, _weights(rng, len(picked))):
+                        links.append({"task_id": task_base + int(t) + 1, "criterion_id": crit_id,
+                                      "weight": tw, "auto_weight": False})
+        self._insert(Competency, comps)
+        self._insert(Criterion, crits)
+        self._insert(Task, tasks)
+        self._insert(TaskCriterion, links)
+
+    # --- users and employees -------------------------------------------------------
+
+    def people(self) -> None:
+        s, rng = self.scale, self.rng
+        try:
+            import bcrypt
+            pw = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=4)).decode()
+        except ImportError:
+            pw = "-"
+        n = s.employees
+        deps = rng.integers(1, s.departments + 1, n)
+        pos = (deps - 1) * s.positions_per_department + rng.integers(1, s.positions_per_department + 1, n)
+        has_user = rng.random(n) < s.user_share
+        self.employee_departments = deps
+        self.skill = rng.beta(4, 3, n)  # per-employee ability, drives score levels
+        users = [{"id": 1, "username": "admin", "password_hash": pw, "full_name": "Администратор",
+                  "is_active": True, "is_superuser": True}]
+        emps = []
+        self.user_ids: List[int] = []
+        for i in range(n):
+            user_id = None
+            if has_user[i]:
+                user_id = len(users) + 1
+                users.append({"id": user_id, "username": f"emp{i + 1:06d}", "password_hash": pw,
+                              "full_name": f"Сотрудник {i + 1:06d}", "is_active": True, "is_superuser": False})
+                self.user_ids.append(user_id)
+            emps.append({"id": i + 1, "user_id": user_id, "full_name": f"Сотрудник {i + 1:06d}",
+                         "department_id": int(deps[i]), "position_id": int(pos[i]),
+                         "level": int(1 + (self.skill[i] < 0.6) + (self.skill[i] < 0.35))})
+        self._insert(User, users)
+        self._insert(Employee, emps)
+        self._insert(Role, [{"id": 1, "name": "Сотрудник", "description": "Базовая роль", "is_system": True}])
+        self._insert(Permission, [{"id": 1, "code": "notifications.view", "name": "Просмотр уведомлений"}])
+        self._insert(role_permissions, [{"role_id": 1, "permission_id": 1}])
+        self._insert(user_roles, [{"user_id": u, "role_id": 1} for u in self.user_ids])
+
+    # --- scores over `years` years ----------------------------------------------------
+
+    def score_rows(self) -> None:
+        s, rng = self.scale, self.rng
+        n = s.scores
+        if not n:
+            return
+        t0 = time.perf_counter()
+        tasks_per_dep = s.functions_per_department * s.tasks_per_function
+        emp = rng.integers(0, s.employees, n)
+        dep = self.employee_departments[emp]
+        direct = rng.random(n) < s.direct_score_share
+        task = (dep - 1) * tasks_per_dep + rng.integers(1, tasks_per_dep + 1, n)
+        crit_table = np.array([self.direct_criteria[d] for d in range(1, s.departments + 1)])
+        crit = crit_table[dep - 1, rng.integers(0, crit_table.shape[1], n)]
+        raw = np.clip(np.rint(1 + 4 * self.skill[emp] + rng.normal(0, 0.8, n)), 1, 5)
+        days = rng.integers(0, 365 * s.years, n)
+        dates = [END_DATE - timedelta(days=int(k)) for k in range(365 * s.years)]
+        # only the numpy columns are held in full; dicts are built one chunk at a time
+        for lo in range(0, n, self.chunk_size):
+            hi = min(lo + self.chunk_size, n)
+            self._insert(Score, [
+                {"id": i, "employee_id": e + 1, "date": dates[k],
+                 "task_id": None if dr else t, "criterion_id": c if dr else None,
+                 "raw_value": r, "normalized": (r - 1) / 4}
+                for i, (e, k, dr, t, c, r) in enumerate(zip(
+                    emp[lo:hi].tolist(), days[lo:hi].tolist(), direct[lo:hi].tolist(),
+                    task[lo:hi].tolist(), crit[lo:hi].tolist(), raw[lo:hi].tolist()), start=lo + 1)
+            ])
+        self.log(f"[gen] {n} scores in {time.perf_counter() - t0:.1f}s")
+
+    # --- plans and notifications ------------------------------------------------------
+
+    def plans(self) -> None:
+        s, rng = self.scale, self.rng
+        tasks_per_dep = s.functions_per_department * s.tasks_per_function
+        plans, items = [], []
+        for i in np.flatnonzero(rng.random(s.employees) < s.plan_share).tolist():
+            d = int(self.employee_departments[i])
+            start = END_DATE - timedelta(days=int(rng.integers(0, 365 * s.years)))
+            pid = len(plans) + 1
+            plans.append({"id": pid, "employee_id": i + 1, "period_start": start,
+                          "period_end": start + timedelta(days=90),
+                          "status": ("draft", "in_progress", "submitted", "approved")[int(rng.integers(0, 4))],
+                          "completion_pct": int(rng.integers(0, 101)), "recommend_promotion": bool(rng.random() < 0.1)})
+            for _ in range(int(rng.integers(2, 6))):
+                items.append({"id": len(items) + 1, "plan_id": pid,
+                              "competency_id": (d - 1) * s.competencies_per_department + int(rng.integers(1, s.competencies_per_department + 1)),
+                              "task_id": (d - 1) * tasks_per_dep + int(rng.integers(1, tasks_per_dep + 1)),
+                              "expected_result": "Ожидаемый результат", "is_visible_to_employee": True})
+        self._insert(Plan, plans)
+        self._insert(PlanItem, items)
+
+    def notification_rows(self) -> None:
+        s, rng = self.scale, self.rng
+        if not s.notifications or not self.user_ids:
+            return
+        users = np.array(self.user_ids)[rng.integers(0, len(self.user_ids), s.notifications)]
+        ages = rng.integers(0, 365 * 24 * 60 * s.years, s.notifications)
+        read = rng.random(s.notifications) < 0.7
+        end = datetime.combine(END_DATE, datetime.min.time())
+        self._insert(Notification, [
+            {"id": i + 1, "user_id": u, "message": f"Уведомление {i + 1}", "is_read": r,
+             "created_at": end - timedelta(minutes=m)}
+            for i, (u, m, r) in enumerate(zip(users.tolist(), ages.tolist(), read.tolist()))
+        ])
+
+
+def make_engine(url: str) -> Engine:
+    engine = create_engine(url)
+    if url.startswith("sqlite"):
+        @event.listens_for(engine, "connect")
+        def _fast(dbapi_conn, _record):
+            # a throwaway dataset: durability is not needed while loading
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode = OFF")
+            cur.execute("PRAGMA synchronous = OFF")
+            cur.execute("PRAGMA cache_size = -262144")
+            cur.execute("PRAGMA temp_store = MEMORY")
+            cur.close()
+    return engine
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    p = argparse.ArgumentParser(prog="python -m scripts.generate_dataset", description=__doc__.splitlines()[1])
+    target = p.add_mutually_exclusive_group()
+    target.add_argument("--db", default="data/synthetic.db", help="SQLite file to create")
+    target.add_argument("--url", help="any SQLAlchemy URL with an empty schema")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    p.add_argument("--no-rollups", action="store_true")
+    p.add_argument("--force", action="store_true", help="overwrite an existing --db file")
+    for name, value in vars(Scale()).items():
+        p.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = p.parse_args(argv)
+
+    url = args.url
+    if url is None:
+        if os.path.exists(args.db):
+            if not args.force:
+                print(f"[gen] {args.db} exists; pass --force to overwrite")
+                return 2
+            os.remove(args.db)
+        os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+        url = f"sqlite:///{args.db}"
+    scale = Scale(**{k: getattr(args, k) for k in vars(Scale())})
+    t0 = time.perf_counter()
+    engine = make_engine(url)
+    counts = Generator(engine, scale, seed=args.seed, chunk_size=args.chunk).run(rollups=not args.no_rollups)
+    engine.dispose()
+    for table, n in counts.items():
+        print(f"[gen] {table:<20} {n:>10}")
+    print(f"[gen] done in {time.perf_counter() - t0:.1f}s -> {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+"""
+Import the task catalogue from an XLSX file built on the Tasks template.
+Usage:
+    python -m scripts.import_tasks path/to/tasks.xlsx
+"""
+from __future__ import annotations
+
+import sys
+
+from app.core.db import SessionLocal
+from app.import_export.xlsx_io import import_tasks
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print(__doc__)
+        return 2
+    with SessionLocal() as db:
+        report = import_tasks(db, argv[0])
+    for row, message in report.errors:
+        print(f"[import] row {row}: {message}")
+    print(f"[import] rows={report.rows} inserted={report.inserted} updated={report.updated} errors={report.error_count}")
+    return 1 if report.error_count else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+"""
+Load test for the notification stream (/notifications/stream).
+Serves the app with uvicorn in this process against a throwaway SQLite
+database; a child process opens N idle SSE connections, one user each.
+Reports server memory per connection, fan-out latency of one notification
+to every user, and whether all connections survive a few heartbeats.
+Usage:
+    python -m scripts.load_sse [connections] [heartbeat seconds]
+    python -m scripts.load_sse 5000 2
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _seed(n: int) -> None:
+    from sqlalchemy import insert
+    from app.core.db import Base, engine
+    from app.core.models import User, Role, Permission, user_roles, role_permissions
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": i, "username": f"u{i}", "password_hash": "-", "is_active": True,
+                                     "is_superuser": False} for i in range(1, n + 1)])
+        conn.execute(insert(Role), [{"id": 1, "name": "employee", "is_system": True}])
+        conn.execute(insert(Permission), [{"id": 1, "code": "notifications.view", "name": "view"}])
+        conn.execute(insert(role_permissions), [{"role_id": 1, "permission_id": 1}])
+        conn.execute(insert(user_roles), [{"user_id": i, "role_id": 1} for i in range(1, n + 1)])
+
+
+def _cookies(secret: str, name: str, n: int):
+    import json
+    from base64 import b64encode
+    from itsdangerous import TimestampSigner
+    signer = TimestampSigner(secret)
+    return [f"{name}={signer.sign(b64encode(json.dumps({'user_id': i}).encode())).decode()}" for i in range(1, n + 1)]
+
+
+# --- client side (child process) ----------------------------------------------------
+
+def _clients(port: int, cookies, pipe, idle: float) -> None:
+    async def one(cookie: str, ready: asyncio.Event, state: dict):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 16)
+        writer.write(f"GET /notifications/stream HTTP/1.1\r\nHost: load\r\nAccept: text/event-stream\r\n"
+                     f"Cookie: {cookie}\r\n\r\n".encode())
+        await writer.drain()
+        buf = b""
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    state["closed"] += 1
+                    return
+                buf += chunk
+                if b"event: unread" in buf and not state.setdefault(id(reader), False):
+                    state[id(reader)] = True
+                    state["ready"] += 1
+                    if state["ready"] == state["n"]:
+                        ready.set()
+                if b"event: notification" in buf:
+                    state["delivered"].append(time.time())
+                    buf = b""
+                if b": ping" in buf:
+                    state["pings"] += 1
+                    buf = b""
+        finally:
+            writer.close()
+
+    async def main():
+        state = {"n": len(cookies), "ready": 0, "closed": 0, "pings": 0, "delivered": []}
+        ready = asyncio.Event()
+        tasks = []
+        for i, c in enumerate(cookies):
+            tasks.append(asyncio.create_task(one(c, ready, state)))
+            if i % 200 == 199:
+                await asyncio.sleep(0.05)  # don't overrun the listen backlog
+        await asyncio.wait_for(ready.wait(), 300)
+        pipe.send(("ready", state["ready"]))
+        pipe.recv()  # notifications sent
+        deadline = time.time() + 60
+        while len(state["delivered"]) < state["n"] and time.time() < deadline:
+            await asyncio.sleep(0.05)
+        pipe.send(("delivered", list(state["delivered"])))
+        state["pings"] = 0
+        await asyncio.sleep(idle)
+        pipe.send(("idle", state["n"] - state["closed"], state["pings"]))
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+# --- server side ------------------------------------------------------------------------
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 2000
+    heartbeat = float(argv[1]) if len(argv) > 1 else 2.0
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(ENV="bench", DEBUG="false", DATABASE_URL=f"sqlite:///{Path(tmp) / 'sse.db'}",
+                          SSE_HEARTBEAT_SECONDS=str(heartbeat), NOTIFY_BATCH_SIZE=str(max(n, 500)))
+        import uvicorn
+        from app.core.config import settings
+        _seed(n)
+        from app.main import create_app
+        from app.services.notification_hub import notification_hub
+        from app.services.notifications import notification_buffer, notify_in_app
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning",
+                                               backlog=4096, timeout_keep_alive=600))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+
+        rss0 = _rss_mb()
+        parent, child = mp.Pipe()
+        proc = mp.get_context("spawn").Process(
+            target=_clients, args=(port, _cookies(str(settings.SECRET_KEY), settings.SESSION_COOKIE_NAME, n), child,
+                                   heartbeat * 3))
+        t0 = time.perf_counter()
+        proc.start()
+        _, ready = parent.recv()
+        rss1 = _rss_mb()
+        print(f"[sse] {ready}/{n} connected in {time.perf_counter() - t0:.1f}s; hub has {notification_hub.connections()}")
+        print(f"[sse] server RSS {rss0:.0f} -> {rss1:.0f} MB ({(rss1 - rss0) * 1024 / max(ready, 1):.1f} KB/connection)")
+
+        sent = time.time()
+        notify_in_app(range(1, n + 1), "load test")
+        notification_buffer.flush()
+        parent.send("go")
+        _, delivered = parent.recv()
+        lat = sorted(t - sent for t in delivered)
+        if lat:
+            print(f"[sse] fan-out to {len(lat)}/{n}: p50={lat[len(lat) // 2] * 1000:.0f}ms "
+                  f"p99={lat[int(len(lat) * 0.99) - 1] * 1000:.0f}ms max={lat[-1] * 1000:.0f}ms")
+        _, alive, pings = parent.recv()
+        print(f"[sse] after {heartbeat * 3:.0f}s idle: {alive}/{n} open, {pings} heartbeats received")
+        proc.join(30)
+        server.should_exit = True
+        time.sleep(0.5)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+"""
+Delete read notifications older than the retention period, in small chunks.
+Usage:
+    python -m scripts.purge_notifications            # NOTIFICATIONS_RETENTION_DAYS
+    python -m scripts.purge_notifications 30 [chunk] # explicit days / rows per transaction
+"""
+from __future__ import annotations
+
+import sys
+
+from app.core.db import SessionLocal
+from app.services.notifications import purge_read
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    days = int(argv[0]) if argv else None
+    chunk = int(argv[1]) if len(argv) > 1 else 5000
+    with SessionLocal() as db:
+        deleted = purge_read(db, days, chunk)
+    print(f"[notifications] purged {deleted} read notifications")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
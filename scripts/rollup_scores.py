@@ -0,0 +1,31 @@
+"""
+Rebuild or verify the materialised score rollups.
+Usage:
+    python -m scripts.rollup_scores          # full rebuild
+    python -m scripts.rollup_scores --check  # report mismatches against raw scores
+"""
+from __future__ import annotations
+
+import sys
+
+from app.core.db import SessionLocal
+from app.services import score_rollup
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    with SessionLocal() as db:
+        if "--check" in argv:
+            problems = score_rollup.check(db)
+            for level, key, expected, stored in problems[:50]:
+                print(f"[rollup] {level} {key}: expected={expected:.6f} stored={stored:.6f}")
+            print(f"[rollup] {len(problems)} mismatches")
+            return 1 if problems else 0
+        score_rollup.rebuild(db)
+        db.commit()
+        print("[rollup] rebuilt")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
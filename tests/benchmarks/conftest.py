@@ -0,0 +1,146 @@
+"""
+Benchmark fixtures. Run with `pytest -m benchmark`; the default run skips them.
+
+Environment:
+    BENCH_SIZES           comma-separated dataset sizes from SIZES (default: small)
+    BENCH_OUTPUT          results file (default: .benchmarks/latest.json)
+    BENCH_BASELINE        baseline file (default: tests/benchmarks/baseline.json)
+    BENCH_TOLERANCE       allowed slowdown over the baseline (default: 0.5 = +50%)
+    BENCH_NOISE_FLOOR_MS  slowdowns smaller than this are never failures (default: 5)
+    BENCH_NOISE_FLOOR_PCT ... nor smaller than this share of the baseline (default: 0.75)
+    BENCH_SAVE_BASELINE   set to 1 to merge this run's results into the baseline
+
+The gate compares the fastest round (min-of-N), not the median: the baseline
+holds absolute times from one machine, and on a busy host the median of a
+millisecond benchmark jitters by more than the tolerance while the minimum
+stays put. Baselines without a "min" fall back to their median. The noise
+floor is the smaller of the two floors, so a 2ms benchmark may not double.
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal, ReadSessionLocal, make_engines
+from app.core.identity import identity_cache
+from app.core.rbac import bump_rbac_version
+from scripts.generate_dataset import Generator, Scale
+
+SIZES: Dict[str, Scale] = {
+    "small": Scale(departments=5, employees=500, scores=20_000, notifications=5_000),
+    "medium": Scale(departments=20, employees=5_000, scores=250_000, notifications=50_000),
+    "large": Scale(),
+}
+
+HERE = Path(__file__).parent
+OUTPUT = Path(os.getenv("BENCH_OUTPUT", ".benchmarks/latest.json"))
+BASELINE = Path(os.getenv("BENCH_BASELINE", str(HERE / "baseline.json")))
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.5"))
+NOISE_FLOOR = float(os.getenv("BENCH_NOISE_FLOOR_MS", "5")) / 1000
+NOISE_FLOOR_PCT = float(os.getenv("BENCH_NOISE_FLOOR_PCT", "0.75"))
+
+
+def _selected_sizes():
+    return [s.strip() for s in os.getenv("BENCH_SIZES", "small").split(",") if s.strip()]
+
+
+@dataclass
+class Dataset:
+    size: str
+    scale: Scale
+    writer: object
+    reader: object
+    employee_id: int  # an employee with a login
+    user_id: int
+
+    def session(self) -> Session:
+        return Session(self.reader)
+
+
+@pytest.fixture(scope="session", params=_selected_sizes())
+def dataset(request, tmp_path_factory):
+    """A generated SQLite database with the app's session factories bound to it."""
+    size = request.param
+    path = tmp_path_factory.mktemp("bench") / f"{size}.db"
+    writer, reader = make_engines(f"sqlite:///{path}")
+    Generator(writer, SIZES[size], seed=1, log=lambda *_: None).run()
+    with Session(writer) as db:
+        from sqlalchemy import select
+        from app.core.models import Employee
+        emp_id, user_id = db.execute(
+            select(Employee.id, Employee.user_id).where(Employee.user_id.is_not(None)).order_by(Employee.id).limit(1)
+        ).one()
+    binds = SessionLocal.kw["bind"], ReadSessionLocal.kw["bind"]
+    SessionLocal.configure(bind=writer)
+    ReadSessionLocal.configure(bind=reader)
+    identity_cache.invalidate(); bump_rbac_version()
+    yield Dataset(size, SIZES[size], writer, reader, emp_id, user_id)
+    SessionLocal.configure(bind=binds[0])
+    ReadSessionLocal.configure(bind=binds[1])
+    identity_cache.invalidate(); bump_rbac_version()
+    writer.dispose(); reader.dispose()
+
+
+class Recorder:
+    """Times callables, keeps the medians and checks them against the baseline."""
+
+    def __init__(self, baseline: Dict[str, dict]):
+        self.baseline = baseline
+        self.results: Dict[str, dict] = {}
+
+    def __call__(self, name: str, fn: Callable[[], object], rounds: int = 10, warmup: int = 1) -> dict:
+        for _ in range(warmup):
+            fn()
+        times = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        result = {"median": statistics.median(times), "min": min(times), "max": max(times), "rounds": rounds}
+        self.results[name] = result
+        base = self.baseline.get(name)
+        if base is not None:
+            expected = base.get("min", base["median"])
+            result["baseline"] = expected
+            result["ratio"] = result["min"] / expected if expected else None
+            floor = min(NOISE_FLOOR, expected * NOISE_FLOOR_PCT)
+            limit = max(expected * (1 + TOLERANCE), expected + floor)
+            if result["min"] > limit:
+                pytest.fail(f"{name}: fastest round {result['min'] * 1000:.1f}ms exceeds baseline "
+                            f"{expected * 1000:.1f}ms by more than {TOLERANCE:.0%} "
+                            f"and {floor * 1000:.1f}ms")
+        return result
+
+
+def _load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _dump(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def bench():
+    recorder = Recorder(_load(BASELINE).get("results", {}))
+    yield recorder
+    if not recorder.results:
+        return
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "time": time.time()}
+    _dump(OUTPUT, {"meta": meta, "tolerance": TOLERANCE, "noise_floor": NOISE_FLOOR,
+                   "noise_floor_pct": NOISE_FLOOR_PCT, "results": recorder.results})
+    if os.getenv("BENCH_SAVE_BASELINE") == "1":
+        base = _load(BASELINE)
+        merged = dict(base.get("results", {}))
+        merged.update({k: {"median": v["median"], "min": v["min"]} for k, v in recorder.results.items()})
+        _dump(BASELINE, {"meta": meta, "results": merged})
@@ -0,0 +1,48 @@
+import json
+from base64 import b64encode
+
+import pytest
+from itsdangerous import TimestampSigner
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.core.models import User
+from app.main import create_app
+
+pytestmark = pytest.mark.benchmark
+
+
+def _session_cookie(data: dict) -> str:
+    # same encoding as starlette's SessionMiddleware
+    return TimestampSigner(str(settings.SECRET_KEY)).sign(b64encode(json.dumps(data).encode())).decode()
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    with TestClient(create_app(), follow_redirects=False) as c:
+        yield c
+
+
+@pytest.mark.parametrize("path", ["/dashboard", "/me", "/notifications"])
+def test_page(bench, dataset, client, path):
+    cookies = {settings.SESSION_COOKIE_NAME: _session_cookie({"user_id": dataset.user_id})}
+
+    def run():
+        r = client.get(path, cookies=cookies)
+        assert r.status_code == 200, (path, r.status_code)
+    bench(f"GET {path}[{dataset.size}]", run, rounds=20)
+
+
+def test_login(bench, dataset, client):
+    from passlib.hash import bcrypt
+    with dataset.session() as db:
+        user = db.get(User, dataset.user_id)
+    try:
+        bcrypt.verify("password", user.password_hash)
+    except ValueError as e:  # passlib and bcrypt>=4.1 disagree on the backend API
+        pytest.skip(f"bcrypt backend unusable: {e}")
+
+    def run():
+        r = client.post("/login", data={"username": user.username, "password": "password"})
+        assert r.status_code == 303
+    bench(f"POST /login[{dataset.size}]", run)
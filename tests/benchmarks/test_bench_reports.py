@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.models import Employee
+from app.reports.employee_profile_xlsx import make_employee_profile_xlsx
+from app.reports.pdf_batch import collect_profiles, render_pdf
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_profile_pdf(bench, dataset):
+    def run():
+        with dataset.session() as db:
+            (profile,) = collect_profiles(db, employee_ids=[dataset.employee_id])
+        return render_pdf(profile)
+    bench(f"profile_pdf[{dataset.size}]", run)
+
+
+def test_profile_xlsx(bench, dataset, tmp_path):
+    def run():
+        with dataset.session() as db:
+            make_employee_profile_xlsx(db, db.get(Employee, dataset.employee_id), tmp_path / "p.xlsx")
+    bench(f"profile_xlsx[{dataset.size}]", run)
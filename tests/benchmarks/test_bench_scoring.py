@@ -0,0 +1,21 @@
+import pytest
+
+from app.services import scoring
+from app.services.matrix import build_competency_matrix, load_competency_matrix
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_employee_total(bench, dataset):
+    with dataset.session() as db:
+        bench(f"employee_total[{dataset.size}]", lambda: scoring.employee_total(db, dataset.employee_id), rounds=20)
+
+
+def test_matrix_from_rollups(bench, dataset):
+    with dataset.session() as db:
+        bench(f"matrix[{dataset.size}]", lambda: load_competency_matrix(db).rows())
+
+
+def test_matrix_recomputed(bench, dataset):
+    with dataset.session() as db:
+        bench(f"matrix_build[{dataset.size}]", lambda: build_competency_matrix(db, [1]).rows(), rounds=10)
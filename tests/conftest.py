@@ -0,0 +1,51 @@
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.db import Base
+from app.core.querylog import assert_max_queries
+from app.core.models import Department, Employee, Competency, Criterion, Task, TaskCriterion, Score
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        yield s
+    engine.dispose()
+
+
+def _build_scoring_data(db, n_emp=6, seed=7):
+    rnd = random.Random(seed)
+    dep = Department(name="D"); db.add(dep); db.flush()
+    emps = [Employee(full_name=f"E{i}", department_id=dep.id) for i in range(n_emp)]
+    comps = [Competency(name=f"C{i}", department_id=dep.id) for i in range(3)]
+    db.add_all(emps + comps); db.flush()
+    crits = [Criterion(competency_id=c.id, department_id=dep.id, weight=rnd.random()) for c in comps for _ in range(3)]
+    tasks = [Task(name=f"T{i}", department_id=dep.id) for i in range(8)]
+    db.add_all(crits + tasks); db.flush()
+    # the last criterion stays unlinked and is scored directly
+    for crit in crits[:-1]:
+        for t in rnd.sample(tasks, 2):
+            db.add(TaskCriterion(task_id=t.id, criterion_id=crit.id, weight=rnd.random()))
+    for e in emps[:-1]:  # the last employee has no scores at all
+        for _ in range(20):
+            db.add(Score(employee_id=e.id, date=date(2025, 1, 1), task_id=rnd.choice(tasks).id, normalized=rnd.random()))
+        db.add(Score(employee_id=e.id, date=date(2025, 1, 1), criterion_id=crits[-1].id, normalized=rnd.random()))
+    db.flush()
+    return emps, comps, crits
+
+
+@pytest.fixture
+def build_scoring_data():
+    return _build_scoring_data
+
+
+@pytest.fixture
+def max_queries():
+    """`with max_queries(5): ...` fails if the block runs more than 5 statements."""
+    return assert_max_queries
@@ -0,0 +1,30 @@
+from openpyxl import load_workbook
+
+from app.core.models import Department, Employee
+from app.reports.company_xlsx import make_company_xlsx
+from app.services import score_rollup
+from app.services.scoring_batch import compute_score_tables
+
+
+def test_company_xlsx_rows_match_scores(db, build_scoring_data, tmp_path):
+    emps, comps, _ = build_scoring_data(db)
+    score_rollup.rebuild(db)
+    other = Department(name="Other"); db.add(other); db.flush()
+    db.add(Employee(full_name="Outsider", department_id=other.id)); db.flush()
+    path = tmp_path / "company.xlsx"
+
+    assert make_company_xlsx(db, str(path), [emps[0].department_id]) == len(emps)
+
+    tables = compute_score_tables(db, [e.id for e in emps])
+    by_name = {e.full_name: e for e in emps}
+    ws = load_workbook(path, read_only=True).active
+    rows = list(ws.iter_rows(values_only=True))
+    header = rows[0]
+    assert header[:5] == ("ФИО", "Отдел", "Должность", "Уровень", "Итог")
+    col = {name: i for i, name in enumerate(header)}
+    assert len(rows) == len(emps) + 1
+    for row in rows[1:]:
+        emp = by_name[row[0]]
+        assert abs(row[4] - round(tables.total(emp.id), 3)) < 1e-9
+        for comp in comps:
+            assert abs(row[col[comp.name]] - round(tables.competency(emp.id, comp.id), 3)) < 1e-9
@@ -0,0 +1,141 @@
+import time
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+import app.core.db as core_db
+from app.core.conditional import Conditional, conditional
+from app.core.db import Base
+from app.core.models import DataVersion, Department, Plan, Task
+from app.core.versions import data_versions
+from app.services import score_rollup
+
+
+@pytest.fixture
+def factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(core_db, "ReadSessionLocal", factory)
+    data_versions.invalidate()
+    yield factory
+    data_versions.invalidate()
+    engine.dispose()
+
+
+def _versions(factory):
+    with factory() as db:
+        return dict(db.execute(select(DataVersion.entity, DataVersion.version)).all())
+
+
+def test_commits_bump_the_entities_they_touched(factory):
+    with factory() as db:
+        db.add(Department(name="D"))
+        db.commit()
+        assert _versions(factory) == {"org": 1}
+        db.execute(insert(Task), [{"name": "t", "department_id": 1}])  # Core DML through the session
+        db.add(Department(name="E"))
+        db.commit()
+        assert _versions(factory) == {"org": 2, "scores": 1}
+        db.add(Plan(employee_id=1))
+        db.rollback()
+        assert _versions(factory) == {"org": 2, "scores": 1}
+
+
+def test_route_answers_304_until_its_data_changes(factory):
+    calls = []
+    app = FastAPI()
+
+    @app.get("/page")
+    def page(request: Request, cond: Conditional = Depends(conditional("org"))):
+        if cond.fresh:
+            return cond.not_modified()
+        calls.append(1)
+        return cond.apply(PlainTextResponse("body"))
+
+    client = TestClient(app)
+    first = client.get("/page")
+    etag, last_modified = first.headers["etag"], first.headers.get("last-modified")
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert last_modified is None  # nothing written yet
+
+    again = client.get("/page", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert len(calls) == 1
+    assert client.get("/page?x=1", headers={"If-None-Match": etag}).status_code == 200  # other query, other tag
+
+    with factory() as db:
+        db.add(Department(name="D"))
+        db.commit()
+    changed = client.get("/page", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    since = client.get("/page", headers={"If-Modified-Since": changed.headers["last-modified"]})
+    assert since.status_code == 304
+
+
+def test_a_rollup_rebuild_changes_the_matrix_etag(factory):
+    app = FastAPI()
+
+    @app.get("/matrix")
+    def matrix(cond: Conditional = Depends(conditional("scores", "org"))):  # as /matrices/competencies
+        return cond.apply(PlainTextResponse("matrix"))
+
+    client = TestClient(app)
+    etag = client.get("/matrix").headers["etag"]
+    with factory() as db:
+        score_rollup.rebuild(db)
+        db.commit()
+    assert _versions(factory) == {"scores": 1}
+    assert client.get("/matrix", headers={"If-None-Match": etag}).headers["etag"] != etag
+
+
+def test_without_the_table_everything_is_served(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    monkeypatch.setattr(core_db, "ReadSessionLocal", sessionmaker(bind=engine))
+    data_versions.invalidate()
+    app = FastAPI()
+
+    @app.get("/page")
+    def page(cond: Conditional = Depends(conditional("org"))):
+        return cond.apply(PlainTextResponse("body"))
+
+    res = TestClient(app).get("/page", headers={"If-None-Match": "*"})
+    assert res.status_code == 200 and "etag" not in res.headers
+    data_versions.invalidate()
+
+
+def test_commit_bumps_on_the_tuned_single_connection_writer(tmp_path, monkeypatch):
+    # the tuned SQLite writer pool has one connection: the bump must not ask for a second one
+    writer, reader = core_db.make_engines(f"sqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+    Base.metadata.create_all(writer)
+    monkeypatch.setattr(core_db, "ReadSessionLocal", sessionmaker(bind=reader))
+    factory = sessionmaker(bind=writer)
+    t0 = time.monotonic()
+    with factory() as db:
+        db.add(Department(name="D"))
+        db.commit()
+        db.add(Department(name="E"))  # left to commit()'s own flush
+        db.commit()
+    assert time.monotonic() - t0 < 5
+    assert _versions(factory) == {"org": 2}
+    data_versions.invalidate()
+    writer.dispose()
+    reader.dispose()
+
+
+def test_a_failed_bump_keeps_the_write_and_is_logged(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'nv.db'}")
+    Base.metadata.create_all(engine)
+    DataVersion.__table__.drop(engine)
+    with sessionmaker(bind=engine)() as db:
+        for name in ("D", "E"):
+            db.add(Department(name=name))
+            db.commit()
+        assert db.query(Department).count() == 2
+    assert sum("could not bump data versions" in r.getMessage() for r in caplog.records) == 2
+    engine.dispose()
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+import app.core.db_async as db_async
+from app.core.config import settings
+from app.core.db import Base
+from app.core.db_async import ThreadedSession, read_session_slots
+from app.core.models import Employee
+from app.services import score_rollup
+from app.services.matrix import load_competency_matrix
+
+
+def _session_results(db):
+    async def run():
+        names = (await db.execute(select(Employee.full_name).order_by(Employee.id))).scalars().all()
+        first = await db.get(Employee, 1)
+        matrix = await db.run_sync(load_competency_matrix, None)
+        return names, first.full_name, matrix.rows()
+    return run()
+
+
+def test_threaded_and_async_sessions_agree(tmp_path, build_scoring_data):
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        build_scoring_data(s)
+        score_rollup.rebuild(s)
+        s.commit()
+
+    with Session(engine) as s:
+        threaded = asyncio.run(_session_results(ThreadedSession(s)))
+
+    async def with_async():
+        aengine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"))
+        try:
+            async with async_sessionmaker(aengine)() as db:
+                return await _session_results(db)
+        finally:
+            await aengine.dispose()
+
+    assert asyncio.run(with_async()) == threaded
+    assert threaded[0][0] == "E0"
+
+
+@pytest.mark.parametrize("pool, setting, slots", [
+    (dict(poolclass=QueuePool, pool_size=3, max_overflow=4), None, 3),
+    (dict(poolclass=QueuePool, pool_size=3), 6, 6),
+    (dict(poolclass=NullPool), None, None),
+    (dict(poolclass=StaticPool), None, None),
+    (dict(poolclass=QueuePool, pool_size=3), 0, None),
+])
+def test_read_session_slots_follow_the_reader_pool(monkeypatch, pool, setting, slots):
+    engine = create_engine("sqlite://", **pool)
+    monkeypatch.setattr(db_async, "read_engine", engine)
+    monkeypatch.setattr(settings, "DB_READ_SESSION_SLOTS", setting)
+    sem = read_session_slots()
+    assert (sem._value if sem is not None else None) == slots
+    engine.dispose()
@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.db import make_engines
+
+
+def test_untuned_profile_shares_one_engine(tmp_path):
+    writer, reader = make_engines(f"sqlite:///{tmp_path / 'a.db'}")
+    assert writer is reader
+    writer.dispose()
+
+
+def test_tuned_sqlite_profile(tmp_path):
+    writer, reader = make_engines(f"sqlite:///{tmp_path / 'a.db'}", tuned=True)
+    try:
+        assert writer is not reader
+        with writer.begin() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO t VALUES (2)"))
+    finally:
+        writer.dispose(); reader.dispose()
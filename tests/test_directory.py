@@ -0,0 +1,68 @@
+import json
+
+from app.core.conditional import Conditional
+from app.core.models import Department, Employee, Position
+from app.routers.hr_company import employees_json
+from app.services.directory import DirectoryFilter, decode_cursor, encode_cursor, fetch_page
+
+
+def _org(db):
+    deps = [Department(name="Sales"), Department(name="IT")]
+    db.add_all(deps); db.flush()
+    pos = [Position(name="Manager", department_id=deps[0].id), Position(name="Developer", department_id=deps[1].id)]
+    db.add_all(pos); db.flush()
+    # duplicate names exercise the id tie-breaker
+    for i in range(30):
+        d = i % 2
+        db.add(Employee(full_name=f"Name {i // 3:02d}", department_id=deps[d].id, position_id=pos[d].id,
+                        level=i % 3, is_active=i % 5 != 0))
+    db.add(Employee(full_name="Aaron Nobody"))  # no department or position
+    db.flush()
+    return deps, pos
+
+
+def _all(db, filters, limit):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = fetch_page(db, filters, cursor, limit)
+        seen += rows
+        if cursor is None:
+            return seen
+
+
+def test_keyset_pages_cover_everything_once_in_order(db, max_queries):
+    _org(db)
+    with max_queries(7):  # one statement per page
+        rows = _all(db, DirectoryFilter(), 5)
+    assert len(rows) == 31 and len({r["id"] for r in rows}) == 31
+    assert [(r["full_name"], r["id"]) for r in rows] == sorted((r["full_name"], r["id"]) for r in rows)
+    assert rows[0] == {"id": rows[0]["id"], "full_name": "Aaron Nobody", "level": None, "is_active": True,
+                       "department_id": None, "department": None, "position_id": None, "position": None}
+    assert {r["department"] for r in rows[1:]} == {"Sales", "IT"}
+
+
+def test_filters_combine(db):
+    deps, pos = _org(db)
+    rows = _all(db, DirectoryFilter(department_id=deps[1].id, level=1, active=True), 2)
+    assert rows and all(r["department"] == "IT" and r["position"] == "Developer" and r["level"] == 1
+                        and r["is_active"] for r in rows)
+    assert len(_all(db, DirectoryFilter(active=False), 4)) == 6
+    assert _all(db, DirectoryFilter(position_id=pos[0].id), 50) == _all(db, DirectoryFilter(department_id=deps[0].id), 50)
+
+
+def test_cursor_round_trip_and_garbage():
+    assert decode_cursor(encode_cursor("Иванов Иван", 42)) == ("Иванов Иван", 42)
+    assert decode_cursor("not a cursor") is None
+    assert DirectoryFilter(level=0, active=False).params() == {"level": 0, "active": 0}
+
+
+def test_json_variant(db):
+    deps, _ = _org(db)
+    stale = Conditional(None, None, False)
+    page = json.loads(employees_json(department_id=str(deps[0].id), position_id="", level=None, active="1",
+                                     cursor=None, limit=3, db=db, cond=stale).body)
+    assert len(page["items"]) == 3 and page["next_cursor"]
+    rest = json.loads(employees_json(department_id=str(deps[0].id), position_id="", level=None, active="1",
+                                     cursor=page["next_cursor"], limit=100, db=db, cond=stale).body)
+    assert rest["next_cursor"] is None
+    assert len(page["items"]) + len(rest["items"]) == 12
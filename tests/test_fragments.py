@@ -0,0 +1,68 @@
+import jinja2
+import numpy as np
+import pytest
+
+from app.core.fragments import FragmentCache, FragmentCacheExtension
+from app.services.matrix import CompetencyMatrix
+from app.templates_utils import templates, warm_templates
+
+
+@pytest.fixture
+def env():
+    env = jinja2.Environment(loader=jinja2.DictLoader({
+        "page.html": "{% for i in items %}{% cache 'item', i, version %}<b>{{ render(i) }}</b>{% endcache %}{% endfor %}",
+        "keyonly.html": "{% cache 'static' %}{{ render(0) }}{% endcache %}",
+    }), autoescape=True, extensions=[FragmentCacheExtension])
+    env.fragment_cache = FragmentCache(max_entries=100, max_chars=10_000)
+    return env
+
+
+def test_fragments_are_reused_until_the_version_changes(env):
+    calls = []
+
+    def render(i):
+        calls.append(i)
+        return f"<{i}>"
+
+    page = env.get_template("page.html")
+    first = page.render(items=[1, 2], version=1, render=render)
+    assert first == "<b>&lt;1&gt;</b><b>&lt;2&gt;</b>"
+    assert page.render(items=[1, 2], version=1, render=render) == first
+    assert calls == [1, 2]
+    page.render(items=[1, 2], version=2, render=render)
+    assert calls == [1, 2, 1, 2]
+    assert env.fragment_cache.stats()["size"] == 2  # new versions replace the old entries
+    env.get_template("keyonly.html").render(render=render)
+    env.get_template("keyonly.html").render(render=render)
+    assert calls.count(0) == 1
+
+
+def test_lru_is_bounded_by_entries_and_characters():
+    cache = FragmentCache(max_entries=3, max_chars=100)
+    for i in range(5):
+        cache.put(i, 0, "x" * 10)
+    assert cache.stats()["size"] == 3 and cache.get(0, 0) is None and cache.get(4, 0) == "x" * 10
+    cache.put("big", 0, "y" * 24)
+    cache.put("big2", 0, "y" * 24)
+    cache.put("big3", 0, "y" * 24)
+    assert cache.chars <= 100
+    cache.put("huge", 0, "z" * 60)  # over a quarter of the budget: not cached
+    assert cache.get("huge", 0) is None
+
+
+def test_matrix_rows_render_from_the_fragment_cache():
+    m = CompetencyMatrix([(1, "Ann"), (2, "Bob")], [(10, "Python"), (11, "SQL")], np.array([[0.5, 0.25], [1.0, 0.0]]))
+    tpl = templates.env.get_template("matrices/competencies.html")
+    ctx = {"employees": m.employees, "competencies": m.competencies, "matrix": m.rows(),
+           "row_versions": m.row_versions(), "scope": "test"}
+    html = tpl.render(**ctx)
+    assert "Python" in html and "<td>0.50</td><td>0.25</td>" in html and "Bob" in html
+    before = templates.env.fragment_cache.stats()["hits"]
+    assert tpl.render(**ctx) == html
+    assert templates.env.fragment_cache.stats()["hits"] == before + 2
+    m.values[0, 0] = 0.75
+    assert m.row_versions()[0] != ctx["row_versions"][0] and m.row_versions()[1] == ctx["row_versions"][1]
+
+
+def test_every_template_warms_up():
+    assert warm_templates() == len(templates.env.list_templates(extensions=("html", "txt", "xml")))
@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.core.models import Criterion, Employee, Score, ScoreTotalRollup, Task, TaskCriterion
+from scripts.generate_dataset import Generator, Scale
+
+SMALL = Scale(departments=3, employees=40, positions_per_department=2, functions_per_department=2,
+              tasks_per_function=3, competencies_per_department=2, criteria_per_competency=3,
+              scores=2000, years=2, notifications=100)
+
+
+def _build(path, seed):
+    engine = create_engine(f"sqlite:///{path}")
+    Generator(engine, SMALL, seed=seed, chunk_size=500, log=lambda *_: None).run()
+    return engine
+
+
+def _scores(engine):
+    with Session(engine) as db:
+        return db.execute(select(Score.employee_id, Score.date, Score.task_id, Score.criterion_id,
+                                 Score.raw_value).order_by(Score.id)).all()
+
+
+def test_dataset_is_deterministic_per_seed(tmp_path):
+    a, b, c = (_build(tmp_path / f"{name}.db", seed) for name, seed in (("a", 5), ("b", 5), ("c", 6)))
+    assert _scores(a) == _scores(b)
+    assert _scores(a) != _scores(c)
+    for e in (a, b, c):
+        e.dispose()
+
+
+def test_dataset_shape(tmp_path):
+    engine = _build(tmp_path / "a.db", 1)
+    with Session(engine) as db:
+        assert db.scalar(select(func.count(Score.id))) == SMALL.scores
+        assert db.scalar(select(func.count(Employee.id))) == SMALL.employees
+        # task links stay inside the criterion's department
+        assert db.scalar(
+            select(func.count()).select_from(TaskCriterion)
+            .join(Task, Task.id == TaskCriterion.task_id).join(Criterion, Criterion.id == TaskCriterion.criterion_id)
+            .where(Task.department_id != Criterion.department_id)
+        ) == 0
+        # employees are only scored on their own department's tasks
+        assert db.scalar(
+            select(func.count()).select_from(Score)
+            .join(Employee, Employee.id == Score.employee_id).join(Task, Task.id == Score.task_id)
+            .where(Task.department_id != Employee.department_id)
+        ) == 0
+        assert db.scalar(select(func.count()).select_from(ScoreTotalRollup)) > 0
+    engine.dispose()
+
+
+def test_scores_are_built_one_chunk_at_a_time(tmp_path, monkeypatch):
+    batches = []
+    insert = Generator._insert
+
+    def recording(self, table, rows):
+        if table is Score:
+            batches.append(len(rows))
+        insert(self, table, rows)
+
+    monkeypatch.setattr(Generator, "_insert", recording)
+    engine = _build(tmp_path / "a.db", 1)
+    assert batches == [500] * 4  # never the whole table in one list
+    with Session(engine) as db:
+        assert db.scalar(select(func.count(Score.id))) == db.scalar(select(func.max(Score.id))) == SMALL.scores
+    engine.dispose()
@@ -0,0 +1,93 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware.sessions import SessionMiddleware
+
+from app.core.db import Base
+from app.core.identity import IdentityCache, UserLoaderMiddleware
+from app.core.models import User
+
+
+def _app(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'id.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, username="u1", password_hash="x", full_name="User One", is_active=True, is_superuser=False))
+        db.commit()
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *a: queries.append(a[2]))
+    cache = IdentityCache(ttl=60)
+    app = FastAPI()
+    app.add_middleware(UserLoaderMiddleware, cache=cache, session_factory=factory)
+    app.add_middleware(SessionMiddleware, secret_key="test")
+
+    @app.get("/login")
+    def login(request: Request):
+        request.session["user_id"] = 1
+        return {}
+
+    @app.get("/me")
+    def me(request: Request):
+        user = request.state.user
+        return {"name": user.full_name if user else None}
+
+    return app, cache, queries
+
+
+def test_user_loaded_once_and_cached(tmp_path):
+    app, cache, queries = _app(tmp_path)
+    client = TestClient(app)
+    assert client.get("/me").json() == {"name": None}
+    client.get("/login")
+    queries.clear()
+    assert client.get("/me").json() == {"name": "User One"}
+    assert client.get("/me").json() == {"name": "User One"}
+    assert len([q for q in queries if "FROM users" in q]) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.invalidate(1)
+    client.get("/me")
+    assert cache.misses == 2
+
+
+def test_deactivating_a_user_evicts_them(tmp_path):
+    from app.core.identity import identity_cache
+    from app.core.rbac import permission_cache
+    engine = create_engine(f"sqlite:///{tmp_path / 'off.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, username="u1", password_hash="x", is_active=True, is_superuser=False))
+        db.commit()
+    app = FastAPI()
+    app.add_middleware(UserLoaderMiddleware, session_factory=factory)  # the shared identity_cache
+    app.add_middleware(SessionMiddleware, secret_key="test")
+
+    @app.get("/login")
+    def login(request: Request):
+        request.session["user_id"] = 1
+        return {}
+
+    @app.get("/me")
+    def me(request: Request):
+        return {"active": request.state.user.is_active}
+
+    client = TestClient(app)
+    client.get("/login")
+    identity_cache.invalidate()
+    assert client.get("/me").json() == {"active": True}
+    assert identity_cache.get(1) is not None
+    version = permission_cache.version
+    with factory() as db:
+        db.get(User, 1).is_active = False
+        db.commit()
+    assert identity_cache.get(1) is None and permission_cache.version > version
+    assert client.get("/me").json() == {"active": False}
+
+    version = permission_cache.version
+    with factory() as db:
+        db.get(User, 1).full_name = "Renamed"  # not an access change
+        db.commit()
+    assert permission_cache.version == version
+    identity_cache.invalidate()
@@ -0,0 +1,22 @@
+from app.core.models import Department, Employee
+from app.services.matrix import build_competency_matrix
+from app.services.scoring_batch import compute_score_tables
+
+
+def test_matrix_matches_batch_scores(db, build_scoring_data):
+    build_scoring_data(db)
+    m = build_competency_matrix(db)
+    tables = compute_score_tables(db)
+    assert m.values.shape == (len(m.competencies), len(m.employees))
+    for i, (comp_id, _) in enumerate(m.competencies):
+        for j, (emp_id, _) in enumerate(m.employees):
+            assert abs(m.values[i, j] - tables.competency(emp_id, comp_id)) < 1e-9
+
+
+def test_matrix_department_filter(db, build_scoring_data):
+    emps, _, _ = build_scoring_data(db)
+    other = Department(name="Other"); db.add(other); db.flush()
+    db.add(Employee(full_name="Outsider", department_id=other.id)); db.flush()
+    m = build_competency_matrix(db, [emps[0].department_id])
+    assert {e for e, _ in m.employees} == {e.id for e in emps}
+    assert build_competency_matrix(db, [other.id]).competencies == []
@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine, text
+from starlette.testclient import TestClient
+
+from app.core.metrics import Histogram, Metrics, MetricsMiddleware
+from fastapi import FastAPI
+
+
+def _app(registry):
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry, server_timing=True)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):  # sync: runs on the threadpool
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+    return app
+
+
+def test_requests_are_recorded_per_route_with_sql_counts():
+    registry = Metrics()
+    client = TestClient(_app(registry))
+    for i in range(2):
+        r = client.get(f"/items/{i}")
+        assert r.status_code == 200
+        assert 'desc="3 queries"' in r.headers["server-timing"]
+    client.get("/missing")
+
+    out = registry.render()
+    assert 'webhr_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in out
+    assert 'webhr_http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in out
+    assert 'webhr_db_queries_per_request_sum{method="GET",route="/items/{item_id}"} 6' in out
+    assert 'webhr_http_response_size_bytes_count{method="GET",route="/items/{item_id}"} 2' in out
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("x", "help", ("a",), (1, 10))
+    for v in (0.5, 5, 50):
+        h.observe(("q",), v)
+    lines = h.render().splitlines()
+    assert 'x_bucket{a="q",le="1"} 1' in lines
+    assert 'x_bucket{a="q",le="10"} 2' in lines
+    assert 'x_bucket{a="q",le="+Inf"} 3' in lines
+    assert 'x_sum{a="q"} 55.5' in lines
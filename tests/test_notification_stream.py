@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.core.models import Notification, User
+from app.routers import notifications as router
+from app.services.notification_hub import NotificationHub
+from app.services.notifications import NotificationBuffer, unread_counts
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def _events(chunks):
+    out = []
+    for chunk in chunks:
+        lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            out.append((lines["event"], lines.get("id"), json.loads(lines["data"])))
+    return out
+
+
+def test_hub_publishes_across_threads_and_caps_memory():
+    hub = NotificationHub(maxlen=3)
+
+    async def run():
+        sub = hub.subscribe(1)
+        t = threading.Thread(target=hub.publish, args=(1, [{"id": 1}, {"id": 2}]))
+        t.start(); t.join()
+        await asyncio.wait_for(sub.wake.wait(), 1)
+        assert sub.take() == ([{"id": 1}, {"id": 2}], False, True)
+        hub.publish(1, [{"id": i} for i in range(3, 8)])  # more than maxlen
+        await asyncio.wait_for(sub.wake.wait(), 1)
+        items, lagged, _ = sub.take()
+        assert items == [] and lagged
+        hub.unsubscribe(sub)
+        assert hub.connections() == 0
+
+    asyncio.run(run())
+
+
+def test_stream_delivers_live_and_resumes_from_last_event_id(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 's.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, username="u", password_hash="x"))
+        db.add_all(Notification(user_id=1, message=f"old {i}") for i in range(3))
+        db.commit()
+    monkeypatch.setattr(router, "ReadSessionLocal", factory)
+    unread_counts.clear()
+    buf = NotificationBuffer(factory, batch_size=100, interval=60)
+
+    async def take(gen, n):
+        return [await asyncio.wait_for(gen.__anext__(), 2) for _ in range(n)]
+
+    async def run():
+        live = router._stream(_Request(), 1, None)
+        first = await take(live, 2)  # retry, unread
+        assert _events(first) == [("unread", None, 3)]
+        buf.add([1], "fresh")
+        await asyncio.get_running_loop().run_in_executor(None, buf.flush)
+        (event, ident, data), (unread, _, count) = _events(await take(live, 2))
+        assert (event, data["message"], unread, count) == ("notification", "fresh", "unread", 4)
+        await live.aclose()
+
+        resumed = router._stream(_Request(), 1, 2)  # saw ids 1-2, missed 3 and 4
+        got = _events(await take(resumed, 4))
+        await resumed.aclose()
+        return ident, got
+
+    ident, got = asyncio.run(run())
+    assert ident == "4"
+    assert [(e, i) for e, i, _ in got] == [("notification", "3"), ("notification", "4"), ("unread", None)]
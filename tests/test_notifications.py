@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.core.models import Notification, User
+from app.services.notifications import (
+    NotificationBuffer, UnreadCounter, mark_all_read_stmt, page_query, purge_read, split_page, unread_count,
+    unread_counts,
+)
+
+
+def _factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'n.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([User(id=i, username=f"u{i}", password_hash="x") for i in (1, 2)])
+        db.commit()
+    return factory
+
+
+def test_buffer_flushes_by_size_and_moves_counters(tmp_path):
+    factory = _factory(tmp_path)
+    unread_counts.clear()
+    buf = NotificationBuffer(factory, batch_size=5, interval=60)
+    with factory() as db:
+        assert unread_count(db, 1) == 0  # cached now
+    buf.add([1, 2], "a")
+    buf.add([1], "b")
+    assert buf.pending() == 3
+    buf.add([1, 2], "c")  # 5 rows: size flush
+    assert buf.pending() == 0
+    buf.add([2], "d")
+    buf.stop()  # flushes the rest
+    with factory() as db:
+        assert db.scalar(select(func.count()).select_from(Notification)) == 6
+        assert unread_counts.get(1) == 3
+        assert unread_count(db, 2) == 3
+        db.execute(mark_all_read_stmt(1)); db.commit()
+        assert db.scalar(select(func.count()).where(Notification.user_id == 1, Notification.is_read == False)) == 0  # noqa: E712
+
+
+def test_stale_count_is_not_cached():
+    c = UnreadCounter()
+    gen = c.generation
+    c.add({1: 1})  # a flush ran while the COUNT was in flight
+    c.put(1, 5, gen)
+    assert c.get(1) is None
+
+
+def test_keyset_pages_cover_everything_once(tmp_path):
+    factory = _factory(tmp_path)
+    t0 = datetime(2025, 1, 1)
+    with factory() as db:
+        # equal timestamps in pairs exercise the id tie-breaker
+        db.add_all(Notification(user_id=1, message=f"m{i}", created_at=t0 + timedelta(minutes=i // 2)) for i in range(23))
+        db.add(Notification(user_id=2, message="other", created_at=t0))
+        db.commit()
+        seen, cursor = [], None
+        while True:
+            items, cursor = split_page(db.execute(page_query(1, cursor, 5)).scalars().all(), 5)
+            seen += [n.message for n in items]
+            if cursor is None:
+                break
+    assert len(seen) == 23 and len(set(seen)) == 23
+    assert seen[0] == "m22" and seen[-1] == "m0"
+
+
+def test_purge_deletes_only_old_read_rows_in_chunks(tmp_path):
+    factory = _factory(tmp_path)
+    old = datetime.utcnow() - timedelta(days=200)
+    with factory() as db:
+        db.add_all(Notification(user_id=1, message="old read", is_read=True, created_at=old) for _ in range(12))
+        db.add(Notification(user_id=1, message="old unread", is_read=False, created_at=old))
+        db.add(Notification(user_id=1, message="new read", is_read=True, created_at=datetime.utcnow()))
+        db.commit()
+        assert purge_read(db, older_than_days=90, chunk=5) == 12
+        assert sorted(db.scalars(select(Notification.message))) == ["new read", "old unread"]
+
+
+def test_a_refused_row_is_dropped_and_the_rest_written(tmp_path, caplog):
+    from sqlalchemy import event
+    factory = _factory(tmp_path)
+    engine = factory.kw["bind"]
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    engine.dispose()
+    unread_counts.clear()
+    buf = NotificationBuffer(factory, batch_size=4, interval=60)
+    buf.add([1, 2, 99], "a")  # user 99 does not exist: FK violation
+    buf.add([2, 1], "b")  # fills the batch of 4, then one more
+    assert buf.flush() == 0 and buf.pending() == 0
+    assert buf.dropped == 1 and "dropping notification for user 99" in caplog.text
+    with factory() as db:
+        rows = db.execute(select(Notification.user_id, Notification.message).order_by(Notification.id)).all()
+    assert rows == [(1, "a"), (2, "a"), (2, "b"), (1, "b")]
+
+
+def test_rows_stay_buffered_while_the_database_is_down_up_to_the_cap(tmp_path, caplog):
+    factory = _factory(tmp_path)
+
+    def broken():
+        raise RuntimeError("database down")
+
+    buf = NotificationBuffer(broken, batch_size=100, interval=60)
+    buf.max_pending = 3
+    buf.add([1, 2], "a")
+    try:
+        buf.flush()
+    except RuntimeError:
+        pass
+    assert buf.pending() == 2
+    buf.add([1, 2], "b")  # over the cap: the oldest goes
+    assert buf.pending() == 3 and buf.dropped == 1 and "dropped the 1 oldest" in caplog.text
+    buf.session_factory = factory
+    assert buf.flush() == 3
@@ -0,0 +1,71 @@
+from app.core.models import Department, Employee, Position, User
+from app.services.org import OrgIndex, closure_query, get_org, org_cache
+
+
+def _org(db):
+    db.add_all([User(id=1, username="boss", password_hash="x"), User(id=2, username="lead", password_hash="x")])
+    root = Department(name="Company", manager_user_id=1)
+    db.add(root); db.flush()
+    sales = Department(name="Sales", parent_id=root.id)
+    it = Department(name="IT", parent_id=root.id, manager_user_id=2)
+    db.add_all([sales, it]); db.flush()
+    backend = Department(name="Backend", parent_id=it.id)
+    other = Department(name="Other")
+    db.add_all([backend, other]); db.flush()
+    dev = Position(name="Developer", department_id=backend.id)
+    db.add(dev); db.flush()
+    db.add_all([
+        Employee(full_name="Boss", department_id=root.id, user_id=1),
+        Employee(full_name="Lead", department_id=it.id, user_id=2),
+        Employee(full_name="Dev A", department_id=backend.id, position_id=dev.id),
+        Employee(full_name="Dev B", department_id=backend.id, position_id=dev.id),
+        Employee(full_name="Gone", department_id=backend.id, is_active=False),
+        Employee(full_name="Seller", department_id=sales.id),
+        Employee(full_name="Outsider", department_id=other.id),
+    ])
+    db.flush()
+    return root, sales, it, backend, other
+
+
+def test_closure_comes_from_a_recursive_cte(db):
+    root, sales, it, backend, _ = _org(db)
+    pairs = {(a, d): depth for a, d, depth in db.execute(closure_query(root.id))}
+    assert pairs == {(root.id, root.id): 0, (root.id, sales.id): 1, (root.id, it.id): 1, (root.id, backend.id): 2}
+
+
+def test_subtrees_headcounts_and_managers(db, max_queries):
+    root, sales, it, backend, other = _org(db)
+    with max_queries(4):
+        org = OrgIndex.load(db)
+    assert org.subtree(root.id) == [root.id, it.id, backend.id, sales.id]  # depth first, siblings by name
+    assert [e.full_name for e in org.employees_under(it.id)] == ["Lead", "Dev A", "Dev B"]
+    assert org.headcount(root.id) == 5 and org.headcount(backend.id) == 2
+    assert org.headcount(root.id, subtree=False) == 1
+    assert org.departments[backend.id].depth == 2
+    assert org.managed_roots(1) == [root.id] and org.managed_roots(2) == [it.id]
+    assert {e.full_name for e in org.employees_managed_by(2)} == {"Dev A", "Dev B"}
+    ctx = org.tree([it.id])
+    assert [d.name for d in ctx["depts"]] == ["IT", "Backend"]
+    assert ctx["positions"][org.by_dept[backend.id][0].position_id].title == "Developer"
+    assert [d.name for d in org.tree()["depts"]] == ["Company", "IT", "Backend", "Sales", "Other"]
+
+
+def test_cache_is_invalidated_by_org_writes(db):
+    root, *_ = _org(db)
+    db.commit()
+    org_cache.invalidate()
+    first = get_org(db)
+    assert get_org(db) is first
+    db.add(Employee(full_name="New", department_id=root.id))
+    db.commit()
+    second = get_org(db)
+    assert second is not first and second.headcount(root.id) == 6
+
+
+def test_parent_cycle_does_not_loop(db):
+    a = Department(name="A"); b = Department(name="B")
+    db.add_all([a, b]); db.flush()
+    a.parent_id, b.parent_id = b.id, a.id
+    db.flush()
+    org = OrgIndex.load(db)
+    assert set(org.subtree(a.id)) == {a.id, b.id}
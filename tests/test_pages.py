@@ -0,0 +1,66 @@
+import json
+import re
+from base64 import b64encode
+from importlib import import_module
+from pathlib import Path
+
+import pytest
+from itsdangerous import TimestampSigner
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from starlette.testclient import TestClient
+
+import app.core.db as core_db
+from app.core.config import settings
+from app.core.db import Base
+from app.core.identity import identity_cache
+from app.core.models import User
+from app.core.rbac import bump_rbac_version
+from app.main import create_app
+from app.routers import ROUTER_MODULES
+from app.templates_utils import _search_path
+
+
+def _html_routes():
+    for name in ROUTER_MODULES:
+        for route in import_module(f"app.routers.{name}").router.routes:
+            # no path parameters; the SSE stream never ends
+            if "GET" in route.methods and "{" not in route.path and not route.path.endswith("/stream"):
+                yield route.path
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('pages') / 'pages.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(id=1, username="admin", password_hash="x", full_name="Admin", is_active=True, is_superuser=True))
+        db.commit()
+    binds = core_db.SessionLocal.kw["bind"], core_db.ReadSessionLocal.kw["bind"]
+    core_db.SessionLocal.configure(bind=engine)
+    core_db.ReadSessionLocal.configure(bind=engine)
+    identity_cache.invalidate(); bump_rbac_version()
+    signed = TimestampSigner(str(settings.SECRET_KEY)).sign(b64encode(json.dumps({"user_id": 1}).encode())).decode()
+    with TestClient(create_app(), follow_redirects=False) as c:
+        c.cookies.set(settings.SESSION_COOKIE_NAME, signed)
+        yield c
+    core_db.SessionLocal.configure(bind=binds[0])
+    core_db.ReadSessionLocal.configure(bind=binds[1])
+    identity_cache.invalidate(); bump_rbac_version()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("path", sorted(set(_html_routes())))
+def test_every_page_renders_its_content(client, path):
+    res = client.get(path)
+    if not res.headers.get("content-type", "").startswith("text/html"):
+        return  # JSON, files, redirects
+    assert res.status_code == 200, (path, res.text[:500])
+    main = re.search(r"<main[^>]*>(.*?)</main>", res.text, re.S)
+    # a child template filling a block its base does not have renders an empty <main>
+    assert re.sub(r"<[^>]+>|\s", "", main.group(1) if main else res.text), path
+
+
+def test_template_names_are_not_shadowed():
+    names = [{str(p.relative_to(root)) for p in Path(root).rglob("*.html")} for root in _search_path()]
+    assert not set.intersection(*names)
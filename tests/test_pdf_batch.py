@@ -0,0 +1,68 @@
+import io
+import time
+import zipfile
+from concurrent.futures import wait
+
+import pytest
+
+from app.core.models import Department, Employee
+from app.reports.pdf_batch import collect_profiles, iter_pdfs, shutdown_pool, stream_zip
+from app.services import score_rollup
+from app.services.scoring_batch import compute_score_tables
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _pool():
+    yield
+    shutdown_pool()
+
+
+def test_collect_profiles_uses_rollups(db, build_scoring_data):
+    emps, comps, _ = build_scoring_data(db)
+    score_rollup.rebuild(db)
+    other = Department(name="Other"); db.add(other); db.flush()
+    db.add(Employee(full_name="Outsider", department_id=other.id)); db.flush()
+    profiles = collect_profiles(db, [emps[0].department_id])
+    assert {p.employee_id for p in profiles} == {e.id for e in emps}
+    tables = compute_score_tables(db)
+    names = {c.id: c.name for c in comps}
+    for p in profiles:
+        expected = {names[c]: tables.competency(p.employee_id, c) for c in names}
+        assert all(abs(s - expected[n]) < 1e-9 for n, s in p.scores)
+    assert [p.employee_id for p in collect_profiles(db, employee_ids=[emps[1].id])] == [emps[1].id]
+
+
+def test_stream_zip_with_process_pool(db, build_scoring_data):
+    build_scoring_data(db)
+    profiles = collect_profiles(db)
+    data = b"".join(stream_zip(iter_pdfs(profiles, workers=2)))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert sorted(zf.namelist()) == sorted(p.filename for p in profiles)
+        assert all(zf.read(n).startswith(b"%PDF") for n in zf.namelist())
+
+
+def _slow_render(profile):
+    time.sleep(0.2)
+    return profile.filename, b"%PDF"
+
+
+def test_aborted_download_stops_rendering(monkeypatch):
+    from app.reports import pdf_batch
+    pool, submitted = pdf_batch.get_pool(), []
+    submit = pool.submit
+
+    def tracking(*args, **kwargs):
+        submitted.append(submit(*args, **kwargs))
+        return submitted[-1]
+
+    monkeypatch.setattr(pool, "submit", tracking)
+    monkeypatch.setattr(pdf_batch, "render_pdf", _slow_render)  # pickled by name, workers import it
+    profiles = [pdf_batch.ProfileData(i, f"Employee {i}", "D", "P", [("C", 0.5)]) for i in range(40)]
+    chunks = stream_zip(iter_pdfs(profiles, workers=2))
+    next(chunks)
+    t0 = time.monotonic()
+    chunks.close()  # what the response does when the client disconnects
+    assert time.monotonic() - t0 < 2  # rendering the other ~38 would take ~4s
+    assert len(submitted) <= 4  # only this batch's window ever reached the pool
+    done, not_done = wait(submitted, timeout=2)
+    assert not not_done and pdf_batch.get_pool() is pool  # the shared pool lives on
@@ -0,0 +1,67 @@
+"""EXPLAIN QUERY PLAN for the hot lookups, on the model schema and on a migrated database."""
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.core.db import Base
+from app.core.models import Employee, Notification, Plan, PlanItem, Score, TaskCriterion
+from app.services import directory
+from app.services.notifications import encode_cursor, page_query
+
+HOT_QUERIES = {
+    "score_by_employee_task": select(func.avg(Score.normalized)).where(Score.employee_id == 1, Score.task_id == 2),
+    "score_by_employee_criterion": select(func.avg(Score.normalized))
+        .where(Score.employee_id == 1, Score.criterion_id == 2),
+    "score_rollup_refresh": select(Score.employee_id, Score.task_id, func.avg(Score.normalized))
+        .where(Score.employee_id.in_([1, 2]), Score.task_id.in_([3, 4]))
+        .group_by(Score.employee_id, Score.task_id),
+    "task_links_by_criterion": select(TaskCriterion.task_id, TaskCriterion.weight)
+        .where(TaskCriterion.criterion_id.in_([1, 2])),
+    "plan_items_by_plan": select(PlanItem).where(PlanItem.plan_id == 1, PlanItem.is_visible_to_employee == True),  # noqa: E712
+    "latest_plan": select(Plan).where(Plan.employee_id == 1).order_by(Plan.id.desc()).limit(1),
+    "notifications_feed": page_query(1),
+    "notifications_next_page": page_query(1, encode_cursor(Notification(id=7, created_at=datetime(2025, 1, 1)))),
+    "notifications_unread": select(func.count()).where(Notification.user_id == 1, Notification.is_read == False),  # noqa: E712
+    "employee_by_user": select(Employee.id, Employee.full_name).where(Employee.user_id == 1),
+    "directory_first_page": directory.page_query(),
+    "directory_next_page": directory.page_query(cursor=directory.encode_cursor("Петров", 7)),
+    "directory_by_department": directory.page_query(directory.DirectoryFilter(department_id=3, active=True),
+                                                    directory.encode_cursor("Петров", 7)),
+    "directory_by_position": directory.page_query(directory.DirectoryFilter(position_id=4, level=2)),
+}
+
+FULL_SCAN = re.compile(r"^SCAN \w+(?: AS \w+)?$")
+
+
+@pytest.fixture(scope="module", params=["metadata", "alembic"])
+def engine(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "db.sqlite"
+    url = f"sqlite:///{path}"
+    if request.param == "metadata":
+        eng = create_engine(url)
+        Base.metadata.create_all(eng)
+    else:
+        # a subprocess keeps alembic's logging config out of this test session
+        env = dict(os.environ, DATABASE_URL=url)
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+        eng = create_engine(url)
+    yield eng
+    eng.dispose()
+
+
+def _plan(engine, stmt):
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(engine, name):
+    plan = _plan(engine, HOT_QUERIES[name])
+    assert not [step for step in plan if FULL_SCAN.match(step)], f"{name} scans a whole table: {plan}"
+    assert not [step for step in plan if "TEMP B-TREE" in step], f"{name} sorts in a temp b-tree: {plan}"
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.core.querylog import statement_shape, track_queries
+from app.services import score_rollup
+
+
+def test_statement_shape_folds_literals_and_in_lists():
+    a = statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) AND x = 5")
+    b = statement_shape("SELECT *  FROM t\nWHERE id IN (?) AND x = 7")
+    assert a == b == "SELECT * FROM t WHERE id IN (?) AND x = ?"
+
+
+def test_nplusone_is_flagged_at_the_app_frame(db, build_scoring_data, caplog):
+    emps, _, _ = build_scoring_data(db)
+    score_rollup.rebuild(db)
+    with caplog.at_level(logging.WARNING, "webhr.sql.nplusone"), track_queries(threshold=3) as t:
+        for e in emps:
+            score_rollup.employee_total(db, e.id)
+    assert t.count == len(emps)
+    (frame,) = t.flagged.values()
+    assert frame.startswith("app/services/score_rollup.py:")
+    assert len(caplog.records) == 1
+
+
+def test_slow_queries_are_logged_with_params(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 1e-6)
+    engine = create_engine("sqlite://")
+    with caplog.at_level(logging.WARNING, "webhr.sql.slow"), track_queries():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :x"), {"x": 42})
+    assert any("SELECT ?" in r.getMessage() and "42" in r.getMessage() for r in caplog.records)
+
+
+def test_max_queries_fixture_sees_endpoint_queries(max_queries):
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+
+    @app.get("/n/{n}")
+    def run(n: int):
+        with engine.connect() as conn:
+            for _ in range(n):
+                conn.execute(text("SELECT 1"))
+        return {}
+
+    client = TestClient(app)
+    with max_queries(2):
+        client.get("/n/2")
+    with pytest.raises(AssertionError, match="at most 2 queries"):
+        with max_queries(2):
+            client.get("/n/3")
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with max_queries(100, nplusone=5):
+            client.get("/n/6")
@@ -8,3 +8,48 @@ def secure():
 
 def test_rbac_dep_unauth():
     client=TestClient(app); r=client.get('/secure'); assert r.status_code in (401,403)
+
+
+def _rbac_user(db):
+    from app.core.models import User, Role, Permission
+    perm = Permission(code='reports.view', name='Reports')
+    role = Role(name='Viewer', permissions=[perm])
+    user = User(username='u1', password_hash='x', is_active=True, is_superuser=False, roles=[role])
+    db.add(user); db.commit()
+    return user, role
+
+
+def test_principal_is_cached_until_rbac_changes(db):
+    from sqlalchemy import event
+    from app.core.models import Permission
+    from app.core import rbac
+    user, role = _rbac_user(db)
+    user_id = user.id
+    rbac.bump_rbac_version()
+    queries = []
+    event.listen(db.get_bind(), 'before_cursor_execute', lambda *a: queries.append(a[2]))
+
+    p = rbac.get_principal(db, user_id)
+    assert p.has('reports.view') and not p.has('admin_all')
+    assert len(queries) == 1
+    assert rbac.get_principal(db, user_id) is p
+    assert len(queries) == 1  # cache hit: no DB access
+
+    role.permissions.append(Permission(code='admin_all', name='Admin')); db.commit()
+    assert not rbac.get_principal(db, user_id).has('admin_all')  # stale until the version is bumped
+    rbac.bump_rbac_version()
+    assert rbac.get_principal(db, user_id).has('admin_all')
+
+
+def test_permission_cache_lru_and_ttl():
+    from app.core.rbac import PermissionCache, Principal
+    cache = PermissionCache(maxsize=2, ttl=60)
+    for i in range(3):
+        cache.put(Principal(i, True, False, frozenset()), cache.version)
+    assert cache.get(0) is None and cache.get(2) is not None
+    cache.ttl = 0
+    assert cache.get(2) is None
+    stale = cache.version
+    cache.bump()
+    cache.put(Principal(5, True, False, frozenset()), stale)
+    assert cache.get(5) is None
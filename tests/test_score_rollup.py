@@ -0,0 +1,81 @@
+import importlib.util
+from datetime import date
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import func, select
+
+from app.core.models import Score, ScoreTotalRollup
+from app.services import score_rollup
+from app.services.matrix import build_competency_matrix, load_competency_matrix
+from app.services.scoring_batch import compute_score_tables
+
+
+def test_rebuild_then_check_is_clean(db, build_scoring_data):
+    build_scoring_data(db)
+    score_rollup.rebuild(db)
+    assert score_rollup.check(db) == []
+
+
+def test_incremental_insert_update_delete(db, build_scoring_data):
+    emps, comps, crits = build_scoring_data(db)
+    score_rollup.rebuild(db)
+    score_rollup.track_score_writes(db)
+
+    e = emps[-1]  # no scores yet
+    s = Score(employee_id=e.id, date=date(2025, 2, 1), task_id=1, normalized=0.9)
+    db.add(s)
+    db.flush()
+    assert score_rollup.check(db) == []
+    assert score_rollup.employee_total(db, e.id) == compute_score_tables(db, [e.id]).total(e.id) > 0
+
+    s.normalized = 0.1
+    s.task_id = 2
+    db.flush()
+    assert score_rollup.check(db) == []
+
+    direct = Score(employee_id=emps[0].id, date=date(2025, 2, 1), criterion_id=crits[-1].id, normalized=0.5)
+    db.add(direct)
+    db.flush()
+    assert score_rollup.check(db) == []
+
+    db.delete(s)
+    db.delete(direct)
+    db.flush()
+    assert score_rollup.check(db) == []
+    assert score_rollup.employee_total(db, e.id) == 0.0
+
+
+def test_matrix_reads_rollups(db, build_scoring_data):
+    build_scoring_data(db)
+    score_rollup.rebuild(db)
+    built, loaded = build_competency_matrix(db), load_competency_matrix(db)
+    assert loaded.employees == built.employees
+    assert abs(loaded.values - built.values).max() < 1e-9
+
+
+def test_migration_fills_the_rollups_from_existing_scores(db, build_scoring_data):
+    build_scoring_data(db)
+    db.commit()
+    conn = db.connection()
+    for table in (score_rollup._TOT, score_rollup._KR, score_rollup._CR, score_rollup._TR):
+        table.drop(conn)
+    path = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "20261018_score_rollups.py"
+    spec = importlib.util.spec_from_file_location("score_rollups_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(conn)):
+        migration.upgrade()
+    assert db.scalar(select(func.count()).select_from(ScoreTotalRollup)) > 0
+    assert score_rollup.check(db) == []
+
+
+def test_fill_if_empty_only_fills_empty_rollups(db, build_scoring_data):
+    engine = db.get_bind()
+    assert not score_rollup.fill_if_empty(engine)  # no scores
+    build_scoring_data(db)
+    db.commit()
+    assert score_rollup.fill_if_empty(engine)
+    assert score_rollup.check(db) == []
+    assert not score_rollup.fill_if_empty(engine)
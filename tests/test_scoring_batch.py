@@ -0,0 +1,50 @@
+from sqlalchemy import event, select, func
+
+from app.core.models import Criterion, TaskCriterion, Score
+from app.services.scoring import criterion_score, competency_score, employee_total
+from app.services.scoring_batch import compute_score_tables
+
+
+def _ref_criterion(db, emp_id, crit_id):
+    # per-row reference: the original criterion_score loop
+    links = db.execute(select(TaskCriterion.task_id, TaskCriterion.weight).where(TaskCriterion.criterion_id == crit_id)).all()
+    if not links:
+        return float(db.execute(select(func.avg(Score.normalized)).where(Score.employee_id == emp_id, Score.criterion_id == crit_id)).scalar() or 0.0)
+    total = 0.0
+    for task_id, weight in links:
+        norm = db.execute(select(func.avg(Score.normalized)).where(Score.employee_id == emp_id, Score.task_id == task_id)).scalar()
+        total += (weight or 0.0) * float(norm or 0.0)
+    return total
+
+
+def _ref_competency(db, emp_id, comp_id):
+    crits = db.execute(select(Criterion.id, Criterion.weight).where(Criterion.competency_id == comp_id)).all()
+    return sum((w or 0.0) * _ref_criterion(db, emp_id, cid) for cid, w in crits)
+
+
+def test_batch_matches_per_row_reference(db, build_scoring_data):
+    emps, comps, crits = build_scoring_data(db)
+    tables = compute_score_tables(db)
+    for e in emps:
+        for c in crits:
+            ref = _ref_criterion(db, e.id, c.id)
+            assert abs(tables.criterion(e.id, c.id) - ref) < 1e-9
+            assert abs(criterion_score(db, e.id, c.id) - ref) < 1e-9
+        refs = [_ref_competency(db, e.id, c.id) for c in comps]
+        for c, ref in zip(comps, refs):
+            assert abs(tables.competency(e.id, c.id) - ref) < 1e-9
+            assert abs(competency_score(db, e.id, c.id) - ref) < 1e-9
+        assert abs(tables.total(e.id) - sum(refs) / len(refs)) < 1e-9
+        assert abs(employee_total(db, e.id) - sum(refs) / len(refs)) < 1e-9
+    assert tables.total(emps[-1].id) == 0.0
+
+
+def test_query_count_does_not_grow_with_employees(db, build_scoring_data):
+    emps, _, _ = build_scoring_data(db, n_emp=40)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    compute_score_tables(db, [1, 2])
+    few = len(statements)
+    statements.clear()
+    compute_score_tables(db, [e.id for e in emps])
+    assert len(statements) == few
@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.db import Base
+from app.core.models import Department, ScoringRule
+from app.services.scoring import normalize_value
+from app.services.scoring_rules import compile_rule, normalize_many, rule_cache
+
+
+def test_builtin_defaults_agree_across_services():
+    from app.core.services.evaluation_service import normalize_value as eval_normalize
+    for st, raw in [("one_to_five", 3.0), ("binary", 1), ("percent", 50.0), ("text_map", 2.0)]:
+        assert normalize_value(None, raw, st) == eval_normalize(None, st, raw)
+    assert normalize_value(None, 5, "one_to_five") == 1.0
+    assert normalize_value(None, None, "percent") == 0.0
+
+
+def test_compiled_rule_kinds():
+    lookup = compile_rule("text_map", json.dumps({"map": {"A": 1, "b": 0.5}, "default": 0.1}))
+    assert list(lookup.many(["a", "B", "zzz", None])) == [1.0, 0.5, 0.1, 0.1]
+    codes = compile_rule("text_map", json.dumps({"map": {"1": 0.2, "3": 0.9}}))
+    assert list(codes.many([1, 3.0, 2, None])) == [0.2, 0.9, 0.0, 0.0]
+    pw = compile_rule("percent", json.dumps({"points": [[0, 0], [50, 0.4], [100, 1]]}))
+    assert np.allclose(pw.many([25, 75, 150]), [0.2, 0.7, 1.0])
+    bad = compile_rule("percent", "{not json")
+    assert bad(50) == 0.5
+
+
+def test_department_rule_is_cached_and_invalidated(db):
+    rule_cache.invalidate()  # the cache is process-wide; start clean
+    dep = Department(name="D"); db.add(dep); db.flush()
+    assert np.allclose(normalize_many(db, [1, 3, 5], "one_to_five", dep.id), [0, 0.5, 1])
+    rule = ScoringRule(department_id=dep.id, scale_type="one_to_five", rule_json=json.dumps({"min": 0, "max": 5}))
+    db.add(rule); db.flush()
+    assert np.allclose(normalize_many(db, [1, 3, 5], "one_to_five", dep.id), [0.2, 0.6, 1])
+    rule.rule_json = json.dumps({"threshold": 4}); db.flush()
+    assert list(normalize_many(db, [1, 3, 5], "one_to_five", dep.id)) == [0, 0, 1]
+    # other departments keep the default
+    assert normalize_value(db, 3, "one_to_five", dep.id + 1) == 0.5
+
+
+def test_rules_loaded_before_the_commit_are_dropped_by_it(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}")
+    Base.metadata.create_all(engine)
+    rule_cache.invalidate()
+    with Session(engine) as writer, Session(engine) as reader:
+        writer.add(ScoringRule(department_id=None, scale_type="percent", rule_json=json.dumps({"min": 0, "max": 50})))
+        writer.flush()
+        assert normalize_value(reader, 50, "percent") == 0.5  # another request caches the committed rules
+        writer.commit()
+        assert normalize_value(reader, 50, "percent") == 1.0
+    engine.dispose()
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cold interpreter: import app.main, build the app, serve the first request
+STARTUP_BUDGET_S = 6.0
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t_import = time.perf_counter() - t0
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:  # runs the lifespan hook
+    status = client.get("/health").status_code
+print(json.dumps({"import": t_import, "first_response": time.perf_counter() - t0, "status": status,
+                  "routes": len(app.main.app.routes)}))
+"""
+
+
+def _probe(tmp_path, **extra_env):
+    db = tmp_path / "startup.db"
+    env = dict(os.environ, ENV="test", DEBUG="false", DATABASE_URL=f"sqlite:///{db}", **extra_env)
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1]), db
+
+
+def test_cold_start_to_first_response(tmp_path):
+    result, db = _probe(tmp_path)
+    assert result["status"] == 200
+    assert result["routes"] > 20
+    assert result["first_response"] < STARTUP_BUDGET_S, result
+    # no schema bootstrap unless DB_BOOTSTRAP is set
+    assert not db.exists() or db.stat().st_size == 0
+
+
+def test_schema_bootstrap_is_opt_in(tmp_path):
+    import sqlite3
+    result, db = _probe(tmp_path, DB_BOOTSTRAP="true")
+    assert result["status"] == 200
+    tables = {r[0] for r in sqlite3.connect(db).execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"users", "employees", "scores"} <= tables
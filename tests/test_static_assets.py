@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core import static_assets
+from app.core.static_assets import IMMUTABLE, AssetStaticFiles, build, fingerprint, static_url
+
+CSS = b"body { color: #123456; }\n" * 40
+
+
+def _build(tmp_path):
+    src = tmp_path / "src"
+    (src / "img").mkdir(parents=True)
+    (src / "style.css").write_bytes(CSS)
+    (src / "img" / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 4)
+    (src / "tiny.js").write_bytes(b"x=1")
+    dest = tmp_path / "dist"
+    return build(str(src), str(dest)), dest
+
+
+def test_build_writes_hashed_copies_variants_and_manifest(tmp_path):
+    manifest, dest = _build(tmp_path)
+    assert manifest["style.css"] == fingerprint("style.css", CSS) and manifest["img/logo.png"].startswith("img/logo.")
+    assert json.loads((dest / "manifest.json").read_text()) == manifest
+    assert gzip.decompress((dest / manifest["style.css"]).with_name(manifest["style.css"] + ".gz").read_bytes()) == CSS
+    assert not (dest / "img" / "logo.png.gz").exists()  # not a compressible type
+    assert not (dest / "tiny.js.gz").exists()  # too small to be worth it
+    assert build(str(tmp_path / "src"), str(dest)) == manifest  # rebuilds are reproducible
+
+
+def test_serving_prefers_precompressed_and_caches_hashed_names_forever(tmp_path):
+    manifest, dest = _build(tmp_path)
+    client = TestClient(Starlette(routes=[Mount("/static", AssetStaticFiles(directory=str(dest)))]))
+    hashed = client.get("/static/" + manifest["style.css"], headers={"Accept-Encoding": "gzip, br"})
+    assert hashed.status_code == 200 and hashed.content == CSS  # httpx decodes the gzip body
+    assert hashed.headers["content-encoding"] == "gzip" and hashed.headers["vary"] == "Accept-Encoding"
+    assert hashed.headers["cache-control"] == IMMUTABLE and hashed.headers["content-type"].startswith("text/css")
+
+    plain = client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["cache-control"] == "no-cache"
+    again = client.get("/static/style.css", headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]})
+    assert again.status_code == 304
+    refused = client.get("/static/style.css", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+
+
+def test_static_url_resolves_through_the_manifest(tmp_path, monkeypatch):
+    manifest, dest = _build(tmp_path)
+    monkeypatch.setattr(static_assets.settings, "STATIC_BUILD_DIR", str(dest))
+    static_assets.reload_manifest()
+    try:
+        assert static_url("style.css") == "/static/" + manifest["style.css"]
+        assert static_url("/missing.css") == "/static/missing.css"
+    finally:
+        monkeypatch.undo()
+        static_assets.reload_manifest()
@@ -0,0 +1,71 @@
+import gzip
+
+import jinja2
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from starlette.templating import _TemplateResponse
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.templates_utils import FIRST_CHUNK, Templates, _chunks
+
+PAGE = "<html><head><title>{{ title }}</title></head><body><table>" \
+       "{% for i in rows %}<tr><td>{{ i }}</td><td>Сотрудник {{ i }}</td></tr>{% endfor %}</table></body></html>"
+
+
+def _templates():
+    return Templates(env=jinja2.Environment(loader=jinja2.DictLoader({"page.html": PAGE}), autoescape=True))
+
+
+def _app(templates):
+    async def page(request):
+        return templates.StreamingTemplateResponse(request, "page.html", {"title": "t", "rows": range(3000)})
+
+    async def events(request):
+        return StreamingResponse(iter([b"data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/page", page), Route("/events", events)],
+                     middleware=[Middleware(GZipMiddleware, minimum_size=1024)])
+
+
+def test_chunks_flush_the_head_early_then_batch():
+    tpl = _templates().get_template("page.html")
+    ctx = {"title": "t", "rows": range(3000)}
+    chunks = list(_chunks(tpl.generate(ctx), 16 * 1024))
+    assert b"".join(chunks).decode() == tpl.render(ctx)
+    assert FIRST_CHUNK <= len(chunks[0].decode()) < 16 * 1024  # the head does not wait for the table
+    assert all(len(c.decode()) >= 16 * 1024 for c in chunks[1:-1])
+
+
+def test_streamed_page_matches_the_rendered_one_and_is_gzipped():
+    templates = _templates()
+    expected = templates.get_template("page.html").render(title="t", rows=range(3000))
+    client = TestClient(_app(templates))
+    plain = client.get("/page", headers={"Accept-Encoding": "identity"})
+    assert plain.text == expected and "content-length" not in plain.headers
+
+    with client.stream("GET", "/page", headers={"Accept-Encoding": "gzip"}) as r:
+        assert r.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(b"".join(r.iter_raw())).decode() == expected
+
+
+def test_event_streams_are_never_compressed():
+    r = TestClient(_app(_templates())).get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers and r.text.startswith("data: 1")
+
+
+def test_streaming_can_be_switched_off(monkeypatch):
+    templates = _templates()
+    client = TestClient(Starlette(routes=[Route("/", lambda request: templates.StreamingTemplateResponse(
+        request, "page.html", {"title": "t", "rows": range(3)}))]))
+    streamed = client.get("/")
+    assert "content-length" not in streamed.headers
+    assert streamed.template.name == "page.html" and streamed.context["title"] == "t"  # as with TemplateResponse
+
+    monkeypatch.setattr(settings, "TEMPLATE_STREAMING", False)
+    buffered = client.get("/")
+    assert buffered.text == streamed.text and buffered.headers["content-length"] == str(len(buffered.content))
+    assert isinstance(templates.StreamingTemplateResponse(None, "page.html", {"rows": []}), _TemplateResponse)
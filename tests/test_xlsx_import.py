@@ -0,0 +1,45 @@
+from openpyxl import Workbook
+from sqlalchemy import select
+
+from app.core.models import Department, Position, Function, Task, position_functions
+from app.import_export.xlsx_io import TASK_COLUMNS, import_tasks
+
+
+def _write(path, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Tasks")
+    ws.append(TASK_COLUMNS)
+    for r in rows:
+        ws.append(r)
+    wb.save(path)
+
+
+def test_import_tasks_streams_validates_and_upserts(db, tmp_path):
+    it = Department(name="IT", code="IT"); db.add(it); db.flush()
+    dev = Position(name="Developer", department_id=it.id); db.add(dev); db.commit()
+
+    path = str(tmp_path / "tasks.xlsx")
+    rows = [["IT", "Developer", "Backend", f"Task {i}", 1, "да", 0, 1] for i in range(25)]
+    rows += [
+        ["XX", "", "Backend", "Orphan", 1, 0, 0, 1],       # unknown department
+        ["IT", "Nobody", "Backend", "Ghost", 1, 0, 0, 1],  # unknown position
+        ["IT", "", "Backend", "Heavy", "a lot", 0, 0, 1],  # bad weight
+        ["IT", "", "", "No function", None, None, None, None],
+    ]
+    _write(path, rows)
+    report = import_tasks(db, path, chunk_size=10)
+    assert report.rows == 29
+    assert report.inserted == 26 and report.updated == 0
+    assert sorted(n for n, _ in report.errors) == [27, 28, 29]
+    fn = db.execute(select(Function).where(Function.name == "Backend")).scalars().one()
+    assert db.execute(select(position_functions)).all() == [(dev.id, fn.id)]
+    plain = db.execute(select(Task).where(Task.name == "No function")).scalars().one()
+    assert plain.function_id is None and plain.is_active and plain.auto_weight
+
+    _write(path, [["IT", "Developer", "Backend", "Task 3", 0.5, 0, 1, 0]])
+    report = import_tasks(db, path)
+    assert (report.inserted, report.updated, report.error_count) == (0, 1, 0)
+    t = db.execute(select(Task).where(Task.name == "Task 3")).scalars().one()
+    db.refresh(t)
+    assert (t.weight, t.mandatory_for_level, t.mandatory_for_apex, t.is_active) == (0.5, False, True, False)
+    assert db.execute(select(Task)).scalars().all().__len__() == 26